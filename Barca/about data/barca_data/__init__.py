@@ -0,0 +1,7 @@
+"""Shared scraping pipeline for the bdfutbol FC Barcelona season pages.
+
+The per-decade scripts (u1.py .. u4.py) are thin wrappers around this
+package: `crawler` fetches season pages, `scrape` turns them into
+`players_stats` rows and `db` stores and exports them. `cli` (run as
+`python -m barca_data`) is the single command line over every stage.
+"""
@@ -0,0 +1,6 @@
+"""`python -m barca_data COMMAND ...`: the `barca` command line of `cli`."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,119 @@
+"""Player ages: one CSV file, `player_ages.csv`, read into a lookup.
+
+The squad table of a season page is read without an age: the decade
+scripts took `age` from the matches-played cell (td 5), so every age they
+stored was a copy of `matches_played`. The real ages are those the
+notebook charts (`BARCA_READY_FOR_GRAPHS.xlsx`), listed per (season,
+player_name, position), the key of `players_stats`:
+
+    season,player_name,position,age,source
+
+A player not listed has no age (NULL): the two placeholder rows of
+1979-80, and any season scraped after the file was last extended, such
+as the one in progress, until its ages are added. Names are compared
+accent- and case-folded (`identity.name_key`); a player listed in the
+season under another position keeps that age.
+
+    python -m barca_data.ages [--registry PATH]
+
+checks the file and prints a summary.
+"""
+import argparse
+import csv
+import hashlib
+import os
+
+from .identity import name_key
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGES_PATH = os.path.join(ABOUT_DATA, 'player_ages.csv')
+
+
+def read_ages(path=AGES_PATH):
+    """Reads the CSV into `{(season, name key, position): age}`."""
+    index = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for line, record in enumerate(csv.DictReader(f), start=2):
+            key = (record['season'].strip(), name_key(record['player_name']), record['position'].strip())
+            if key in index:
+                raise ValueError(f"{path}:{line}: duplicate entry for {record['player_name']} "
+                                 f"({record['position']}) in {record['season']}")
+            age = int(record['age'])
+            if age <= 0:
+                raise ValueError(f"{path}:{line}: age {age} for {record['player_name']}")
+            index[key] = age
+    return index
+
+
+class PlayerAges:
+    """Age lookups by (player, season, position)."""
+
+    def __init__(self, index, digest=None):
+        self.index = index
+        self.digest = digest
+        self._by_name = None
+
+    @classmethod
+    def from_mapping(cls, ages):
+        """Builds the lookup from a `{(player, season, position): age}` dict."""
+        return cls({(season, name_key(player), position): age
+                    for (player, season, position), age in ages.items()})
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, player, season, position):
+        """The age of `player` in `season`, or None when not listed."""
+        key = name_key(player)
+        age = self.index.get((season, key, position))
+        if age is None:
+            if self._by_name is None:
+                by_name = {}
+                for entry_season, entry_key, entry_position in self.index:
+                    by_name.setdefault((entry_season, entry_key), set()).add(entry_position)
+                self._by_name = {name: positions.pop() for name, positions in by_name.items()
+                                 if len(positions) == 1}
+            position = self._by_name.get((season, key))
+            age = self.index[season, key, position] if position is not None else None
+        return age
+
+    def items(self):
+        return self.index.items()
+
+
+_loaded = {}
+
+
+def load_ages(path=AGES_PATH):
+    """Returns the ages at `path`, read again only when the file changed."""
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    key = os.path.abspath(path)
+    cached = _loaded.get(key)
+    if cached is None or cached.digest != digest:
+        cached = _loaded[key] = PlayerAges(read_ages(path), digest)
+    return cached
+
+
+def as_ages(ages=None):
+    """Accepts None (the default file), a `PlayerAges`, or a `{(player, season, position): age}` dict."""
+    if ages is None:
+        return load_ages()
+    if isinstance(ages, PlayerAges):
+        return ages
+    return PlayerAges.from_mapping(ages)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the player ages file.")
+    parser.add_argument('--registry', default=AGES_PATH)
+    args = parser.parse_args(argv)
+    ages = load_ages(args.registry)
+    seasons = sorted({season for season, _key, _position in ages.index})
+    values = sorted(ages.index.values())
+    print(f"{len(ages)} ages over {len(seasons)} seasons ({seasons[0]} to {seasons[-1]}), "
+          f"{values[0]} to {values[-1]} years")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""Materialized aggregate tables of the warehouse, refreshed incrementally.
+
+The analyses of `Barca_Data_Legacy.ipynb` are kept as tables next to the
+fact table instead of being recomputed with a full `groupby` each time:
+
+    agg_players   career totals per player: seasons (loyalty), matches,
+                  minutes, goals and goal contributions, cards, seasons list
+    agg_managers  per cleaned manager name: seasons, first/last season,
+                  years stayed, spending, signings and paid signings
+    agg_seasons   per season: squad size, average age and youngest player
+                  (over the known ages), top signing (none when the season
+                  had no paid fee)
+
+Triggers on `player_season` record which players, seasons and managers
+any write touched in `dirty_*` tables. `refresh_aggregates` recomputes
+only those keys, through the fact table indexes, clears them and bumps
+the `data_version` counter, so that readers caching results (`api`) can
+tell when the data changed. A
+season reload therefore costs work proportional to that season's squad
+and its players' careers, not to the whole history. Readers refresh
+pending keys first, then read the ordered aggregate indexes, so their
+cost depends on the size of the result.
+
+    python -m barca_data.aggregates [--path PATH] [--full]
+
+refreshes the aggregates of the warehouse (all of them with `--full`).
+"""
+import argparse
+import time
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS dirty_players (player_id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS dirty_seasons (season_id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS dirty_managers (manager_id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS data_version (version INTEGER NOT NULL);
+
+-- Not INSERT OR IGNORE: inside an upsert the outer statement's conflict handling would win.
+CREATE TRIGGER IF NOT EXISTS player_season_dirty_insert AFTER INSERT ON player_season BEGIN
+    INSERT INTO dirty_players SELECT new.player_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_players WHERE player_id = new.player_id);
+    INSERT INTO dirty_seasons SELECT new.season_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_seasons WHERE season_id = new.season_id);
+    INSERT INTO dirty_managers SELECT new.manager_id
+        WHERE new.manager_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM dirty_managers WHERE manager_id = new.manager_id);
+END;
+CREATE TRIGGER IF NOT EXISTS player_season_dirty_delete AFTER DELETE ON player_season BEGIN
+    INSERT INTO dirty_players SELECT old.player_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_players WHERE player_id = old.player_id);
+    INSERT INTO dirty_seasons SELECT old.season_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_seasons WHERE season_id = old.season_id);
+    INSERT INTO dirty_managers SELECT old.manager_id
+        WHERE old.manager_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM dirty_managers WHERE manager_id = old.manager_id);
+END;
+CREATE TRIGGER IF NOT EXISTS player_season_dirty_update AFTER UPDATE ON player_season BEGIN
+    INSERT INTO dirty_players SELECT old.player_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_players WHERE player_id = old.player_id);
+    INSERT INTO dirty_seasons SELECT old.season_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_seasons WHERE season_id = old.season_id);
+    INSERT INTO dirty_managers SELECT old.manager_id
+        WHERE old.manager_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM dirty_managers WHERE manager_id = old.manager_id);
+    INSERT INTO dirty_players SELECT new.player_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_players WHERE player_id = new.player_id);
+    INSERT INTO dirty_seasons SELECT new.season_id
+        WHERE NOT EXISTS (SELECT 1 FROM dirty_seasons WHERE season_id = new.season_id);
+    INSERT INTO dirty_managers SELECT new.manager_id
+        WHERE new.manager_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM dirty_managers WHERE manager_id = new.manager_id);
+END;
+
+CREATE TABLE IF NOT EXISTS agg_players (
+    player_id INTEGER PRIMARY KEY REFERENCES players,
+    seasons INTEGER NOT NULL,
+    first_season TEXT, last_season TEXT, season_list TEXT,
+    matches_played INTEGER, matches_started INTEGER, matches_completed INTEGER,
+    matches_as_substitute INTEGER, minutes_played INTEGER,
+    goals INTEGER, goal_contributions INTEGER,
+    yellow_cards INTEGER, red_cards INTEGER, total_cards INTEGER
+);
+CREATE INDEX IF NOT EXISTS agg_players_goal_contributions ON agg_players (goal_contributions);
+CREATE INDEX IF NOT EXISTS agg_players_minutes ON agg_players (minutes_played);
+CREATE INDEX IF NOT EXISTS agg_players_cards ON agg_players (total_cards);
+CREATE INDEX IF NOT EXISTS agg_players_seasons ON agg_players (seasons);
+
+CREATE TABLE IF NOT EXISTS agg_managers (
+    manager_name TEXT PRIMARY KEY,
+    seasons INTEGER NOT NULL,
+    first_season TEXT, last_season TEXT, years_stayed INTEGER,
+    total_spending INTEGER NOT NULL, signings INTEGER NOT NULL, paid_signings INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS agg_managers_seasons ON agg_managers (seasons);
+CREATE INDEX IF NOT EXISTS agg_managers_spending ON agg_managers (total_spending);
+
+CREATE TABLE IF NOT EXISTS agg_seasons (
+    season_id INTEGER PRIMARY KEY REFERENCES seasons,
+    players INTEGER NOT NULL, average_age REAL,
+    youngest_player_id INTEGER, youngest_age INTEGER, youngest_position TEXT,
+    top_signing_player_id INTEGER, top_signing_fee INTEGER,
+    total_spending INTEGER NOT NULL
+);
+'''
+
+_REFRESH_PLAYERS = '''
+DELETE FROM agg_players WHERE player_id IN (SELECT player_id FROM dirty_players);
+INSERT INTO agg_players
+SELECT f.player_id, COUNT(DISTINCT f.season_id), MIN(s.season), MAX(s.season),
+       (SELECT GROUP_CONCAT(season, ', ') FROM (
+            SELECT DISTINCT s2.season FROM player_season f2 JOIN seasons s2 USING (season_id)
+            WHERE f2.player_id = f.player_id ORDER BY s2.season)),
+       SUM(f.matches_played), SUM(f.matches_started), SUM(f.matches_completed),
+       SUM(f.matches_as_substitute), SUM(f.minutes_played),
+       SUM(f.goals), SUM(f.goal_contributions),
+       SUM(f.yellow_cards), SUM(f.red_cards), SUM(f.total_cards)
+FROM player_season f
+JOIN seasons s USING (season_id)
+WHERE f.player_id IN (SELECT player_id FROM dirty_players)
+GROUP BY f.player_id;
+DELETE FROM dirty_players;
+'''
+
+# Managers are aggregated by cleaned name: one manager can appear under several raw cells.
+_REFRESH_MANAGERS = '''
+CREATE TEMP TABLE IF NOT EXISTS dirty_manager_names (manager_name TEXT PRIMARY KEY);
+DELETE FROM dirty_manager_names;
+INSERT OR IGNORE INTO dirty_manager_names
+    SELECT manager_name FROM managers WHERE manager_id IN (SELECT manager_id FROM dirty_managers);
+DELETE FROM agg_managers WHERE manager_name IN (SELECT manager_name FROM dirty_manager_names);
+INSERT INTO agg_managers
+SELECT m.manager_name, COUNT(DISTINCT f.season_id), MIN(s.season), MAX(s.season),
+       MAX(s.start_year) - MIN(s.start_year) + 1,
+       COALESCE(SUM(f.transfer_value_numeric), 0), COUNT(*),
+       COUNT(DISTINCT CASE WHEN f.transfer_value_numeric > 0 THEN f.player_id END)
+FROM managers m
+JOIN player_season f USING (manager_id)
+JOIN seasons s USING (season_id)
+WHERE m.manager_name IN (SELECT manager_name FROM dirty_manager_names)
+GROUP BY m.manager_name;
+DELETE FROM dirty_managers;
+'''
+
+# Youngest and top signing take the first row in load order among ties, as the notebook's stable sort did.
+# Unknown ages (NULL, or 0 in rows stored before `ages`) count in neither the average nor the youngest.
+_REFRESH_SEASONS = '''
+DELETE FROM agg_seasons WHERE season_id IN (SELECT season_id FROM dirty_seasons);
+INSERT INTO agg_seasons
+SELECT d.season_id, COUNT(*), AVG(NULLIF(f.age, 0)),
+       y.player_id, y.age, (SELECT position FROM positions WHERE position_id = y.position_id),
+       t.player_id, t.transfer_value_numeric,
+       COALESCE(SUM(f.transfer_value_numeric), 0)
+FROM dirty_seasons d
+JOIN player_season f ON f.season_id = d.season_id
+LEFT JOIN player_season y ON y.rowid = (
+    SELECT rowid FROM player_season WHERE season_id = d.season_id AND age > 0
+    ORDER BY age, rowid LIMIT 1)
+LEFT JOIN player_season t ON t.rowid = (
+    SELECT rowid FROM player_season WHERE season_id = d.season_id AND transfer_value_numeric > 0
+    ORDER BY transfer_value_numeric DESC, rowid LIMIT 1)
+GROUP BY d.season_id;
+DELETE FROM dirty_seasons;
+UPDATE data_version SET version = version + 1;
+'''
+
+PLAYER_ORDERS = ('goal_contributions', 'minutes_played', 'total_cards', 'seasons')
+MANAGER_ORDERS = ('seasons', 'total_spending')
+
+
+def install(conn):
+    """Creates the aggregate tables and triggers; marks everything dirty the first time."""
+    existed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'agg_players'").fetchone()
+    conn.executescript(SCHEMA)
+    with conn:
+        # Counting from the creation time in ms, a rebuilt warehouse never reissues an old version.
+        conn.execute('INSERT INTO data_version SELECT ? WHERE NOT EXISTS (SELECT 1 FROM data_version)',
+                     (time.time_ns() // 1_000_000,))
+        if not existed:
+            mark_all_dirty(conn)
+
+
+def mark_all_dirty(conn):
+    """Queues every player, season and manager, for a full refresh."""
+    conn.execute('INSERT OR IGNORE INTO dirty_players SELECT player_id FROM players')
+    conn.execute('INSERT OR IGNORE INTO dirty_seasons SELECT season_id FROM seasons')
+    conn.execute('INSERT OR IGNORE INTO dirty_managers SELECT manager_id FROM managers')
+
+
+def pending(conn):
+    """Whether some write has not been folded into the aggregates yet."""
+    return conn.execute('''
+        SELECT EXISTS (SELECT 1 FROM dirty_players) OR EXISTS (SELECT 1 FROM dirty_seasons)
+            OR EXISTS (SELECT 1 FROM dirty_managers)
+    ''').fetchone()[0] == 1
+
+
+def dirty_counts(conn):
+    """(players, seasons, managers) waiting to be refreshed."""
+    return conn.execute('''
+        SELECT (SELECT COUNT(*) FROM dirty_players), (SELECT COUNT(*) FROM dirty_seasons),
+               (SELECT COUNT(*) FROM dirty_managers)
+    ''').fetchone()
+
+
+def refresh_aggregates(warehouse, full=False):
+    """Recomputes the aggregates of the keys touched since the last refresh.
+
+    Runs in the caller's transaction when one is open, in its own otherwise.
+    """
+    conn = warehouse.conn
+    if conn.in_transaction:
+        _refresh(conn, full)
+    else:
+        with conn:
+            _refresh(conn, full)
+
+
+def _refresh(conn, full):
+    if full:
+        mark_all_dirty(conn)
+    if not pending(conn):
+        return
+    # Statement by statement: executescript would commit a transaction the caller has open.
+    for script in (_REFRESH_PLAYERS, _REFRESH_MANAGERS, _REFRESH_SEASONS):
+        for statement in script.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+
+
+def _fresh(warehouse):
+    if pending(warehouse.conn):
+        refresh_aggregates(warehouse)
+    return warehouse
+
+
+def data_version(warehouse):
+    """Counter bumped by every refresh that folded in a write, pending writes included."""
+    return _fresh(warehouse).query('SELECT version FROM data_version')[0][0]
+
+
+def top_players(warehouse, order_by='goal_contributions', limit=10):
+    """(player, nationality, value, seasons) for the players ranked highest by `order_by`."""
+    if order_by not in PLAYER_ORDERS:
+        raise ValueError(f"cannot rank players by {order_by!r}")
+    return _fresh(warehouse).query(f'''
+        SELECT p.player_name, p.nationality, a.{order_by}, a.seasons
+        FROM agg_players a
+        JOIN players p USING (player_id)
+        ORDER BY a.{order_by} DESC
+        LIMIT ?
+    ''', (limit,))
+
+
+def player_summary(warehouse, player_id):
+    """The `agg_players` row of one player as a dict, or None."""
+    cursor = _fresh(warehouse).conn.execute('SELECT * FROM agg_players WHERE player_id = ?', (player_id,))
+    row = cursor.fetchone()
+    return dict(zip((c[0] for c in cursor.description), row)) if row else None
+
+
+def manager_summary(warehouse, order_by='total_spending', limit=10):
+    """(manager, seasons, first, last, years stayed, spending, signings, paid signings)."""
+    if order_by not in MANAGER_ORDERS:
+        raise ValueError(f"cannot rank managers by {order_by!r}")
+    return _fresh(warehouse).query(f'''
+        SELECT manager_name, seasons, first_season, last_season, years_stayed,
+               total_spending, signings, paid_signings
+        FROM agg_managers
+        ORDER BY {order_by} DESC, first_season
+        LIMIT ?
+    ''', (limit,))
+
+
+def season_summary(warehouse):
+    """(season, squad size, average age, spending) of every season."""
+    return _fresh(warehouse).query('''
+        SELECT s.season, a.players, ROUND(a.average_age, 2), a.total_spending
+        FROM agg_seasons a
+        JOIN seasons s USING (season_id)
+        ORDER BY s.season
+    ''')
+
+
+def youngest_per_season(warehouse):
+    """(season, player, age, position) of the youngest player of every season."""
+    return _fresh(warehouse).query('''
+        SELECT s.season, p.player_name, a.youngest_age, a.youngest_position
+        FROM agg_seasons a
+        JOIN seasons s USING (season_id)
+        LEFT JOIN players p ON p.player_id = a.youngest_player_id
+        ORDER BY s.season
+    ''')
+
+
+def top_signings(warehouse):
+    """(season, player, fee in euros) of every season's top signing; 'Free Transfer' when none was paid."""
+    return _fresh(warehouse).query('''
+        SELECT s.season, COALESCE(p.player_name, 'Free Transfer'), COALESCE(a.top_signing_fee, 0)
+        FROM agg_seasons a
+        JOIN seasons s USING (season_id)
+        LEFT JOIN players p ON p.player_id = a.top_signing_player_id
+        ORDER BY s.season
+    ''')
+
+
+def main(argv=None):
+    from .warehouse import WAREHOUSE_PATH, Warehouse
+
+    parser = argparse.ArgumentParser(description="Refresh the warehouse aggregate tables.")
+    parser.add_argument('--path', default=WAREHOUSE_PATH)
+    parser.add_argument('--full', action='store_true', help="recompute every aggregate")
+    args = parser.parse_args(argv)
+    warehouse = Warehouse(args.path)
+    try:
+        refresh_aggregates(warehouse, full=args.full)
+        counts = [warehouse.query(f'SELECT COUNT(*) FROM {table}')[0][0]
+                  for table in ('agg_players', 'agg_managers', 'agg_seasons')]
+        print("Aggregates: {} players, {} managers, {} seasons".format(*counts))
+    finally:
+        warehouse.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Vectorized versions of the `Barca_Data_Legacy.ipynb` analyses.
+
+Every function takes a history DataFrame shaped like
+`BARCA_READY_FOR_GRAPHS.xlsx` (or `storage.load_dataframe()`) and works
+on whole columns. Season-year parsing, tenure spans, free-transfer
+labelling and the per-season maxima/minima do no `apply(axis=1)`, no
+Python lambda per group, and no sort + `drop_duplicates` per question:
+
+    season_start_year    '2014-15' -> 2014, NaN when unparseable
+    tenure_years         last - first + 1, 1 where either end is unknown
+    label_free_transfers 'Free Transfer' where the fee is 0 or missing
+    top_signings         per-season argmax of the fee
+    youngest_per_season  per-season argmin of the known ages
+    least_impact         per-player minutes/matches and seasons played
+    manager_spending     spending, signings and years stayed per manager
+
+The results match the notebook cells they replace; ties go to the
+first row of the group, as after the notebook's sort.
+"""
+import numpy as np
+import pandas as pd
+
+FREE_TRANSFER = "Free Transfer"
+
+
+def season_start_year(seasons):
+    """Start year of each season label, as a nullable integer Series."""
+    seasons = pd.Series(seasons)
+    years = pd.to_numeric(seasons.astype('string').str.slice(0, 4), errors='coerce')
+    return years.astype('Int64')
+
+
+def tenure_years(first_seasons, last_seasons):
+    """Seasons spanned from `first` to `last` inclusive; 1 where either cannot be parsed."""
+    span = season_start_year(last_seasons).to_numpy(dtype='float64', na_value=np.nan) \
+        - season_start_year(first_seasons).to_numpy(dtype='float64', na_value=np.nan) + 1
+    return pd.Series(np.where(np.isnan(span), 1, span).astype('int64'),
+                     index=getattr(first_seasons, 'index', None))
+
+
+def label_free_transfers(frame, fee_column='transfer_value_numeric'):
+    """Returns a copy where rows without a paid fee name 'Free Transfer' as player and value."""
+    frame = frame.copy()
+    fee = frame[fee_column]
+    free = (fee == 0) | fee.isna()
+    frame['player_name'] = frame['player_name'].where(~free, FREE_TRANSFER)
+    if 'transfer_value' in frame:
+        frame['transfer_value'] = frame['transfer_value'].where(~free, FREE_TRANSFER)
+    return frame
+
+
+def _group_arg(frame, by, column, largest):
+    """Index label of the first row holding each group's max (or min); missing values lose."""
+    fill = -np.inf if largest else np.inf
+    values = pd.to_numeric(frame[column], errors='coerce').astype('float64').fillna(fill)
+    grouped = values.groupby(frame[by], sort=True)
+    return grouped.idxmax() if largest else grouped.idxmin()
+
+
+def top_signings(frame):
+    """(season, player_name, transfer_value_numeric) of each season's most expensive player."""
+    rows = frame.loc[_group_arg(frame, 'season', 'transfer_value_numeric', largest=True)]
+    rows = label_free_transfers(rows)
+    return rows[['season', 'player_name', 'transfer_value_numeric']].reset_index(drop=True)
+
+
+def youngest_per_season(frame):
+    """(season, player_name, age, position) of each season's youngest player.
+
+    Only known ages count: missing ones, and the 0 of rows stored before
+    `ages` (whose `age` was `matches_played`); a season with none is left out.
+    """
+    known = frame[pd.to_numeric(frame['age'], errors='coerce') > 0]
+    rows = known.loc[_group_arg(known, 'season', 'age', largest=False)]
+    return rows[['season', 'player_name', 'age', 'position']].reset_index(drop=True)
+
+
+def season_lists(frame, by='player_name'):
+    """Comma-joined distinct seasons per group (groups sorted), in order of first appearance."""
+    group_codes, groups = pd.factorize(frame[by], sort=True)
+    season_codes, seasons = pd.factorize(frame['season'])
+    # First row of every distinct (group, season) pair, in row order, then grouped stably.
+    _, first = np.unique(group_codes.astype(np.int64) * len(seasons) + season_codes, return_index=True)
+    first.sort()
+    order = np.argsort(group_codes[first], kind='stable')
+    pair_groups, pair_seasons = group_codes[first][order], season_codes[first][order]
+    starts = np.flatnonzero(np.r_[True, pair_groups[1:] != pair_groups[:-1]])
+    labels = np.array([f'{season}, ' for season in seasons], dtype=object)[pair_seasons]
+    # One C-level string reduction per group instead of a Python join per group.
+    joined = np.add.reduceat(labels, starts) if len(labels) else labels
+    return pd.Series([text[:-2] for text in joined], index=pd.Index(groups[pair_groups[starts]], name=by),
+                     name='season')
+
+
+def least_impact(frame, limit=15):
+    """Players with the fewest minutes (above zero), with their total matches and seasons."""
+    codes, players = pd.factorize(frame['player_name'], sort=True)
+    totals = pd.DataFrame({
+        column: np.bincount(codes, weights=frame[column].to_numpy(dtype='float64'),
+                            minlength=len(players)).astype('int64')
+        for column in ('minutes_played', 'matches_played')
+    }, index=pd.Index(players, name='player_name'))
+    totals = totals.sort_values('minutes_played', kind='stable')
+    totals = totals[totals['minutes_played'] > 0].head(limit)
+    # Season lists only for the players in the result.
+    shown = np.isin(codes, players.get_indexer(totals.index))
+    totals['season'] = season_lists(frame[shown])
+    return totals
+
+
+def manager_spending(frame, paid_only=True):
+    """Spending, signings and years stayed per manager, highest spending first.
+
+    With `paid_only` (the notebook's final dashboard) only rows with a fee
+    count, and signings are distinct players; otherwise every row counts.
+    """
+    if paid_only:
+        frame = frame[frame['transfer_value_numeric'] > 0]
+    stats = frame.groupby('manager_name').agg(
+        total_spending=('transfer_value_numeric', 'sum'),
+        signings=('player_name', 'nunique' if paid_only else 'count'),
+        first_season=('season', 'min'),
+        last_season=('season', 'max'),
+    ).reset_index()
+    stats['years_stayed'] = tenure_years(stats['first_season'], stats['last_season'])
+    return stats.sort_values('total_spending', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def top_contributors(frame, limit=10):
+    return frame.groupby('player_name')['goal_contributions'].sum().nlargest(limit)
+
+
+def appearance_stats(frame):
+    return frame.groupby('player_name')[['matches_played', 'minutes_played']].sum() \
+        .sort_values('minutes_played', ascending=False)
+
+
+def discipline_stats(frame):
+    return frame.groupby('player_name')[['yellow_cards', 'red_cards', 'total_cards']].sum() \
+        .sort_values('total_cards', ascending=False)
+
+
+def loyalty(frame):
+    return frame.groupby('player_name')['season'].count().sort_values(ascending=False)
+
+
+def manager_loyalty(frame):
+    return frame.groupby('manager_name')['season'].nunique().sort_values(ascending=False)
@@ -0,0 +1,338 @@
+"""Read-only JSON API over the warehouse, on asyncio.
+
+    python -m barca_data.api [--path WAREHOUSE] [--host 127.0.0.1] [--port 8765] [--cache 256]
+
+serves, in place of the one-off Excel summaries:
+
+    /api/version                    {"version": the warehouse data version}
+    /api/managers?order_by=&limit=  manager dashboard (BARCA_MANAGER_DASHBOARD_FINAL.xlsx)
+    /api/youngest                   youngest player per season (BARCA_YOUNGEST_PER_SEASON.xlsx)
+    /api/signings                   top signing per season (BARCA_SEASONAL_SUMMARY_FINAL.xlsx)
+    /api/players?order_by=&limit=   career leaders
+    /api/players/ID                 one player's career totals and seasons
+    /api/seasons                    every season, with squad size, average age and spending
+    /api/seasons/SEASON             one season's squad ('2015-16' or '2015')
+
+Ages are those of `ages` (a warehouse loaded before it is migrated when
+opened): `age` is null for a player whose age is unknown, and the
+youngest player and average age of a season count known ages only.
+
+Results are cached in-process, gzipped once, in an LRU of `--cache`
+entries keyed by path and query, and carry a strong ETag made of the
+warehouse's `data_version` (bumped by every aggregate refresh, so by
+every load); `If-None-Match` is answered with 304 once the path has
+resolved, which for a cached result takes no query. The version is checked at most once
+per `check_interval`, through SQLite's `PRAGMA data_version`, and a new
+version empties the cache: concurrent users of the dashboard share one
+query per distinct request and version. Queries run on one thread that
+owns the warehouse connection, and requests that miss on the same key
+while its query runs wait for that query instead of repeating it.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from . import aggregates
+from .warehouse import WAREHOUSE_PATH, Warehouse
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 256
+MIN_GZIP_BYTES = 512
+MAX_ROW_ID = 2 ** 63 - 1     # SQLite integers are signed 64-bit
+
+MANAGER_COLUMNS = ('manager_name', 'seasons', 'first_season', 'last_season', 'years_stayed',
+                   'total_spending', 'signings', 'paid_signings')
+SQUAD_COLUMNS = ('player_id', 'player_name', 'season', 'nationality', 'position', 'age', 'matches_played',
+                 'matches_started', 'matches_completed', 'matches_as_substitute', 'minutes_played',
+                 'goals', 'goal_contributions', 'yellow_cards', 'red_cards', 'total_cards',
+                 'manager_name', 'transfer_value', 'transfer_value_numeric', 'transfer_status')
+
+# `body` is the JSON, `gzipped` its gzip encoding (None when too small to be worth it).
+Entry = namedtuple('Entry', 'body gzipped')
+Response = namedtuple('Response', 'status headers body')
+
+
+class NotFound(LookupError):
+    pass
+
+
+class ResultCache:
+    """Least-recently-used mapping of at most `maxsize` entries."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _records(columns, rows):
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _int(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+def _row_id(key):
+    """`key` as a row id, or None unless it is ASCII digits SQLite's 64-bit integers can hold."""
+    if key.isascii() and key.isdigit() and len(key) <= 19 and int(key) <= MAX_ROW_ID:
+        return int(key)
+    return None
+
+
+def _squad(warehouse, where, params):
+    return _records(SQUAD_COLUMNS, warehouse.query(
+        f"SELECT {', '.join(SQUAD_COLUMNS)} FROM players_stats WHERE {where} ORDER BY season, minutes_played DESC",
+        params))
+
+
+def route(warehouse, path, params):
+    """The JSON-ready result of an API path; raises `NotFound` or `ValueError` (a bad parameter)."""
+    parts = [unquote(part) for part in path.strip('/').split('/')]
+    if parts[:1] != ['api'] or len(parts) > 3:
+        raise NotFound(path)
+    name, key = (parts[1:] + [None, None])[:2]
+    if name == 'version' and key is None:
+        return {'version': aggregates.data_version(warehouse)}
+    if name == 'managers' and key is None:
+        rows = aggregates.manager_summary(warehouse, params.get('order_by', 'total_spending'),
+                                          _int(params, 'limit', -1))
+        return _records(MANAGER_COLUMNS, rows)
+    if name == 'youngest' and key is None:
+        return _records(('season', 'player_name', 'age', 'position'), aggregates.youngest_per_season(warehouse))
+    if name == 'signings' and key is None:
+        return _records(('season', 'player_name', 'transfer_value_numeric'), aggregates.top_signings(warehouse))
+    if name == 'players' and key is None:
+        order_by = params.get('order_by', 'goal_contributions')
+        rows = aggregates.top_players(warehouse, order_by, _int(params, 'limit', 10))
+        return _records(('player_name', 'nationality', order_by, 'seasons'), rows)
+    if name == 'players':
+        player_id = _row_id(key)
+        summary = aggregates.player_summary(warehouse, player_id) if player_id is not None else None
+        if summary is None:
+            raise NotFound(path)
+        name_row = warehouse.query('SELECT player_name, nationality FROM players WHERE player_id = ?',
+                                   (summary['player_id'],))[0]
+        return {'player_name': name_row[0], 'nationality': name_row[1], **summary,
+                'seasons': _squad(warehouse, 'player_id = ?', (summary['player_id'],))}
+    if name == 'seasons' and key is None:
+        return _records(('season', 'players', 'average_age', 'total_spending'), aggregates.season_summary(warehouse))
+    if name == 'seasons':
+        column = 'start_year' if _row_id(key) is not None else 'season'
+        found = warehouse.query(f'SELECT season FROM seasons WHERE {column} = ?', (key,))
+        if not found:
+            raise NotFound(path)
+        return {'season': found[0][0], 'squad': _squad(warehouse, 'season = ?', (found[0][0],))}
+    raise NotFound(path)
+
+
+class Api:
+    """Answers requests from the warehouse at `path`, through the result cache."""
+
+    def __init__(self, path=WAREHOUSE_PATH, cache_size=DEFAULT_CACHE_SIZE, check_interval=1.0):
+        self.path = path
+        self.cache = ResultCache(cache_size)
+        self.check_interval = check_interval
+        self.stats = {'requests': 0, 'hits': 0, 'queries': 0, 'not_modified': 0, 'invalidations': 0}
+        self.version = None
+        self._checked = 0.0
+        self._seen = None
+        self._warehouse = None
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='warehouse')
+
+    def _open(self):
+        if self._warehouse is None:
+            self._warehouse = Warehouse(self.path)
+        return self._warehouse
+
+    def _read_version(self):
+        # PRAGMA data_version changes whenever another connection commits; only then is the table read.
+        warehouse = self._open()
+        seen = warehouse.conn.execute('PRAGMA data_version').fetchone()[0]
+        if seen != self._seen or self.version is None:
+            self._seen = seen
+            return aggregates.data_version(warehouse)
+        return self.version
+
+    def _compute(self, path, params):
+        body = json.dumps(route(self._open(), path, params), ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+        return Entry(body, gzip.compress(body, 6) if len(body) >= MIN_GZIP_BYTES else None)
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def current_version(self):
+        now = time.monotonic()
+        if self.version is None or now - self._checked >= self.check_interval:
+            self._checked = now
+            version = await self._run(self._read_version)
+            if version != self.version:
+                if self.version is not None:
+                    self.stats['invalidations'] += 1
+                self.cache.clear()
+                self.version = version
+        return self.version
+
+    async def result(self, path, params):
+        """`(Entry, version)` of a request, from the cache or a single shared query."""
+        version = await self.current_version()
+        key = (path, tuple(sorted(params.items())))
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry, version
+        pending = self._pending.get(key)
+        if pending is None:
+            self.stats['queries'] += 1
+            pending = self._pending[key] = asyncio.ensure_future(self._run(self._compute, path, params))
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        entry = await pending
+        if version == self.version:  # not invalidated while the query ran
+            self.cache.put(key, entry)
+        return entry, version
+
+    async def respond(self, method, target, headers):
+        """The `Response` to a request; `headers` have lower-case names."""
+        self.stats['requests'] += 1
+        if method not in ('GET', 'HEAD'):
+            return self._error(405, f"{method} not allowed", [('Allow', 'GET, HEAD')])
+        url = urlsplit(target)
+        # The path is resolved first, so that a validator never turns a 404 or 400 into a 304.
+        try:
+            entry, version = await self.result(url.path, dict(parse_qsl(url.query)))
+        except NotFound:
+            return self._error(404, f"no such resource: {url.path}")
+        except ValueError as error:
+            return self._error(400, str(error))
+        validators = [tag.strip() for tag in headers.get('if-none-match', '').split(',')]
+        for etag in (f'"{version}"', f'"{version}-gzip"'):
+            if etag in validators:
+                self.stats['not_modified'] += 1
+                return Response(304, self._headers(etag, version), b'')
+
+        gzipped = entry.gzipped is not None and 'gzip' in headers.get('accept-encoding', '')
+        response_headers = self._headers(f'"{version}-gzip"' if gzipped else f'"{version}"', version)
+        if gzipped:
+            response_headers.append(('Content-Encoding', 'gzip'))
+        response_headers.append(('Content-Type', 'application/json; charset=utf-8'))
+        return Response(200, response_headers, entry.gzipped if gzipped else entry.body)
+
+    def _headers(self, etag, version):
+        return [('ETag', etag), ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding'),
+                ('X-Data-Version', str(version))]
+
+    def _error(self, status, message, extra=()):
+        body = json.dumps({'error': message}).encode('utf-8')
+        return Response(status, [('Content-Type', 'application/json; charset=utf-8'), *extra], body)
+
+    async def handle_connection(self, reader, writer):
+        """Serves HTTP/1.1 requests on one connection, keeping it alive between them."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, protocol = request_line.split(' ')
+                except ValueError:
+                    break
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    if value:
+                        headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length', '0') != '0':
+                    await reader.readexactly(int(headers['content-length']))
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if protocol == 'HTTP/1.0' else connection != 'close'
+
+                response = await self.respond(method, target, headers)
+                status_line = f'HTTP/1.1 {response.status} {_REASONS[response.status]}\r\n'
+                lines = [f'{name}: {value}\r\n' for name, value in response.headers]
+                lines.append(f'Content-Length: {len(response.body)}\r\n')
+                lines.append('Access-Control-Allow-Origin: *\r\n')
+                if not keep_alive:
+                    lines.append('Connection: close\r\n')
+                writer.write((status_line + ''.join(lines) + '\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(response.body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        if self._warehouse is not None:
+            self._executor.submit(self._warehouse.close).result()
+        self._executor.shutdown()
+
+
+_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+async def serve(api, host='127.0.0.1', port=DEFAULT_PORT, ready=None):
+    """Runs the server until cancelled; `ready(server)` is called once it listens."""
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the warehouse summaries as JSON.")
+    parser.add_argument('--path', default=WAREHOUSE_PATH)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache', type=int, default=DEFAULT_CACHE_SIZE, help="cached results (0 disables)")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        raise SystemExit(f"no warehouse at {args.path}; build it with `python -m barca_data load`")
+
+    api = Api(args.path, args.cache)
+    try:
+        asyncio.run(serve(api, args.host, args.port,
+                          lambda server: print(f"Serving {args.path} on http://{args.host}:{args.port}/api/")))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""Resized, content-hashed WebP/AVIF variants of the images under `Barca/contents/`.
+
+    python -m barca_data.assets [--workers N] [--widths 480 960 1600] [--formats avif webp]
+
+Every still image is scaled down to each of `--widths` (never up: an
+image narrower than a width gets one variant at its own size) and
+encoded in each of `--formats`; an animated GIF or WebP becomes a single
+animated WebP, a fraction of the GIF's size. Variants are written to
+`Barca/assets/`, mirroring the folders of `contents/`, as
+`NAME.WIDTHw.HASH.EXT` with HASH a hash of the file's bytes, so that
+they can be served with a year-long immutable Cache-Control. The
+manifest maps each source to its variants:
+
+    assets/manifest.json    {"widths": [480, 960, 1600], "formats": ["avif", "webp"],
+                             "images": {"contents/1979-1980/squad.jpg":
+                               {"hash": source hash, "width": 1600, "height": 1067, "animated": false,
+                                "variants": {"avif": [[480, "assets/1979-1980/squad.480w.HASH.avif"], ...],
+                                             "webp": [...]}}}}
+
+A source whose hash is unchanged and whose variants are all on disk is
+skipped, and files no longer in the manifest are removed. Images are
+encoded on a pool of `--workers` processes (0 encodes inline). Pillow is
+needed to encode, with AVIF support (Pillow 11.3 or later) for AVIF;
+without it only WebP is written. `dashboard` reads the manifest to give
+every `<img>` a `srcset` and `loading="lazy"`. `assets/` is generated,
+not checked in: a deploy runs this stage, then `dashboard`.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+BARCA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONTENTS_DIR = os.path.join(BARCA_DIR, 'contents')
+ASSETS_DIR = os.path.join(BARCA_DIR, 'assets')
+MANIFEST_NAME = 'manifest.json'
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif'}
+DEFAULT_WIDTHS = (480, 960, 1600)
+DEFAULT_FORMATS = ('avif', 'webp')
+# Pillow save options per format; AVIF at speed 6 is about as fast as WebP at method 4.
+ENCODERS = {
+    'avif': {'format': 'AVIF', 'quality': 55, 'speed': 6},
+    'webp': {'format': 'WEBP', 'quality': 75, 'method': 4},
+}
+# Layout hint of the generated `srcset`s: images never show wider than the extra-large modal.
+SIZES = '(max-width: 1200px) 100vw, 1140px'
+
+AssetBuild = namedtuple('AssetBuild', 'images encoded skipped removed failed bytes_in bytes_out')
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def slug(name):
+    """File-name stem safe to use unquoted in a `srcset` (no spaces or commas)."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'image'
+
+
+def sources(contents_dir=CONTENTS_DIR):
+    """Paths of the images under `contents_dir`, relative to its parent, with '/' separators."""
+    root = os.path.dirname(contents_dir)
+    found = []
+    for directory, _, names in os.walk(contents_dir):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                found.append(os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def available_formats(formats):
+    """`formats` less those this Pillow cannot write."""
+    from PIL import features
+
+    return tuple(f for f in formats if f != 'avif' or features.check('avif'))
+
+
+def _save(image, out_dir, rel_dir, stem, width, fmt, **options):
+    """Encodes `image`; writes it under its content hash and returns its path relative to `out_dir`'s parent."""
+    buffer = io.BytesIO()
+    image.save(buffer, **ENCODERS[fmt], **options)
+    data = buffer.getvalue()
+    name = f'{stem}.{width}w.{hashlib.blake2b(data, digest_size=5).hexdigest()}.{fmt}'
+    path = os.path.join(out_dir, rel_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+    return os.path.relpath(path, os.path.dirname(out_dir)).replace(os.sep, '/')
+
+
+def encode_image(root, source, out_dir, widths, formats):
+    """The manifest entry of `source` (relative to `root`), after writing its variants under `out_dir`."""
+    from PIL import Image, ImageOps
+
+    rel_dir = os.path.dirname(source.split('/', 1)[1]) if '/' in source else ''
+    stem = slug(os.path.splitext(os.path.basename(source))[0])
+    path = os.path.join(root, source)
+    with Image.open(path) as image:
+        width, height = image.size
+        entry = {'hash': file_hash(path), 'width': width, 'height': height, 'animated': False, 'variants': {}}
+        if getattr(image, 'n_frames', 1) > 1:
+            entry['animated'] = True
+            entry['variants']['webp'] = [[width, _save(image, out_dir, rel_dir, stem, width, 'webp', save_all=True,
+                                                       loop=image.info.get('loop', 0))]]
+            return entry
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        for fmt in formats:
+            entry['variants'][fmt] = []
+            for target in sorted({min(w, width) for w in widths}):
+                scaled = image if target == width else \
+                    image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+                entry['variants'][fmt].append([target, _save(scaled, out_dir, rel_dir, stem, target, fmt)])
+    return entry
+
+
+def load_manifest(assets_dir=ASSETS_DIR):
+    """The asset manifest; without images when the assets were never built."""
+    path = os.path.join(assets_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'widths': [], 'formats': [], 'images': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _variant_paths(entry):
+    return [path for variants in entry['variants'].values() for _, path in variants]
+
+
+def _current(entry, source_hash, formats, out_root):
+    return (entry is not None and entry['hash'] == source_hash
+            and (entry['animated'] or set(entry['variants']) == set(formats))
+            and all(os.path.exists(os.path.join(out_root, path)) for path in _variant_paths(entry)))
+
+
+def build_assets(contents_dir=CONTENTS_DIR, assets_dir=ASSETS_DIR, widths=DEFAULT_WIDTHS,
+                 formats=DEFAULT_FORMATS, workers=None):
+    """Brings `assets_dir` and its manifest up to date with `contents_dir`; returns an `AssetBuild`."""
+    root, out_root = os.path.dirname(contents_dir), os.path.dirname(assets_dir)
+    formats = available_formats(formats)
+    widths = tuple(sorted(widths))
+    previous = load_manifest(assets_dir)
+    same_options = previous['widths'] == list(widths) and previous['formats'] == list(formats)
+    images, todo, failed = {}, [], []
+    for source in sources(contents_dir):
+        entry = previous['images'].get(source)
+        if same_options and _current(entry, file_hash(os.path.join(root, source)), formats, out_root):
+            images[source] = entry
+        else:
+            todo.append(source)
+
+    def record(source, encode):
+        try:
+            images[source] = encode()
+        except Exception as e:  # an unreadable image is reported, never fatal
+            failed.append((source, f'{type(e).__name__}: {e}'))
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers == 0:
+        for source in todo:
+            record(source, lambda: encode_image(root, source, assets_dir, widths, formats))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [(source, pool.submit(encode_image, root, source, assets_dir, widths, formats))
+                       for source in todo]
+            for source, future in futures:
+                record(source, future.result)
+
+    images = {source: images[source] for source in sorted(images)}
+    manifest = {'widths': list(widths), 'formats': list(formats), 'images': images}
+    os.makedirs(assets_dir, exist_ok=True)
+    manifest_path = os.path.join(assets_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    referenced = {os.path.normpath(os.path.join(out_root, path))
+                  for entry in images.values() for path in _variant_paths(entry)}
+    removed = 0
+    for directory, _, names in os.walk(assets_dir):
+        for name in names:
+            path = os.path.normpath(os.path.join(directory, name))
+            if name != MANIFEST_NAME and path not in referenced:
+                os.remove(path)
+                removed += 1
+    bytes_in = sum(os.path.getsize(os.path.join(root, source)) for source in images)
+    bytes_out = sum(os.path.getsize(path) for path in referenced)
+    encoded = len(todo) - len(failed)
+    return AssetBuild(len(images), encoded, len(images) - encoded, removed, failed, bytes_in, bytes_out)
+
+
+def _srcset(variants):
+    return ', '.join(f'{path} {width}w' for width, path in variants)
+
+
+def responsive_images(html, images, lazy=True):
+    """`html` with every `<img>` whose `src` is in `images` (the manifest's) pointed at its variants.
+
+    A still image gets a WebP `srcset` (and, when built, an AVIF `<source>`
+    in a `<picture>`); an animated one its animated WebP. With `lazy`,
+    images are also given `loading="lazy"`. Other images are left alone.
+    """
+    def rewrite(match):
+        tag = match.group(0)
+        src = re.search(r'\ssrc="([^"]*)"', tag)
+        entry = images.get(src.group(1)) if src else None
+        if entry is None:
+            return tag
+        webp = entry['variants'].get('webp')
+        if not webp:
+            return tag
+        attributes = f' src="{webp[-1][1]}"'
+        if not entry['animated']:
+            attributes += f' srcset="{_srcset(webp)}" sizes="{SIZES}"'
+        if lazy and 'loading=' not in tag:
+            attributes += ' loading="lazy"'
+        if 'decoding=' not in tag:
+            attributes += ' decoding="async"'
+        tag = tag[:src.start()] + attributes + tag[src.end():]
+        avif = entry['variants'].get('avif')
+        if avif and not entry['animated']:
+            tag = f'<picture><source type="image/avif" srcset="{_srcset(avif)}" sizes="{SIZES}">{tag}</picture>'
+        return tag
+
+    return re.sub(r'<img\b[^>]*>', rewrite, html)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build resized, content-hashed variants of the site images.")
+    parser.add_argument('--contents', default=CONTENTS_DIR)
+    parser.add_argument('--out', default=ASSETS_DIR)
+    parser.add_argument('--widths', type=int, nargs='+', default=list(DEFAULT_WIDTHS))
+    parser.add_argument('--formats', nargs='+', choices=sorted(ENCODERS), default=list(DEFAULT_FORMATS))
+    parser.add_argument('--workers', type=int, help="encoding processes (default: one per CPU, 0 encodes inline)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = build_assets(args.contents, args.out, args.widths, args.formats, args.workers)
+    for source, error in result.failed:
+        print(f"  failed {source}: {error}")
+    print(f"{result.images} images: {result.encoded} encoded, {result.skipped} unchanged, "
+          f"{result.removed} stale files removed, {len(result.failed)} failed, "
+          f"in {time.perf_counter() - start:.1f}s")
+    print(f"sources {result.bytes_in / 2 ** 20:.1f} MB -> variants {result.bytes_out / 2 ** 20:.1f} MB")
+    return 1 if result.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks for the scrape pipeline, runnable offline against stand-in data."""
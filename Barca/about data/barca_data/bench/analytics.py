@@ -0,0 +1,154 @@
+"""Notebook analyses vs. `analytics`, on synthetic histories 100x and 1000x the real one.
+
+    python -m barca_data.bench.analytics [--scales 100 1000] [--reference-max 100]
+
+Synthetic rows follow the shape of the real history: ~3 rows per player,
+47 seasons, one manager per season, 1 in 8 rows with a fee. The row-wise
+notebook code only runs up to `--reference-max` (it takes minutes at
+1000x); where both run the results are checked to agree.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .. import analytics
+
+BASE_ROWS = 1502  # rows in BARCA_READY_FOR_GRAPHS.xlsx
+SEASONS = [f'{year}-{(year + 1) % 100:02d}' for year in range(1979, 2026)]
+
+
+def synthetic_history(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    season_codes = np.sort(rng.integers(0, len(SEASONS), rows))
+    players = rng.integers(0, max(rows // 3, 1), rows)
+    fee = np.where(rng.random(rows) < 0.125, rng.integers(1, 200, rows) * 500_000, 0)
+    age = rng.integers(16, 39, rows).astype('float64')
+    age[rng.random(rows) < 0.02] = np.nan
+    yellow = rng.integers(0, 12, rows)
+    red = rng.integers(0, 2, rows)
+    return pd.DataFrame({
+        'player_name': pd.Series(players).map('Player {}'.format),
+        'season': np.array(SEASONS, dtype=object)[season_codes],
+        'position': rng.choice(['Goalkeeper', 'Defender', 'Midfielder', 'Forward'], rows),
+        'age': age,
+        'matches_played': rng.integers(0, 50, rows),
+        'minutes_played': rng.integers(0, 4000, rows),
+        'yellow_cards': yellow,
+        'red_cards': red,
+        'total_cards': yellow + red,
+        'goal_contributions': rng.integers(0, 30, rows),
+        'manager_name': pd.Series(season_codes % 19).map('Manager {}'.format),
+        'transfer_value': np.where(fee > 0, (fee / 1e6).round(2).astype(str) + 'M', '0'),
+        'transfer_value_numeric': fee,
+    })
+
+
+# --- the notebook cells, as written there ---
+
+def notebook_top_signings(df4):
+    df_sorted = df4.sort_values(by=['season', 'transfer_value_numeric'], ascending=[True, False])
+    top = df_sorted.drop_duplicates(subset='season', keep='first').copy()
+
+    def update_free_seasons(row):
+        if row['transfer_value_numeric'] == 0 or pd.isna(row['transfer_value_numeric']):
+            row['player_name'] = "Free Transfer"
+            row['transfer_value'] = "Free Transfer"
+        return row
+
+    top = top.apply(update_free_seasons, axis=1)
+    return top[['season', 'player_name', 'transfer_value_numeric']].reset_index(drop=True)
+
+
+def notebook_youngest(df4):
+    df_youngest = df4.sort_values(by=['season', 'age'], ascending=[True, True])
+    youngest = df_youngest.drop_duplicates(subset='season', keep='first').copy()
+    return youngest[['season', 'player_name', 'age', 'position']].reset_index(drop=True)
+
+
+def notebook_least_impact(df4):
+    least = df4.groupby('player_name').agg({
+        'minutes_played': 'sum',
+        'matches_played': 'sum',
+        'season': lambda x: ', '.join(x.unique()),
+    }).sort_values(by='minutes_played', ascending=True)
+    return least[least['minutes_played'] > 0].head(15)
+
+
+def notebook_manager_spending(df4):
+    paid_df = df4[df4['transfer_value_numeric'] > 0].copy()
+    stats = paid_df.groupby('manager_name').agg({
+        'transfer_value_numeric': 'sum',
+        'player_name': 'nunique',
+        'season': ['min', 'max'],
+    }).reset_index()
+    stats.columns = ['Manager Name', 'Total Spending (M€)', 'Number of Signings', 'First Season', 'Last Season']
+
+    def get_tenure(row):
+        try:
+            start = int(str(row['First Season']).split('-')[0])
+            end = int(str(row['Last Season']).split('-')[0])
+            return (end - start) + 1
+        except Exception:
+            return 1
+
+    stats['Years Stayed'] = stats.apply(get_tenure, axis=1)
+    return stats.sort_values(by='Total Spending (M€)', ascending=False).reset_index(drop=True)
+
+
+PAIRS = {
+    'top signings': (notebook_top_signings, analytics.top_signings),
+    'youngest per season': (notebook_youngest, analytics.youngest_per_season),
+    'least impact': (notebook_least_impact, analytics.least_impact),
+    'manager spending': (notebook_manager_spending, analytics.manager_spending),
+}
+
+
+def _agree(name, old, new):
+    if name == 'manager spending':
+        old = old.iloc[:, [0, 1, 2, 5]].to_numpy().tolist()
+        new = new[['manager_name', 'total_spending', 'signings', 'years_stayed']].to_numpy().tolist()
+        return sorted(old) == sorted(new)
+    if name == 'least impact':
+        # The notebook's (unstable) sort may order players with equal minutes differently.
+        shared = old.index.intersection(new.index)
+        return old['minutes_played'].tolist() == new['minutes_played'].tolist() \
+            and old.loc[shared].astype(str).equals(new.loc[shared, old.columns].astype(str))
+    return old.astype(str).equals(new.astype(str))
+
+
+def _time(function, frame):
+    start = time.perf_counter()
+    result = function(frame)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--reference-max', type=int, default=100,
+                        help="largest scale the row-wise notebook code is timed at")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for scale in args.scales:
+        frame = synthetic_history(BASE_ROWS * scale)
+        print(f"x{scale}: {len(frame):,} rows")
+        for name, (reference, vectorized) in PAIRS.items():
+            new_time, new = _time(vectorized, frame)
+            if scale > args.reference_max:
+                print(f"  {name:20} {new_time * 1000:9.1f} ms")
+                continue
+            old_time, old = _time(reference, frame)
+            agree = _agree(name, old, new)
+            failed = failed or not agree
+            print(f"  {name:20} {new_time * 1000:9.1f} ms  (notebook {old_time * 1000:9.1f} ms, "
+                  f"x{old_time / new_time:5.1f})  {'ok' if agree else 'MISMATCH'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Concurrent dashboard users against the JSON API, with and without its result cache.
+
+    python -m barca_data.bench.api [--clients 8] [--requests 200] [--cache 256]
+
+Builds a warehouse from the decade databases, starts `api` on a free port
+and has `--clients` keep-alive clients each issue `--requests` requests
+over the dashboard's endpoints, as first visits (no validator) and as
+revisits that revalidate with `If-None-Match`, as a browser does. Prints
+requests per second and warehouse queries for the cached server and for
+one with `--cache 0`, then checks that a write to the warehouse changes
+the ETags and that bad paths get 404, even with a current validator.
+"""
+import argparse
+import asyncio
+import http.client
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from ..api import Api, serve
+from ..warehouse import Warehouse, build_warehouse
+
+PATHS = ['/api/managers', '/api/youngest', '/api/signings', '/api/seasons', '/api/players?limit=20',
+         '/api/players?order_by=minutes_played', '/api/seasons/2015', '/api/seasons/1992-93', '/api/players/1']
+BAD_PATHS = ['/api/nothing', '/api/players/0', '/api/players/99999999999999999999999', '/api/players/%D9%A1',
+             '/api/seasons/99999999999999999999999']
+
+
+class Running:
+    """`api` served on a background thread's event loop."""
+
+    def __init__(self, api):
+        self.api = api
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+
+        def ready(server):
+            self.port = server.sockets[0].getsockname()[1]
+            self._started.set()
+
+        self._task = self.loop.create_task(serve(self.api, port=0, ready=ready))
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join()
+        self.api.close()
+
+
+def get(conn, path, etag=None):
+    headers = {'Accept-Encoding': 'gzip'}
+    if etag:
+        headers['If-None-Match'] = etag
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status, response.getheader('ETag')
+
+
+def client(port, requests, seed, statuses, revalidate):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    etags = {}
+    rng = random.Random(seed)
+    for _ in range(requests):
+        path = rng.choice(PATHS)
+        status, etag = get(conn, path, etags.get(path))
+        if revalidate:
+            etags[path] = etag
+        statuses.append(status)
+    conn.close()
+
+
+def run(api, clients, requests, revalidate):
+    server = Running(api)
+    statuses = []
+    threads = [threading.Thread(target=client, args=(server.port, requests, i, statuses, revalidate))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.stop()
+    return elapsed, statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="requests per client")
+    parser.add_argument('--cache', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'warehouse.db')
+        build_warehouse(path=path)
+        total = args.clients * args.requests
+        print(f"{args.clients} clients x {args.requests} requests")
+        for revalidate in (False, True):
+            for name, cache in (('cached', args.cache), ('no cache', 0)):
+                api = Api(path, cache)
+                elapsed, statuses = run(api, args.clients, args.requests, revalidate)
+                name = f"{'revisits' if revalidate else 'first visits'}, {name}"
+                print(f"  {name:24} {total / elapsed:8.0f} req/s  {api.stats['queries']:5} queries"
+                      f"  {statuses.count(304):5} not modified")
+
+        server = Running(Api(path, args.cache, check_interval=0))
+        conn = http.client.HTTPConnection('127.0.0.1', server.port)
+        _, before = get(conn, '/api/seasons/2015')
+        warehouse = Warehouse(path)
+        with warehouse.conn:
+            warehouse.conn.execute('UPDATE player_season SET goals = goals + 1 WHERE rowid = 1')
+        warehouse.close()
+        status, after = get(conn, '/api/seasons/2015', before)
+        missing = {bad: get(conn, bad, after)[0] for bad in BAD_PATHS}
+        conn.close()
+        server.stop()
+    wrong = {bad: code for bad, code in missing.items() if code != 404}
+    if status != 200 or after == before:
+        print(f"STALE: {status} {before} -> {after}")
+    elif wrong:
+        print(f"MISMATCH: not 404 for {wrong}")
+    else:
+        print('ok')
+    if status != 200 or after == before or wrong:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Cold, warm and offline rebuilds through the on-disk page cache.
+
+    python -m barca_data.bench.cache [--db PATH] [--latency S]
+
+Crawls every season of a decade database three times against the local
+stand-in server: with an empty cache, with a warm cache, and offline.
+"""
+import argparse
+import tempfile
+import time
+
+from ..cache import ResponseCache
+from ..crawler import SeasonCrawler
+from ..fixtures import pages_from_db
+from .crawl import DEFAULT_DB
+from .server import StandInServer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB, help="decade database to render pages from")
+    parser.add_argument('--latency', type=float, default=0.2, help="simulated seconds per request")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    pages = pages_from_db(args.db)
+    years = [int(label[:4]) for label in pages]
+    with tempfile.TemporaryDirectory() as cache_dir, StandInServer(pages, latency=args.latency) as server:
+        for run, offline in (('cold', False), ('warm', False), ('offline', True)):
+            cache = ResponseCache(cache_dir, offline=offline)
+            crawler = SeasonCrawler(max_workers=args.workers, base_url=server.base_url, cache=cache)
+            served = server.requests_served
+            start = time.perf_counter()
+            rows = sum(len(result.columns or ()) for result in crawler.crawl(years))
+            elapsed = time.perf_counter() - start
+            print(f"{run:<8} rows={rows:<5} requests={server.requests_served - served:<3} "
+                  f"{elapsed:7.3f}s  {cache.stats}")
+            crawler.close()
+
+
+if __name__ == '__main__':
+    main()
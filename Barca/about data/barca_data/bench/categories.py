@@ -0,0 +1,67 @@
+"""Object-dtype text columns vs. `category` dtypes, on a synthetic history.
+
+    python -m barca_data.bench.categories [--scale 100] [--repeat 5]
+
+The synthetic history of `bench.analytics` keeps its repeated text
+columns (season, position, manager) as Python strings, as a history read
+from Excel or SQL does. `categories.categorize` turns them into
+dictionary-encoded `category` columns. Prints the memory of both frames
+and the best time of the notebook's `value_counts`/`groupby` calls on
+each, and checks that the `analytics` functions give the same results.
+"""
+import argparse
+import sys
+import time
+
+from .. import analytics
+from ..categories import categorize
+from .analytics import BASE_ROWS, synthetic_history
+
+QUERIES = {
+    'value_counts(position)': lambda f: f['position'].value_counts(),
+    'groupby(manager).season.nunique': lambda f: f.groupby('manager_name')['season'].nunique(),
+    'groupby(season).age.mean': lambda f: f.groupby('season')['age'].mean(),
+    'groupby(position).goal_contributions.sum': lambda f: f.groupby('position')['goal_contributions'].sum(),
+}
+RESULTS = {
+    'top signings': analytics.top_signings,
+    'youngest per season': analytics.youngest_per_season,
+    'manager spending': analytics.manager_spending,
+}
+
+
+def _best(function, frame, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(frame)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _same(a, b):
+    return a.astype(str).reset_index(drop=True).equals(b.astype(str).reset_index(drop=True))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    plain = synthetic_history(BASE_ROWS * args.scale)
+    encoded = categorize(plain)
+    mb = [frame.memory_usage(deep=True).sum() / 2 ** 20 for frame in (plain, encoded)]
+    print(f"{len(plain):,} rows: {mb[0]:.1f} MB as strings, {mb[1]:.1f} MB with categories")
+    for name, query in QUERIES.items():
+        before, after = _best(query, plain, args.repeat), _best(query, encoded, args.repeat)
+        print(f"  {name:42} {before * 1000:8.1f} ms -> {after * 1000:7.1f} ms  x{before / after:5.1f}")
+
+    mismatched = [name for name, function in RESULTS.items() if not _same(function(plain), function(encoded))]
+    print('ok' if not mismatched else f"MISMATCH: {', '.join(mismatched)}")
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""Season pages with golden outputs, spanning every decade.
+
+    python -m barca_data.bench.corpus check
+    python -m barca_data.bench.corpus record [--fetch | --pages DIR]
+
+`corpus/` holds two sets of `t{season}1.html` pages, each page with a
+`{season}.json` golden file: the manager, the `c3p0` header cells and the
+rows expected from the page.
+
+    saved/        bdfutbol's own pages, trimmed of scripts, styles and
+                  comments; these are what shows a change of layout, class
+                  names or column order on the site
+    synthetic/    pages rendered by `fixtures.render_season_page`, for the
+                  edge cases a saved page may not have, and so that the
+                  check runs before any page is saved
+
+`check` runs every parser over both sets and fails when any of them does
+not give the golden rows, or when a page's squad-table header differs
+from the recorded one. It says so when `saved/` is empty: the synthetic
+pages round-trip the parsers against the fixture markup only.
+
+The golden rows are not parser output: `record` takes them from the
+decade database the season is stored in, with the fee and age the
+registries have for the player (pages carry neither). Without options it
+renders `synthetic/` again; `--fetch` downloads the seasons' pages from
+bdfutbol (through the crawler, so rate-limited) into `saved/`, and
+`--pages DIR` takes them from a directory of saved pages instead. The
+seasons cover each decade's scripts and the known edge cases: the two
+Manolos of 1980-81 and 1983-84, the de Jongs of 2021-22 and the season
+in progress, whose saved page only matches the rows of the load it was
+saved with.
+"""
+import argparse
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+
+from ..ages import as_ages
+from ..columns import extract_columns
+from ..crawler import SeasonCrawler
+from ..extract import BACKENDS, extract_page, lxml_html
+from ..fees import as_registry
+from ..fixtures import load_pages, render_season_page
+from ..scrape import scrape_page
+from ..warehouse import DECADE_DATABASES
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+SAVED_DIR = os.path.join(CORPUS_DIR, 'saved')
+SYNTHETIC_DIR = os.path.join(CORPUS_DIR, 'synthetic')
+SETS = {'saved': SAVED_DIR, 'synthetic': SYNTHETIC_DIR}
+SEASONS = {
+    DECADE_DATABASES[0]: ['1980-81', '1983-84', '1988-89'],
+    DECADE_DATABASES[1]: ['1992-93', '1997-98'],
+    DECADE_DATABASES[2]: ['1999-00', '2005-06', '2008-09'],
+    DECADE_DATABASES[3]: ['2014-15', '2021-22', '2025-26'],
+}
+
+_HEADER = re.compile(rb'<table[^>]*id="c3p0".*?</tr>', re.S)
+_CELL = re.compile(rb'<th[^>]*>(.*?)</th>', re.S)
+_NOISE = re.compile(rb'<(script|style|noscript)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+
+
+def squad_header(html_content):
+    """Texts of the `c3p0` header cells, or None when the page has no squad table."""
+    match = _HEADER.search(html_content)
+    if match is None:
+        return None
+    return [re.sub(rb'<[^>]+>', b'', cell).decode('utf-8', 'replace').strip()
+            for cell in _CELL.findall(match.group(0))]
+
+
+def trim_page(html_content):
+    """A saved page without its scripts, styles and comments; the markup the parsers read is kept."""
+    return _NOISE.sub(b'', html_content)
+
+
+def page_path(season, directory=SYNTHETIC_DIR):
+    return os.path.join(directory, f't{season}1.html')
+
+
+def golden_path(season, directory=SYNTHETIC_DIR):
+    return os.path.join(directory, f'{season}.json')
+
+
+def set_pages(directory):
+    """{season: page bytes} of one set, empty when nothing was recorded into it."""
+    return load_pages(directory) if os.path.isdir(directory) else {}
+
+
+def corpus_pages():
+    """{season: page bytes} of the corpus, the saved page of a season when there is one."""
+    pages = set_pages(SYNTHETIC_DIR)
+    pages.update(set_pages(SAVED_DIR))
+    return pages
+
+
+def load_golden(season, directory=SYNTHETIC_DIR):
+    with open(golden_path(season, directory), encoding='utf-8') as f:
+        golden = json.load(f)
+    golden['rows'] = [tuple(row) for row in golden['rows']]
+    return golden
+
+
+def stored_seasons():
+    """{season: (manager, rows)} of the corpus seasons, as stored in the decade databases.
+
+    `age` and `transfer_value` are replaced by the registries', which is what a parser gives
+    (the files need not be migrated).
+    """
+    fees = as_registry()
+    ages = as_ages()
+    stored = {}
+    for db_path, seasons in SEASONS.items():
+        conn = sqlite3.connect(db_path)
+        try:
+            for season in seasons:
+                rows = conn.execute('SELECT * FROM players_stats WHERE season = ? ORDER BY rowid',
+                                    (season,)).fetchall()
+                stored[season] = (rows[-1][15] or 'Unknown',
+                                  [row[:4] + (ages.lookup(row[0], season, row[3]),) + row[5:16]
+                                   + (fees.get((row[0], season), "0"),) for row in rows])
+        finally:
+            conn.close()
+    return stored
+
+
+def _rendered_pages(stored):
+    return {season: render_season_page(rows, manager) for season, (manager, rows) in stored.items()}
+
+
+def _golden_json(season, manager, header, rows):
+    # One row per line, so a changed golden file reads as a row diff.
+    dump = functools.partial(json.dumps, ensure_ascii=False)
+    lines = [f'{{"season": {dump(season)}, "manager": {dump(manager)},', f' "header": {dump(header)},',
+             ' "rows": [']
+    lines += [f'  {dump(list(row))}' + (',' if i < len(rows) - 1 else '') for i, row in enumerate(rows)]
+    return '\n'.join(lines) + '\n]}\n'
+
+
+def fetch_pages(seasons):
+    """{season: trimmed page} of the seasons, fetched from bdfutbol; a page that fails is reported and left out."""
+    crawler = SeasonCrawler(max_workers=2)
+    pages = {}
+    try:
+        for page in crawler.fetch_pages(int(season[:4]) for season in seasons):
+            if page.status == 200:
+                pages[page.season_label] = trim_page(page.content)
+            else:
+                print(f"{page.season_label}: not saved ({page.error or page.status})")
+    finally:
+        crawler.close()
+    return pages
+
+
+def record(pages, stored, directory=SYNTHETIC_DIR):
+    """Writes the pages and, as their golden outputs, the stored rows of their seasons."""
+    os.makedirs(directory, exist_ok=True)
+    for season, body in pages.items():
+        manager, rows = stored[season]
+        with open(page_path(season, directory), 'wb') as f:
+            f.write(body)
+        with open(golden_path(season, directory), 'w', encoding='utf-8') as f:
+            f.write(_golden_json(season, manager, squad_header(body), rows))
+        print(f"{season}: {len(rows)} rows")
+
+
+def _columns_rows(body, season):
+    manager, columns = extract_columns(body, season)
+    return manager, list(columns.iter_rows())
+
+
+def parsers():
+    """{name: parse(body, season) -> (manager, rows)} for the reference scraper and every backend."""
+    contenders = {'scrape_page': scrape_page}
+    for backend in BACKENDS:
+        if backend == 'lxml' and lxml_html is None:
+            continue
+        contenders[backend] = lambda body, season, backend=backend: extract_page(body, season, backend=backend)
+    contenders['columns'] = _columns_rows
+    return contenders
+
+
+def check(sets=SETS):
+    """Returns `(season, what)` for every disagreement with the golden files of every set."""
+    problems = []
+    for kind, directory in sets.items():
+        for season, body in set_pages(directory).items():
+            golden = load_golden(season, directory)
+            if squad_header(body) != golden['header']:
+                problems.append((season, f"{kind}: squad header changed: {squad_header(body)}"))
+            for name, parse in parsers().items():
+                manager, rows = parse(body, season)
+                if manager != golden['manager']:
+                    problems.append((season, f"{kind} {name}: manager {manager!r}, "
+                                             f"expected {golden['manager']!r}"))
+                if [tuple(row) for row in rows] != golden['rows']:
+                    differing = sum(a != b for a, b in zip(map(tuple, rows), golden['rows']))
+                    problems.append((season, f"{kind} {name}: {len(rows)} rows ({differing} differ), "
+                                             f"expected {len(golden['rows'])}"))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('check', help="compare every parser with the golden outputs")
+    record_ = commands.add_parser('record', help="rewrite the corpus and its golden outputs")
+    saved = record_.add_mutually_exclusive_group()
+    saved.add_argument('--fetch', action='store_true', help="download the seasons' pages from bdfutbol into saved/")
+    saved.add_argument('--pages', help="directory of saved t{season}1.html pages to record into saved/")
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        stored = stored_seasons()
+        if args.fetch:
+            pages, directory = fetch_pages(stored), SAVED_DIR
+        elif args.pages:
+            pages, directory = {season: trim_page(body) for season, body in load_pages(args.pages).items()}, SAVED_DIR
+        else:
+            pages, directory = _rendered_pages(stored), SYNTHETIC_DIR
+        record({season: body for season, body in pages.items() if season in stored}, stored, directory)
+        return
+    problems = check()
+    counts = {kind: len(set_pages(directory)) for kind, directory in SETS.items()}
+    for season, what in problems:
+        print(f"{season}: {what}")
+    if not counts['saved']:
+        print("no saved bdfutbol pages (record --fetch): only the fixture markup is checked")
+    print(f"{counts['saved']} saved and {counts['synthetic']} synthetic pages, {len(parsers())} parsers: "
+          + ('ok' if not problems else f"{len(problems)} problems"))
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
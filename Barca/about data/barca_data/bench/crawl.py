@@ -0,0 +1,58 @@
+"""Crawl throughput against a local stand-in server.
+
+    python -m barca_data.bench.crawl [--pages DIR | --db PATH] [--latency S]
+
+Serves saved season pages (or pages rendered from a decade database) and
+crawls them once with a single worker, the way the old scripts did minus
+their fixed sleep, and once per requested pool size.
+"""
+import argparse
+import os
+import time
+
+from ..crawler import SeasonCrawler
+from ..fixtures import load_pages, pages_from_db
+from .server import StandInServer
+
+DEFAULT_DB = os.path.join(os.path.dirname(__file__), '..', '..', '1979_1989', 'barca_80s.db')
+
+
+def crawl_once(pages, base_url, workers, per_host_limit):
+    years = [int(label[:4]) for label in pages]
+    # No pacing: this measures pool overlap against an unthrottled server.
+    crawler = SeasonCrawler(max_workers=workers, per_host_limit=per_host_limit, base_url=base_url, rate=None)
+    start = time.perf_counter()
+    try:
+        rows = sum(len(result.columns or ()) for result in crawler.crawl(years))
+    finally:
+        crawler.close()
+    return time.perf_counter() - start, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--pages', help="directory of saved t{season}1.html pages")
+    source.add_argument('--db', default=DEFAULT_DB, help="decade database to render pages from")
+    parser.add_argument('--latency', type=float, default=0.05, help="simulated seconds per request")
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 8])
+    parser.add_argument('--repeat', type=int, default=4, help="copies of the season set to crawl")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.pages) if args.pages else pages_from_db(args.db)
+    # Repeat the season set under shifted years so the crawl has enough pages to overlap.
+    corpus = {}
+    for i in range(args.repeat):
+        for label, body in pages.items():
+            year = int(label[:4]) + 100 * i
+            corpus[f"{year}-{str(year + 1)[2:]}"] = body
+
+    with StandInServer(corpus, latency=args.latency) as server:
+        for workers in [1] + args.workers:
+            elapsed, rows = crawl_once(corpus, server.base_url, workers, per_host_limit=workers)
+            print(f"workers={workers:<3} pages={len(corpus):<4} rows={rows:<6} "
+                  f"{elapsed:7.3f}s  {len(corpus) / elapsed:8.1f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Initial page weight and parse time: every modal inline vs. lazily loaded chunks.
+
+    python -m barca_data.bench.dashboard [--warehouse PATH] [--repeat 5]
+
+Builds the dashboard into a temporary directory, then rebuilds the old
+eager page from the same parts: the shell with the content of every modal
+inlined, as the hand-written `index.html` had it. Prints the size, gzip
+size and `html.parser` parse time (best of `--repeat`) of both pages,
+which is what a browser has to fetch and parse before first paint, and
+the sizes of the chunks fetched when a modal opens.
+"""
+import argparse
+import gzip
+import os
+import statistics
+import tempfile
+import time
+from html.parser import HTMLParser
+
+from ..dashboard import CHUNK_DIR, build, read_fragments
+from ..warehouse import WAREHOUSE_PATH, build_warehouse
+
+MODAL = '''    <div class="modal fade" id="{}" tabindex="-1" aria-hidden="true">
+        <div class="modal-dialog modal-xl modal-dialog-centered">
+{}
+        </div>
+    </div>
+'''
+
+
+def eager_page(page, fragments):
+    modals = ''.join(MODAL.format(modal_id, html) for modal_id, html in fragments.items())
+    return page.replace('</body>', modals + '</body>')
+
+
+def parse_time(page, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser = HTMLParser()
+        parser.feed(page)
+        parser.close()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--warehouse', default=WAREHOUSE_PATH, help="built from the decade databases when missing")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        warehouse = args.warehouse
+        if not os.path.exists(warehouse):
+            warehouse = os.path.join(tmp, 'warehouse.db')
+            build_warehouse(path=warehouse)
+        start = time.perf_counter()
+        result = build(warehouse, out_dir=tmp)
+        elapsed = time.perf_counter() - start
+        with open(os.path.join(tmp, 'index.html'), encoding='utf-8') as f:
+            lazy = f.read()
+        chunk_dir = os.path.join(tmp, CHUNK_DIR)
+        chunk_sizes = [os.path.getsize(os.path.join(chunk_dir, name)) for name in os.listdir(chunk_dir)]
+    eager = eager_page(lazy, read_fragments())
+
+    print(f"build: {elapsed * 1000:.0f} ms, {result.seasons} seasons, {result.chunks} chunks")
+    for name, page in (('every modal inline', eager), ('shell + chunks', lazy)):
+        data = page.encode('utf-8')
+        print(f"  {name:20} {len(data) / 1024:7.1f} KB  gzip {len(gzip.compress(data)) / 1024:6.1f} KB"
+              f"  parse {parse_time(page, args.repeat) * 1000:6.1f} ms")
+    print(f"  chunk on modal open  median {statistics.median(chunk_sizes) / 1024:.1f} KB,"
+          f" max {max(chunk_sizes) / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""pandas export vs. the streaming sinks, on a database grown from a decade database.
+
+    python -m barca_data.bench.export [--db PATH] [--copies 50] [--chunk 5000]
+
+The decade's `players_stats` is copied `--copies` times under shifted
+season labels. The old export (`read_sql_query` then `to_excel`) is timed
+against `export_table` to Excel alone and to Excel, CSV and Parquet in
+one pass, with the peak traced allocation of each: the pandas peak grows
+with the table, the streaming one with `--chunk`. The files written must
+hold the same rows.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ..db import PLAYERS_STATS_COLUMNS, init_database
+from ..export import export_table
+from .pipeline import DEFAULT_DB
+
+
+def grow(source, path, copies):
+    """Writes `copies` copies of `source`'s `players_stats` to a new database at `path`; returns the row count."""
+    rows = sqlite3.connect(source).execute('SELECT * FROM players_stats ORDER BY rowid').fetchall()
+    conn = init_database(path)
+    marks = ', '.join('?' * len(PLAYERS_STATS_COLUMNS))
+    with conn:
+        for i in range(copies):
+            conn.executemany(f'INSERT INTO players_stats VALUES ({marks})',
+                             [row[:1] + (f'{row[1]}#{i}',) + row[2:] for row in rows])
+    conn.close()
+    return len(rows) * copies
+
+
+def pandas_export(db_path, excel_path):
+    import pandas as pd
+
+    conn = sqlite3.connect(db_path)
+    pd.read_sql_query("SELECT * FROM players_stats", conn).to_excel(excel_path, index=False)
+    conn.close()
+
+
+def _traced(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        function()
+        return time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB, help="decade database to grow the table from")
+    parser.add_argument('--copies', type=int, default=50)
+    parser.add_argument('--chunk', type=int, default=5000, help="rows per fetch of the streaming export")
+    args = parser.parse_args(argv)
+
+    import pandas as pd  # imported up front so its import does not count against the pandas run
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'large.db')
+        rows = grow(args.db, db_path, args.copies)
+        out = {ext: os.path.join(tmp, f'out.{ext}') for ext in ('xlsx', 'csv', 'parquet')}
+        runs = {
+            'pandas to_excel': lambda: pandas_export(db_path, os.path.join(tmp, 'pandas.xlsx')),
+            'streaming, xlsx': lambda: export_table(db_path, [out['xlsx']], chunk_size=args.chunk),
+            'streaming, xlsx+csv+parquet': lambda: export_table(db_path, list(out.values()), chunk_size=args.chunk),
+        }
+        print(f"{rows} rows, chunks of {args.chunk}")
+        for name, run in runs.items():
+            elapsed, peak = _traced(run)
+            print(f"  {name:28} {elapsed:7.2f}s  peak {peak / 2 ** 20:7.1f} MB")
+
+        expected = pd.read_excel(os.path.join(tmp, 'pandas.xlsx'))
+        with open(out['csv'], newline='', encoding='utf-8') as f:
+            csv_rows = sum(1 for _ in csv.reader(f)) - 1
+        same = (pd.read_excel(out['xlsx']).equals(expected) and csv_rows == rows
+                and pq.read_table(out['parquet']).to_pandas().shape == expected.shape)
+    print('ok' if same else 'MISMATCH: the exports differ')
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
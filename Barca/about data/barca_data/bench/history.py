@@ -0,0 +1,113 @@
+"""A live season's worth of versions: history storage and read costs.
+
+    python -m barca_data.bench.history [--matchdays 38] [--players 14] [--repeat 20]
+
+Builds a warehouse from the decade databases, then plays `--matchdays`
+matchdays on its latest season: each adds minutes, matches and now and
+then a goal or a card to `--players` random players and reloads the
+season in its own `write()`, as `watch` does. Prints how much the file
+grew (vacuumed) against keeping a full copy per version, the time of a
+latest read of `players_stats` before and after the history was written
+(best of `--repeat`), and that of an "as of" read; then checks that every
+version reads back exactly as it was.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from .. import history
+from ..warehouse import Warehouse, build_warehouse
+
+
+def read_time(warehouse, sql, params=(), repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        warehouse.query(sql, params)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def vacuumed_size(warehouse):
+    warehouse.conn.execute('VACUUM')
+    return warehouse.query('PRAGMA page_count')[0][0] * warehouse.query('PRAGMA page_size')[0][0]
+
+
+def play(rows, players, rng):
+    """A matchday: `rows` (lists, updated in place) with `players` of them having played."""
+    for row in rng.sample(rows, min(players, len(rows))):
+        minutes = rng.choice((90, 90, 90, 75, 60, 30, 15))
+        row[5] += 1
+        row[6 if minutes >= 60 else 8] += 1
+        row[7] += minutes == 90
+        row[10] += minutes
+        if rng.random() < 0.15:
+            row[13] += 1
+            row[14] += 1
+        if rng.random() < 0.1:
+            row[11] += 1
+            row[9] += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--matchdays', type=int, default=38)
+    parser.add_argument('--players', type=int, default=14, help="players changed per matchday")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'warehouse.db')
+        build_warehouse(path=path)
+        warehouse = Warehouse(path)
+        try:
+            latest = 'SELECT * FROM players_stats'
+            season = warehouse.query('SELECT MAX(season) FROM seasons')[0][0]
+            rows = [list(row[:17]) for row in warehouse.query(
+                f'{latest} WHERE season = ? ORDER BY rowid', (season,))]
+            for row in rows:
+                row[4:15] = [value or 0 for value in row[4:15]]
+            total_rows = warehouse.query('SELECT COUNT(*) FROM player_season')[0][0]
+            size = vacuumed_size(warehouse)
+            before = read_time(warehouse, latest, repeat=args.repeat)
+
+            expected = {history.current_version(warehouse): warehouse.query(latest)}
+            changed = 0
+            start = time.perf_counter()
+            for matchday in range(1, args.matchdays + 1):
+                play(rows, args.players, rng)
+                with warehouse.write(f'{season} matchday {matchday}'):
+                    changed += len(warehouse.replace_season(season, rows).changed)
+                expected[history.current_version(warehouse)] = warehouse.query(latest)
+            elapsed = time.perf_counter() - start
+
+            growth = vacuumed_size(warehouse) - size
+            stored = warehouse.query('SELECT COUNT(*) FROM player_season_history')[0][0]
+            per_row = growth / max(stored, 1)
+            print(f"{args.matchdays} matchdays of {season}: {changed} rows changed, "
+                  f"{elapsed / args.matchdays * 1000:.1f} ms per write")
+            print(f"  history      {stored:6} rows  {growth / 1024:8.1f} KB")
+            print(f"  full copies  {total_rows * args.matchdays:6} rows  "
+                  f"{total_rows * args.matchdays * per_row / 1024:8.1f} KB (estimated at the same bytes per row)")
+
+            after = read_time(warehouse, latest, repeat=args.repeat)
+            middle = sorted(expected)[len(expected) // 2]
+            as_of = read_time(warehouse, *history.as_of_query(middle), repeat=args.repeat)
+            print(f"  latest read  {before * 1000:6.2f} ms before, {after * 1000:6.2f} ms after")
+            print(f"  as-of read   {as_of * 1000:6.2f} ms (version {middle})")
+
+            wrong = [version for version, rows_then in expected.items()
+                     if history.players_stats_as_of(warehouse, version) != rows_then]
+        finally:
+            warehouse.close()
+    print('ok' if not wrong else f"MISMATCH at versions {wrong}")
+    if wrong:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
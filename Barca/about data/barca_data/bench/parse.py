@@ -0,0 +1,71 @@
+"""Parse throughput, in pages/sec, over saved or rendered season pages.
+
+    python -m barca_data.bench.parse [--pages DIR | --db PATH ...] [--seconds S]
+
+Compares the old two-parse flow of the decade scripts (one BeautifulSoup
+pass for the manager, another inside `scrape_season_data`) with each
+single-pass backend of `extract_page`, and checks they agree.
+"""
+import argparse
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from ..extract import BACKENDS, extract_page, lxml_html
+from ..fixtures import load_pages, pages_from_db
+from ..scrape import scrape_manager, scrape_season_data
+from .crawl import DEFAULT_DB
+
+
+def two_pass(html_content, season_label):
+    manager = scrape_manager(BeautifulSoup(html_content, 'html.parser'))
+    return manager, scrape_season_data(html_content, season_label, manager)
+
+
+def throughput(parse, pages, seconds):
+    """Parses the corpus repeatedly for about `seconds`; returns pages/sec."""
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for label, body in pages.items():
+            parse(body, label)
+        done += len(pages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return done / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--pages', help="directory of saved t{season}1.html pages")
+    source.add_argument('--db', nargs='+', default=[DEFAULT_DB], help="decade databases to render pages from")
+    parser.add_argument('--seconds', type=float, default=2.0, help="minimum time per contender")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.pages) if args.pages else {
+        label: body for db in args.db for label, body in pages_from_db(db).items()}
+
+    contenders = {'two-pass bs4': two_pass}
+    for backend in BACKENDS:
+        if backend == 'lxml' and lxml_html is None:
+            continue
+        contenders[backend] = lambda body, label, backend=backend: extract_page(body, label, backend=backend)
+
+    reference = {label: two_pass(body, label) for label, body in pages.items()}
+    baseline = None
+    failed = False
+    for name, parse in contenders.items():
+        mismatched = [label for label, body in pages.items() if parse(body, label) != reference[label]]
+        rate = throughput(parse, pages, args.seconds)
+        baseline = baseline or rate
+        status = 'ok' if not mismatched else f"MISMATCH in {', '.join(mismatched)}"
+        failed = failed or bool(mismatched)
+        print(f"{name:<13} {rate:9.1f} pages/s  x{rate / baseline:5.1f}  {status}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
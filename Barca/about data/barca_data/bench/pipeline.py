@@ -0,0 +1,96 @@
+"""Sequential fetch/parse/write loop vs. the staged `Pipeline`, against a stand-in server.
+
+    python -m barca_data.bench.pipeline [--repeat 8] [--latency S] [--parsers 0 2]
+
+The old scripts fetched, parsed and inserted one season after another.
+Here the same pages (rendered from a decade database, repeated under
+shifted years) are loaded that way and through the pipeline, with and
+without parser processes. Every run must store the same rows; the peak
+RSS of this process shows the pipeline does not hold the corpus.
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from ..columns import extract_columns
+from ..crawler import SeasonCrawler
+from ..db import init_database, upsert_columns
+from ..fees import as_registry
+from ..fixtures import pages_from_db
+from ..pipeline import Pipeline
+from .server import StandInServer
+
+DEFAULT_DB = os.path.join(os.path.dirname(__file__), '..', '..', '1979_1989', 'barca_80s.db')
+
+
+def sequential(crawler, years, conn, fees):
+    for year in years:
+        page = crawler.fetch(year)
+        _manager, columns = extract_columns(page.content, page.season_label, fees)
+        with conn:
+            upsert_columns(conn, page.season_label, columns)
+
+
+def pipelined(crawler, years, conn, fees, parsers):
+    def write(batch):
+        with conn:
+            for result in batch:
+                upsert_columns(conn, result.page.season_label, result.columns)
+
+    Pipeline(crawler, fees, parsers=parsers).run(years, write)
+
+
+def _peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB, help="decade database to render pages from")
+    parser.add_argument('--repeat', type=int, default=8, help="copies of the season set to load")
+    parser.add_argument('--latency', type=float, default=0.02, help="simulated seconds per request")
+    parser.add_argument('--workers', type=int, default=4, help="fetch threads")
+    parser.add_argument('--parsers', type=int, nargs='+', default=[0, 2])
+    args = parser.parse_args(argv)
+
+    pages = pages_from_db(args.db)
+    corpus = {}
+    for i in range(args.repeat):
+        for label, body in pages.items():
+            year = int(label[:4]) + 100 * i
+            corpus[f"{year}-{str(year + 1)[2:]}"] = body
+    years = sorted(int(label[:4]) for label in corpus)
+    fees = as_registry(None)
+    runs = {'sequential': lambda c, conn: sequential(c, years, conn, fees)}
+    for parsers in args.parsers:
+        runs[f'pipeline, {parsers} parsers'] = \
+            lambda c, conn, parsers=parsers: pipelined(c, years, conn, fees, parsers)
+
+    counts = set()
+    with StandInServer(corpus, latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        print(f"{len(corpus)} pages, {args.latency * 1000:g} ms latency, {args.workers} fetch threads")
+        for name, load in runs.items():
+            conn = init_database(os.path.join(tmp, f'{len(counts)}-{name}.db'))
+            crawler = SeasonCrawler(max_workers=args.workers, base_url=server.base_url, rate=None)
+            start = time.perf_counter()
+            try:
+                load(crawler, conn)
+            finally:
+                crawler.close()
+            elapsed = time.perf_counter() - start
+            rows = conn.execute('SELECT COUNT(*) FROM players_stats').fetchone()[0]
+            digest = tuple(conn.execute('SELECT season, digest FROM season_loads ORDER BY season'))
+            conn.close()
+            counts.add(digest)
+            print(f"  {name:22} {elapsed:7.3f}s  {len(corpus) / elapsed:7.1f} pages/s  rows={rows}  "
+                  f"peak RSS {_peak_mb():.0f} MB")
+    print('ok' if len(counts) == 1 else 'MISMATCH: runs stored different rows')
+    if len(counts) != 1:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Crawling a rate-limited, flaky stand-in server with and without the adaptive limiter.
+
+    python -m barca_data.bench.ratelimit [--server-rate 6] [--pages 48] [--workers 8] [--min-fraction 0.7]
+
+The server answers 429 (with `Retry-After`) above `--server-rate`
+requests/s and 503 a few times on some pages. The same pages are crawled
+with no pacing and no retries (what a transient error used to cost), and
+with the default adaptive limiter and backoff. The old fixed two-second
+sleep per page is shown for scale. The adaptive run fails the bench
+unless it fetches every page at `--min-fraction` of the server's rate or
+better (the climb from the starting rate is included).
+"""
+import argparse
+import os
+import sys
+import time
+
+from ..crawler import SeasonCrawler
+from ..fixtures import pages_from_db
+from ..ratelimit import Backoff
+from .server import StandInServer
+
+DEFAULT_DB = os.path.join(os.path.dirname(__file__), '..', '..', '1979_1989', 'barca_80s.db')
+FIXED_SLEEP = 2.0
+MIN_FRACTION = 0.7
+
+
+def corpus_of(pages, count):
+    """`count` pages under consecutive years, cycling through the rendered seasons."""
+    bodies = list(pages.values())
+    corpus = {}
+    for i in range(count):
+        year = 1900 + i
+        corpus[f"{year}-{str(year + 1)[2:]}"] = bodies[i % len(bodies)]
+    return corpus
+
+
+def crawl(corpus, options, server_options):
+    years = [int(label[:4]) for label in corpus]
+    failures = {(1, label): 2 for i, label in enumerate(corpus) if i % 10 == 3}
+    with StandInServer(corpus, failures=failures, **server_options) as server:
+        crawler = SeasonCrawler(base_url=server.base_url, **options)
+        start = time.perf_counter()
+        try:
+            pages = list(crawler.fetch_pages(years))
+        finally:
+            crawler.close()
+        elapsed = time.perf_counter() - start
+        rates = crawler.limiter.rates() if crawler.limiter else {}
+        return elapsed, pages, crawler.retries, server.throttled, rates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB, help="decade database to render pages from")
+    parser.add_argument('--server-rate', type=float, default=6.0, help="requests/s the server allows")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--pages', type=int, default=48)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--min-fraction', type=float, default=MIN_FRACTION,
+                        help="throughput the adaptive limiter must reach, as a fraction of --server-rate")
+    args = parser.parse_args(argv)
+
+    corpus = corpus_of(pages_from_db(args.db), args.pages)
+    server_options = {'rate_limit': args.server_rate, 'retry_after': args.retry_after, 'latency': 0.01}
+    runs = {
+        'no pacing, no retries': {'rate': None, 'backoff': Backoff(retries=0)},
+        'adaptive limiter': {},
+    }
+    print(f"{len(corpus)} pages, server allows {args.server_rate:g} req/s; "
+          f"fixed {FIXED_SLEEP:g}s sleep would take {len(corpus) * FIXED_SLEEP:.0f}s")
+    throughput = ok = 0
+    for name, options in runs.items():
+        elapsed, pages, retries, throttled, rates = crawl(
+            corpus, dict(max_workers=args.workers, **options), server_options)
+        ok = sum(page.status == 200 for page in pages)
+        rate = ', '.join(f'{r:.2f}' for r in rates.values()) or '-'
+        print(f"  {name:22} {elapsed:6.2f}s  {ok}/{len(pages)} pages  {len(pages) / elapsed:5.2f} pages/s  "
+              f"429s={throttled:<4} retries={retries:<4} final rate={rate}")
+        throughput = len(pages) / elapsed
+
+    floor = args.min_fraction * args.server_rate
+    if ok < len(corpus) or throughput < floor:
+        print(f"MISMATCH: adaptive limiter fetched {ok}/{len(corpus)} pages at {throughput:.2f} pages/s, "
+              f"below {floor:.2f} ({args.min_fraction:g} of {args.server_rate:g})")
+        sys.exit(1)
+    print('ok')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Multi-club scheduler run against a stand-in server, with a crash and failures.
+
+    python -m barca_data.bench.schedule [--clubs 12] [--workers 4] [--latency S]
+
+Pages for every club are rendered from a decade database; every third
+club misses a season (404) and a few pages answer 503 once or twice.
+Pacing and in-crawler retries are off, so the 503s reach the queue. The
+scheduler is started in a child process and killed mid-run, then run
+again to resume, then failed jobs are retried until none are left. Each
+club database must end up with exactly the rows of its pages.
+"""
+import argparse
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from .. import scheduler
+from ..fixtures import pages_from_db
+from .server import StandInServer
+
+DEFAULT_DB = os.path.join(os.path.dirname(__file__), '..', '..', '1979_1989', 'barca_80s.db')
+MAX_ATTEMPTS = 3
+
+
+def build_corpus(pages, clubs):
+    """(club, label) -> page for clubs 1..`clubs`, and the (club, label) pairs that will 503."""
+    corpus, failures = {}, {}
+    labels = sorted(pages)
+    for club in range(1, clubs + 1):
+        for i, label in enumerate(labels):
+            if club % 3 == 0 and i == club % len(labels):
+                continue  # not in the league that season
+            corpus[(club, label)] = pages[label]
+            if (club + i) % 7 == 0:
+                failures[(club, label)] = 1 + (club + i) % 2
+    return corpus, failures
+
+
+def expected_rows(db_path):
+    """{season: row count} of a `players_stats` database."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute('SELECT season, COUNT(*) FROM players_stats GROUP BY season'))
+    finally:
+        conn.close()
+
+
+def check_outputs(corpus, per_season, output_dir):
+    """Club/season pairs whose stored row count differs from their page's."""
+    wrong = []
+    for club in sorted({club for club, _label in corpus}):
+        path = scheduler.club_database(output_dir, club)
+        stored = expected_rows(path) if os.path.exists(path) else {}
+        want = {label: per_season[label] for c, label in corpus if c == club}
+        if stored != want:
+            wrong.append(club)
+    return wrong
+
+
+def crash_partway(queue_path, output_dir, base_url, workers, after):
+    """Starts `scheduler run` in its own process group and kills it once `after` jobs are done."""
+    command = [sys.executable, '-m', 'barca_data.scheduler', '--queue', queue_path, 'run',
+               '--output', output_dir, '--workers', str(workers), '--base-url', base_url, '--batch', '2',
+               '--rate', '0', '--retries', '0']
+    child = subprocess.Popen(command, cwd=scheduler.ABOUT_DATA, start_new_session=True,
+                             stdout=subprocess.DEVNULL)
+    queue = scheduler.JobQueue(queue_path)
+    try:
+        while child.poll() is None and queue.counts()[scheduler.DONE] < after:
+            time.sleep(0.02)
+        counts = queue.counts()
+    finally:
+        queue.close()
+    if child.poll() is None:
+        os.killpg(child.pid, signal.SIGKILL)
+    child.wait()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB, help="decade database to render pages from")
+    parser.add_argument('--clubs', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02, help="simulated seconds per request")
+    args = parser.parse_args(argv)
+
+    pages = pages_from_db(args.db)
+    per_season = expected_rows(args.db)
+    corpus, failures = build_corpus(pages, args.clubs)
+    years = sorted(int(label[:4]) for label in pages)
+    jobs = [scheduler.Job(club, year) for club in range(1, args.clubs + 1) for year in years]
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            StandInServer(corpus, latency=args.latency, failures=failures) as server:
+        queue_path = os.path.join(tmp, 'jobs.db')
+        output_dir = os.path.join(tmp, 'clubs')
+        queue = scheduler.JobQueue(queue_path)
+        queue.add(jobs)
+        queue.close()
+        print(f"{len(jobs)} jobs, {len(jobs) - len(corpus)} missing pages, "
+              f"{sum(failures.values())} injected 503s")
+
+        counts = crash_partway(queue_path, output_dir, server.base_url, args.workers, len(jobs) // 3)
+        print(f"killed mid-run:  {counts}")
+
+        start = time.perf_counter()
+        counts = scheduler.run(queue_path, output_dir, args.workers, None, base_url=server.base_url, retries=0)
+        print(f"resumed:         {counts}  ({time.perf_counter() - start:.2f}s)")
+        rounds = 0
+        while counts[scheduler.FAILED]:
+            queue = scheduler.JobQueue(queue_path)
+            requeued = queue.retry(MAX_ATTEMPTS)
+            queue.close()
+            if not requeued:
+                break
+            rounds += 1
+            counts = scheduler.run(queue_path, output_dir, args.workers, None, base_url=server.base_url, retries=0)
+            print(f"retry {rounds}:         {counts}")
+
+        wrong = check_outputs(corpus, per_season, output_dir)
+        complete = counts[scheduler.DONE] == len(corpus) and counts[scheduler.MISSING] == len(jobs) - len(corpus)
+        print(f"requests served: {server.requests_served}")
+        print('ok' if complete and not wrong else f"MISMATCH: clubs {wrong}, counts {counts}")
+        if not complete or wrong:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
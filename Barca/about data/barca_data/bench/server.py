@@ -0,0 +1,116 @@
+"""Local stand-in for bdfutbol that serves saved, rendered or generated season pages."""
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from ..fixtures import PAGE_NAME
+from ..ratelimit import TokenBucket
+from ..seasons import BARCELONA
+
+
+class _SeasonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _empty(self, status, retry_after=None):
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        with server.counter_lock:
+            server.requests_served += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.limit is not None and not server.limit.try_acquire():
+            with server.counter_lock:
+                server.throttled += 1
+            return self._empty(429, server.retry_after)
+        match = PAGE_NAME.search(urlsplit(self.path).path)
+        body = server.page(match.group(1), int(match.group(2))) if match else None
+        if body is not None and server.take_failure(match.group(1), int(match.group(2))):
+            return self._empty(503)
+        if body is None:
+            return self._empty(404)
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serves `pages` under `/en/t/t{season}{club}.html`.
+
+    Keys of `pages` are season labels (Barcelona's pages) or `(club,
+    season label)` pairs. `latency` adds a fixed delay per request to model
+    the remote round trip. `failures` maps `(club, season label)` to a
+    number of 503 answers to give before serving the page. With
+    `rate_limit`, requests beyond that many per second (bursts of
+    `rate_limit` allowed) get 429, with `Retry-After: {retry_after}`
+    when it is set. Use as a context manager; `base_url` is
+    ready to hand to the crawler.
+    """
+    daemon_threads = True
+
+    def __init__(self, pages, latency=0.0, failures=None, rate_limit=None, retry_after=None,
+                 host='127.0.0.1', port=0):
+        super().__init__((host, port), _SeasonHandler)
+        self.pages = pages
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.limit = TokenBucket(rate_limit, burst=max(1, rate_limit), max_rate=rate_limit) if rate_limit else None
+        self.retry_after = retry_after
+        self.requests_served = 0
+        self.throttled = 0
+        self.counter_lock = threading.Lock()
+        self._thread = None
+
+    def page(self, season, club):
+        body = self.pages.get((club, season))
+        if body is None and club == BARCELONA:
+            body = self.pages.get(season)
+        return body
+
+    def take_failure(self, season, club):
+        with self.counter_lock:
+            left = self.failures.get((club, season), 0)
+            if left:
+                self.failures[(club, season)] = left - 1
+            return left > 0
+
+    def handle_error(self, request, client_address):
+        # Clients killed mid-request (crash tests) are expected; anything else is reported.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/en/t/"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
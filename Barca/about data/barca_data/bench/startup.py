@@ -0,0 +1,81 @@
+"""Start-up time of the `barca` command line, against a budget.
+
+    python -m barca_data.bench.startup [--repeat 10] [--budget 0.25]
+
+Runs `python -m barca_data` in fresh interpreters, for `--help`, a
+subcommand's help and two aggregate queries on a warehouse built from
+the decade databases, and prints the best and median wall time of each.
+Every command must finish within `--budget` seconds, interpreter start
+included, and must not import any of `HEAVY` (checked with
+`-X importtime`); otherwise the benchmark fails.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY = ('pandas', 'numpy', 'pyarrow', 'openpyxl', 'requests', 'bs4', 'lxml')
+DEFAULT_BUDGET = 0.25
+
+
+def command(args):
+    return [sys.executable, '-m', 'barca_data', *args]
+
+
+def run_times(args, repeat):
+    """Wall times of `repeat` runs of `python -m barca_data *args`."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command(args), cwd=ABOUT_DATA, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def heavy_imports(args):
+    """The `HEAVY` packages `python -m barca_data *args` imports."""
+    done = subprocess.run([sys.executable, '-X', 'importtime', *command(args)[1:]], cwd=ABOUT_DATA,
+                          check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    names = {line.rsplit('|', 1)[-1].strip().split('.')[0] for line in done.stderr.splitlines()
+             if line.startswith('import time:')}
+    return sorted(names.intersection(HEAVY))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="seconds allowed per command")
+    args = parser.parse_args(argv)
+
+    from ..warehouse import build_warehouse
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        warehouse = os.path.join(tmp, 'warehouse.db')
+        build_warehouse(path=warehouse)
+        cases = {
+            'barca --help': ['--help'],
+            'barca scrape --help': ['scrape', '--help'],
+            'barca aggregate players': ['aggregate', 'players', '--path', warehouse],
+            'barca aggregate managers': ['aggregate', 'managers', '--path', warehouse],
+        }
+        print(f"budget {args.budget * 1000:.0f} ms, best/median of {args.repeat}")
+        for name, case in cases.items():
+            times = run_times(case, args.repeat)
+            heavy = heavy_imports(case)
+            best, median = min(times), statistics.median(times)
+            note = f"  imports {', '.join(heavy)}" if heavy else ''
+            print(f"  {name:26} {best * 1000:6.1f} ms  {median * 1000:6.1f} ms{note}")
+            if median > args.budget or heavy:
+                failures.append(name)
+    print('ok' if not failures else f"OVER BUDGET: {', '.join(failures)}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Benchmark suite: parse, insert, history load and export, tracked across commits.
+
+    python -m barca_data.bench.suite [--record] [--tolerance 0.4] [--window 5]
+
+Checks the corpus against its golden outputs first, then measures:
+
+    parse_pages_per_s    `extract_columns` over the corpus pages, `COPIES` times
+    insert_rows_per_s    `upsert_columns` of `COPIES` copies of the corpus (under
+                         distinct season labels) into a fresh database
+    history_load_s       `build_warehouse` from the four decade databases
+    export_s             `export_to_excel` of the four decade databases
+    startup_s            `python -m barca_data --help` in a fresh interpreter
+
+Each figure is the best of `--repeat` runs. Results are compared with the
+median of the last `--window` entries of `results.jsonl` recorded on the
+same machine (platform, Python, CPU count); a figure more than
+`--tolerance` worse than that fails the suite, as does a corpus
+mismatch. `--record` appends this run, with its commit, to the history.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ..columns import extract_columns
+from ..db import export_to_excel, init_database, upsert_columns
+from ..warehouse import DECADE_DATABASES, build_warehouse
+from . import corpus, startup
+
+COPIES = 10  # corpus passes per sample, so that a sample takes long enough to time
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.jsonl')
+# Metric name -> True when higher is better.
+METRICS = {
+    'parse_pages_per_s': True,
+    'insert_rows_per_s': True,
+    'history_load_s': False,
+    'export_s': False,
+    'startup_s': False,
+}
+
+
+def machine():
+    return {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()}
+
+
+def commit():
+    """`(sha, dirty)` of the working tree, or `(None, None)` outside git."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        sha = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=here, capture_output=True, text=True,
+                             check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return sha, bool(status.strip())
+
+
+def _best(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(repeat=5):
+    pages = corpus.corpus_pages()
+    results = {}
+
+    def parse_all():
+        return [extract_columns(body, season) for season, body in pages.items()]
+
+    parse_all()  # warm the fee registry and the parser
+    results['parse_pages_per_s'] = round(
+        COPIES * len(pages) / _best(lambda: [parse_all() for _ in range(COPIES)], repeat), 1)
+
+    parsed = []
+    for i in range(COPIES):
+        for _manager, columns in parse_all():
+            parsed.append(columns.relabel(f'{columns.season_label}#{i}'))
+    rows = sum(len(columns) for columns in parsed)
+    with tempfile.TemporaryDirectory() as tmp:
+        def insert_all():
+            path = os.path.join(tmp, 'insert.db')
+            if os.path.exists(path):
+                os.remove(path)
+            conn = init_database(path)
+            with conn:
+                for columns in parsed:
+                    upsert_columns(conn, columns.season_label, columns)
+            conn.close()
+
+        results['insert_rows_per_s'] = round(rows / _best(insert_all, repeat))
+
+        def load_history():
+            path = os.path.join(tmp, 'warehouse.db')
+            if os.path.exists(path):
+                os.remove(path)
+            build_warehouse(DECADE_DATABASES, path)
+
+        results['history_load_s'] = round(_best(load_history, repeat), 4)
+
+        def export_all():
+            for i, db_path in enumerate(DECADE_DATABASES):
+                export_to_excel(db_path, os.path.join(tmp, f'export_{i}.xlsx'))
+
+        results['export_s'] = round(_best(export_all, repeat), 4)
+    results['startup_s'] = round(min(startup.run_times(['--help'], repeat)), 4)
+    return results
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline(history, window, here):
+    """Median of each metric over the last `window` entries from this machine."""
+    same = [entry['metrics'] for entry in history if entry.get('machine') == here][-window:]
+    return {name: statistics.median(entry[name] for entry in same if name in entry)
+            for name in METRICS if any(name in entry for entry in same)}
+
+
+def regressions(results, base, tolerance):
+    """(metric, value, baseline) for every figure more than `tolerance` worse than its baseline."""
+    worse = []
+    for name, higher_is_better in METRICS.items():
+        if name not in base or name not in results:
+            continue
+        value, reference = results[name], base[name]
+        if higher_is_better and value < reference * (1 - tolerance) \
+                or not higher_is_better and value > reference * (1 + tolerance):
+            worse.append((name, value, reference))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.4,
+                        help="allowed slowdown, as a fraction (timings on shared hosts vary by a third)")
+    parser.add_argument('--window', type=int, default=5, help="recorded runs the baseline is taken over")
+    parser.add_argument('--record', action='store_true', help=f"append this run to {os.path.basename(RESULTS_PATH)}")
+    parser.add_argument('--results', default=RESULTS_PATH)
+    args = parser.parse_args(argv)
+
+    problems = corpus.check()
+    for season, what in problems:
+        print(f"corpus {season}: {what}")
+    if problems:
+        print("FAIL: parsers disagree with the golden outputs")
+        sys.exit(1)
+
+    here = machine()
+    results = measure(args.repeat)
+    base = baseline(load_results(args.results), args.window, here)
+    worse = regressions(results, base, args.tolerance)
+    for name, value in results.items():
+        reference = base.get(name)
+        versus = f"  (baseline {reference:g}, {value / reference - 1:+.0%})" if reference else ''
+        print(f"{name:18} {value:>12g}{versus}")
+
+    if args.record:
+        sha, dirty = commit()
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'commit': sha, 'dirty': dirty, 'recorded_at': time.time(),
+                                'machine': here, 'metrics': results}) + '\n')
+    if not base:
+        print("no baseline for this machine yet; run with --record to start one")
+    if worse:
+        print("FAIL: " + ', '.join(f"{name} {value:g} vs {reference:g}" for name, value, reference in worse))
+        sys.exit(1)
+    print('ok')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Keeping the season in progress fresh: watch polls vs. a full re-crawl and reload.
+
+    python -m barca_data.bench.watch [--db PATH] [--latency S] [--polls 4]
+
+Serves pages rendered from the 2010-2025 database on the local stand-in
+server (which answers `If-None-Match` with 304). First times what
+`u4.py` did to pick up a change: crawl every season of the decade again,
+then rebuild the warehouse. Then runs `watch` on the latest season for
+`--polls` polls, changing one player's minutes and goals on the page
+halfway through, and prints every poll with the requests and bytes it
+cost. Finally checks that the change reached the warehouse and its
+aggregates.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from ..crawler import run_seasons
+from ..fixtures import pages_from_db, render_season_page
+from ..warehouse import DECADE_DATABASES, Warehouse, build_warehouse
+from ..watch import SeasonWatcher, describe
+from .server import StandInServer
+
+DEFAULT_DB = DECADE_DATABASES[-1]
+
+
+def changed_page(db_path, season):
+    """The season's page with its first player given 90 more minutes and a goal; returns (name, page)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = [list(row) for row in conn.execute('SELECT * FROM players_stats WHERE season = ? ORDER BY rowid',
+                                                  (season,))]
+    finally:
+        conn.close()
+    rows[0][10] += 90
+    rows[0][13] += 1
+    return rows[0][0], render_season_page(rows, rows[-1][15] or 'Unknown')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB, help="decade database to render pages from")
+    parser.add_argument('--latency', type=float, default=0.05, help="simulated seconds per request")
+    parser.add_argument('--polls', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, os.path.basename(args.db))
+        shutil.copyfile(args.db, db_path)
+        warehouse_path = os.path.join(tmp, 'warehouse.db')
+        pages = pages_from_db(db_path)
+        season = list(pages)[-1]
+        years = [int(label[:4]) for label in pages]
+
+        with StandInServer(pages, latency=args.latency) as server:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_seasons(years, db_path, incremental=False, base_url=server.base_url, max_workers=4)
+                build_warehouse(DECADE_DATABASES[:-1] + [db_path], warehouse_path)
+            elapsed = time.perf_counter() - start
+            size = sum(map(len, pages.values()))
+            print(f"re-crawl {len(years)} seasons + reload  {server.requests_served:3} requests "
+                  f"{size / 1024:7.1f} KB  {elapsed:6.2f}s")
+
+            player, page = changed_page(db_path, season)
+            watcher = SeasonWatcher(years[-1], db_path, warehouse_path, os.path.join(tmp, 'cache'),
+                                    base_url=server.base_url)
+            served = server.requests_served
+            start = time.perf_counter()
+            try:
+                for i in range(args.polls):
+                    if i == args.polls // 2:
+                        pages[season] = page
+                    print(f"  poll {i + 1}  {describe(watcher.poll())}")
+            finally:
+                watcher.close()
+            elapsed = time.perf_counter() - start
+            print(f"watch, {args.polls} polls  {server.requests_served - served:3} requests  {elapsed:6.2f}s")
+
+        warehouse = Warehouse(warehouse_path)
+        try:
+            stored = warehouse.query('SELECT minutes_played, goals FROM players_stats '
+                                     'WHERE season = ? AND player_name = ?', (season, player))
+            career = warehouse.query('SELECT SUM(goals) FROM players_stats WHERE player_name = ?', (player,))
+            aggregated = warehouse.query('SELECT a.goals FROM agg_players a JOIN players p USING (player_id) '
+                                         'WHERE p.player_name = ?', (player,))
+        finally:
+            warehouse.close()
+        conn = sqlite3.connect(db_path)
+        try:
+            source = conn.execute('SELECT minutes_played, goals FROM players_stats WHERE season = ? '
+                                  'AND player_name = ?', (season, player)).fetchall()
+        finally:
+            conn.close()
+    ok = stored == source and sum(a for a, in aggregated) == career[0][0]
+    print('ok' if ok else f"MISMATCH: warehouse {stored}, database {source}, aggregates {aggregated} vs {career}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Persistent on-disk cache for fetched season pages.
+
+Page bodies are stored once per content hash under `objects/`; a SQLite
+index maps each URL to its body and validators (ETag/Last-Modified).
+Fresh entries are served without touching the network, stale ones are
+revalidated with a conditional GET, and the least recently used entries
+are evicted once the cache grows past `max_bytes`.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from .seasons import current_season_year
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'bdfutbol')
+CLOSED_SEASON_TTL = 365 * 24 * 3600
+CURRENT_SEASON_TTL = 6 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CacheEntry = namedtuple('CacheEntry', 'url digest etag last_modified fetched_at size')
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+class CacheStats:
+    """Hit/miss counters of one `ResponseCache`."""
+
+    FIELDS = ('hits', 'misses', 'revalidated', 'stored', 'evicted', 'bytes_served', 'bytes_fetched')
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return 'CacheStats(' + ', '.join(f'{k}={v}' for k, v in self.as_dict().items()) + ')'
+
+
+class ResponseCache:
+    """Content-addressed page cache with TTLs, conditional requests and LRU eviction."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 closed_ttl=CLOSED_SEASON_TTL, current_ttl=CURRENT_SEASON_TTL, offline=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.closed_ttl = closed_ttl
+        self.current_ttl = current_ttl
+        self.offline = offline
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY, digest TEXT NOT NULL, etag TEXT, last_modified TEXT,
+                fetched_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+        self._conn.commit()
+
+    def ttl_for_season(self, year):
+        """Closed seasons never change; the one in progress is refreshed often."""
+        return self.current_ttl if year >= current_season_year() else self.closed_ttl
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def _read_object(self, digest):
+        try:
+            with open(self._object_path(digest), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_object(self, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        return digest
+
+    def lookup(self, url):
+        """Returns the `CacheEntry` for `url`, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, digest, etag, last_modified, fetched_at, size FROM entries WHERE url = ?',
+                (url,)).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def _touch(self, url, refetched=False):
+        now = time.time()
+        with self._lock:
+            if refetched:
+                self._conn.execute('UPDATE entries SET last_access = ?, fetched_at = ? WHERE url = ?',
+                                   (now, now, url))
+            else:
+                self._conn.execute('UPDATE entries SET last_access = ? WHERE url = ?', (now, url))
+            self._conn.commit()
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """Stores a freshly fetched body and evicts old entries if over budget."""
+        digest = self._write_object(body)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT digest FROM entries WHERE url = ?', (url,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, digest, etag, last_modified, now, now, len(body)))
+            self._conn.commit()
+            if old and old[0] != digest:
+                self._drop_unreferenced(old[0])
+            self.stats.stored += 1
+            self._evict()
+
+    def _drop_unreferenced(self, digest):
+        if not self._conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        # Bodies shared by several URLs are counted once per URL, which keeps the budget conservative.
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, digest, size in self._conn.execute(
+                'SELECT url, digest, size FROM entries ORDER BY last_access').fetchall():
+            self._conn.execute('DELETE FROM entries WHERE url = ?', (url,))
+            self._drop_unreferenced(digest)
+            self.stats.evicted += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._conn.commit()
+
+    def get(self, url, ttl, fetch):
+        """Returns `(status, body)` for `url`, going to the network only when needed.
+
+        `fetch(url, headers)` performs the GET and returns `(status, headers, body)`.
+        """
+        entry = self.lookup(url)
+        body = self._read_object(entry.digest) if entry else None
+        if body is not None and (self.offline or time.time() - entry.fetched_at < ttl):
+            self._touch(url)
+            self.stats.hits += 1
+            self.stats.bytes_served += len(body)
+            return 200, body
+        if self.offline:
+            self.stats.misses += 1
+            raise CacheMiss(url)
+
+        headers = {}
+        if body is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        status, response_headers, content = fetch(url, headers)
+        if status == 304 and body is not None:
+            self._touch(url, refetched=True)
+            self.stats.revalidated += 1
+            self.stats.bytes_served += len(body)
+            return 200, body
+
+        self.stats.misses += 1
+        if status == 200:
+            self.stats.bytes_fetched += len(content)
+            self.store(url, content, response_headers.get('ETag'), response_headers.get('Last-Modified'))
+        return status, content
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,181 @@
+"""Category decoding shared by every parser and storage layer.
+
+bdfutbol marks a player's position and nationality with CSS classes
+(`<div class="por">`, `<div class="pais espanya">`). `decode_position`
+and `decode_nationality` map those classes to categories, memoized per
+class list. Each fixed vocabulary gives its categories stable codes, the
+index in the tuple:
+
+    POSITIONS    every `POSITION_MAP` value, then 'Other'
+    COUNTRIES    every `COUNTRY_MAP` value (sorted), then 'Unknown'
+
+Manager cells are decoded to display names by `clean_manager_name`.
+
+Nationality is open-ended (a class missing from the map falls back to
+the class name), so encoders start from the vocabulary and append the
+values they meet. The repeated text columns are dictionary-encoded end
+to end: `positions` and `seasons`/`managers` lookup tables in the
+warehouse, dictionary arrays in Arrow and Parquet (`dictionary_array`),
+and `category` dtypes in pandas (`categorize`).
+"""
+from functools import lru_cache
+
+POSITION_MAP = {
+    'por': 'Goalkeeper',
+    'def': 'Defender',
+    'mig': 'Midfielder',
+    'dav': 'Forward',
+    'cen': 'Center Back',
+    'ltd': 'Right Back',
+    'lti': 'Left Back',
+    'dac': 'Center Forward'
+}
+
+# Union of the per-decade maps from u1.py .. u4.py
+COUNTRY_MAP = {
+    'espanya': 'Spain', 'escocia': 'Scotland', 'inglaterra': 'England', 'gales': 'Wales',
+    'olanda': 'Netherlands', 'holanda': 'Netherlands', 'alemanya': 'Germany', 'alemania': 'Germany',
+    'turquia': 'Turkey', 'turquía': 'Turkey', 'italia': 'Italy', 'italía': 'Italy', 'suecia': 'Sweden',
+    'mexico': 'Mexico', 'mèxic': 'Mexico', 'camerun': 'Cameroon', 'camerún': 'Cameroon', 'islandia': 'Iceland',
+    'venezuela': 'Venezuela', 'suissa': 'Switzerland', 'suiza': 'Switzerland', 'austria': 'Austria',
+    'costademarfil': 'Ivory Coast', 'costa de marfil': 'Ivory Coast',
+    'uruguay': 'Uruguay', 'belgica': 'Belgium', 'bélgica': 'Belgium', 'mali': 'Mali', 'bielorrusia': 'Belarus',
+    'ucrania': 'Ukraine', 'hongria': 'Hungary', 'hungria': 'Hungary', 'polonia': 'Poland', 'estadosunidos': 'USA',
+    'estatsunits': 'USA', 'republicadominicana': 'Dominican Republic', 'marruecos': 'Morocco',
+    'paraguay': 'Paraguay',
+
+    'brasil': 'Brazil', 'argentina': 'Argentina', 'portugal': 'Portugal',
+    'franca': 'France', 'francia': 'France', 'bulgaria': 'Bulgaria',
+    'romania': 'Romania', 'nigeria': 'Nigeria', 'croacia': 'Croatia', 'serbia': 'Serbia',
+    'dinamarca': 'Denmark',
+    'rumania': 'Romania',
+    'rússia': 'Russia',
+    'rusia': 'Russia',
+    'bòsnia': 'Bosnia',
+    'bosnia': 'Bosnia',
+    'finlàndia': 'Finland',
+    'finlandia': 'Finland'
+}
+
+# Category name -> the class the fixtures render it with (the first one listed above).
+POSITION_CLASSES = {name: cls for cls, name in POSITION_MAP.items()}
+COUNTRY_CLASSES = {}
+for _cls, _name in COUNTRY_MAP.items():
+    COUNTRY_CLASSES.setdefault(_name, _cls)
+
+POSITIONS = tuple(POSITION_MAP.values()) + ('Other',)
+COUNTRIES = tuple(sorted(set(COUNTRY_MAP.values()))) + ('Unknown',)
+# Columns stored dictionary-encoded, with the vocabulary their codes start from.
+CATEGORICAL_COLUMNS = {
+    'season': (),
+    'nationality': COUNTRIES,
+    'position': POSITIONS,
+    'manager_name': (),
+    'transfer_status': (),
+}
+
+
+@lru_cache(maxsize=None)
+def _nationality(classes):
+    classes = [c.strip().lower() for c in classes]
+    for c in classes:
+        if c in COUNTRY_MAP:
+            return COUNTRY_MAP[c]
+    # Not in the map: fall back to the second class (the country name)
+    if len(classes) > 1:
+        return classes[1].capitalize()
+    return "Unknown"
+
+
+def decode_nationality(classes):
+    """Maps the classes of a `pais` div (None when there is no such div) to a country."""
+    if classes is None:
+        return "Unknown"
+    return _nationality(tuple(classes))
+
+
+def decode_position(classes):
+    """Maps the classes of the first div of the position cell (None when absent)."""
+    return POSITION_MAP.get(classes[0] if classes else 'unknown', 'Other')
+
+
+# bdfutbol manager cells run the short and full names together, as cleaned up in fix.ipynb
+MANAGER_NAMES = {
+    'Helenio HerreraHelenio Herrera Gavilán⬤⬤': 'Helenio Herrera',
+    'LattekUdo Lattek⬤': 'Udo Lattek',
+    'MenottiCésar Luis Menotti⬤': 'César Luis Menotti',
+    'VenablesTerence Frederick Venables⬤': 'Terry Venables',
+    'Luis AragonésLuis Aragonés Suárez⬤⬤': 'Luis Aragonés',
+    'CruyffHendrik Johannes Cruijff⬤': 'Johan Cruyff',
+    'RexachCarles Rexach Cerdà': 'Carles Rexach',
+    'Bobby RobsonRobert William Robson⬤': 'Bobby Robson',
+    'Van GaalAloysius Paulus Maria van Gaal⬤': 'Louis van Gaal',
+    'AntićRadomir Antić': 'Radomir Antić',
+    'RijkaardFranklin Edmundo Rijkaard⬤': 'Frank Rijkaard',
+    'GuardiolaJosep Guardiola Sala⬤': 'Pep Guardiola',
+    'RouraJordi Roura Solà': 'Jordi Roura',
+    'MartinoGerardo Daniel Martino Capiglioni⬤': 'Tata Martino',
+    'Luis EnriqueLuis Enrique Martínez García⬤⬤': 'Luis Enrique',
+    'ValverdeErnesto Valverde Tejedor': 'Ernesto Valverde',
+    'Quique SetiénEnrique Setién Solar': 'Quique Setién',
+    'KoemanRonald Koeman⬤': 'Ronald Koeman',
+    'XaviXavier Hernández Creus': 'Xavi Hernández',
+    'FlickHans-Dieter Flick⬤': 'Hansi Flick'
+}
+
+
+def clean_manager_name(raw_name):
+    """Maps a raw bdfutbol manager cell to a display name."""
+    return MANAGER_NAMES.get(raw_name) or raw_name.replace('⬤', '').strip()
+
+
+def encode(values, vocabulary=()):
+    """`(codes, categories)`: int32 codes of `values` (-1 for None) into `vocabulary` plus the new
+    values in order of appearance."""
+    import numpy as np
+
+    categories = list(vocabulary)
+    index = {name: code for code, name in enumerate(categories)}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+            continue
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(categories)
+            categories.append(value)
+        codes[i] = code
+    return codes, categories
+
+
+def dictionary_array(values, vocabulary=()):
+    """A `pyarrow.DictionaryArray` of string `values`, its dictionary starting with `vocabulary`."""
+    import pyarrow as pa
+
+    codes, categories = encode(values, vocabulary)
+    return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0),
+                                          pa.array(categories, type=pa.string()))
+
+
+def categorize(frame):
+    """Returns `frame` with its categorical columns as pandas `category` dtypes.
+
+    Seasons are ordered (their labels sort chronologically), so `min` and
+    `max` work on them as on the strings.
+    """
+    import pandas as pd
+
+    frame = frame.copy()
+    for column, vocabulary in CATEGORICAL_COLUMNS.items():
+        if column not in frame:
+            continue
+        values = frame[column].astype(object).where(frame[column].notna(), None)
+        present = [v for v in pd.unique(values) if v is not None]
+        if column == 'season':
+            dtype = pd.CategoricalDtype(sorted(present), ordered=True)
+        else:
+            seen = set(vocabulary)
+            dtype = pd.CategoricalDtype(list(vocabulary) + [v for v in present if v not in seen])
+        frame[column] = values.astype(dtype)
+    return frame
@@ -0,0 +1,201 @@
+"""The `barca` command line: one entry point for every stage.
+
+    python -m barca_data scrape 80s               crawl a decade into its database
+    python -m barca_data scrape --years 2024 2026 --db barca.db
+    python -m barca_data crawl ...                multi-club crawl queue (`scheduler`)
+    python -m barca_data watch [--interval S]     poll the season in progress, apply its changes
+    python -m barca_data load [--dataset]         rebuild the warehouse (and the Parquet dataset)
+    python -m barca_data history list|show|...    the warehouse as of an earlier version
+    python -m barca_data export DB OUT ...        stream a table to .xlsx/.csv/.parquet
+    python -m barca_data aggregate [players|managers|youngest|signings]
+    python -m barca_data fees                     compile the transfer-fee registry
+    python -m barca_data ages                     check the player ages file
+    python -m barca_data migrate [DB ...]         bring decade databases in line with the registries
+    python -m barca_data serve                    JSON API over the warehouse (`api`)
+    python -m barca_data assets                   resized, hashed variants of the site images
+    python -m barca_data dashboard                build index.html and its season chunks
+    python -m barca_data bench NAME [...]         run `barca_data.bench.NAME`
+
+Importing this module does no work, and every command imports only the
+modules it runs: `--help` and the aggregate queries load neither pandas,
+NumPy and pyarrow nor requests and BeautifulSoup, and start well within
+the budget `bench.startup` holds them to.
+"""
+import argparse
+import os
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+ABOUT_DATA = os.path.dirname(PACKAGE_DIR)
+# Preset name -> (first year, end year, folder, file stem) of the decade scripts.
+DECADES = {
+    '80s': (1979, 1989, '1979_1989', 'barca_80s'),
+    '90s': (1989, 2000, '1990-1999', 'barca_90s'),
+    '99-10': (1999, 2010, '1999-2010', 'barca_99_10'),
+    '10-25': (2010, 2026, '2010-2025', 'barca_2010_2025'),
+}
+# Commands whose module has its own `main(argv)`; their arguments are passed through.
+DELEGATED = {
+    'crawl': ('scheduler', "multi-club crawl queue: add, run, status, retry"),
+    'watch': ('watch', "poll the season in progress and apply only its changed rows"),
+    'history': ('history', "versions of the warehouse and its data as of one of them"),
+    'export': ('export', "stream a table or query to Excel, CSV and Parquet files"),
+    'fees': ('fees', "compile the transfer-fee registry"),
+    'ages': ('ages', "check the player ages file"),
+    'migrate': ('db', "bring decade databases in line with the fee and age registries"),
+    'serve': ('api', "serve the warehouse summaries as a JSON API"),
+    'assets': ('assets', "build resized, content-hashed variants of the site images"),
+    'dashboard': ('dashboard', "build the dashboard page and its lazily loaded chunks"),
+}
+AGGREGATE_VIEWS = ('refresh', 'players', 'managers', 'youngest', 'signings')
+
+
+def bench_names():
+    """Benchmark modules in `barca_data/bench`, found without importing them."""
+    directory = os.path.join(PACKAGE_DIR, 'bench')
+    return sorted(name[:-3] for name in os.listdir(directory)
+                  if name.endswith('.py') and name not in ('__init__.py', 'server.py'))
+
+
+def _scrape(args):
+    from .cache import CACHE_DIR
+    from .crawler import run_seasons
+    from .storage import DATASET_DIR
+
+    if args.decade:
+        first, end, folder, stem = DECADES[args.decade]
+        db_path = args.db or os.path.join(ABOUT_DATA, folder, f'{stem}.db')
+        excel_path = args.excel or os.path.join(ABOUT_DATA, folder, f'{stem}_data.xlsx')
+    elif args.years and args.db:
+        first, end = args.years
+        db_path, excel_path = args.db, args.excel
+    else:
+        raise SystemExit("scrape: give a decade or --years FROM TO with --db")
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    failed = run_seasons(range(first, end), db_path, None if args.no_excel else excel_path,
+                         cache_dir=None if args.no_cache else CACHE_DIR, offline=args.offline,
+                         incremental=not args.full, dataset_dir=None if args.no_dataset else DATASET_DIR,
+                         parsers=args.parsers, report_path=args.report, profile=args.profile,
+                         max_workers=args.workers)
+    return 1 if failed else 0
+
+
+def _load(args):
+    from .warehouse import build_warehouse
+
+    total = build_warehouse(args.databases, args.path)
+    print(f"Loaded {total} rows into {args.path}")
+    if args.dataset:
+        from .storage import export_warehouse
+
+        seasons = export_warehouse(args.path, args.dataset)
+        print(f"Wrote {seasons} season partitions to {args.dataset}")
+    return 0
+
+
+def _aggregate(args):
+    from . import aggregates
+    from .warehouse import Warehouse
+
+    if not os.path.exists(args.path):
+        raise SystemExit(f"aggregate: no warehouse at {args.path}; build it with `load`")
+    if args.view == 'refresh':
+        aggregates.main(['--path', args.path] + (['--full'] if args.full else []))
+        return 0
+    warehouse = Warehouse(args.path)
+    try:
+        if args.view == 'players':
+            rows = aggregates.top_players(warehouse, args.by or 'goal_contributions', args.limit)
+        elif args.view == 'managers':
+            rows = aggregates.manager_summary(warehouse, args.by or 'total_spending', args.limit)
+        elif args.view == 'youngest':
+            rows = aggregates.youngest_per_season(warehouse)
+        else:
+            rows = aggregates.top_signings(warehouse)
+    except ValueError as error:
+        raise SystemExit(f"aggregate: {error}")
+    finally:
+        warehouse.close()
+    for row in rows:
+        print('\t'.join('' if value is None else str(value) for value in row))
+    return 0
+
+
+def _delegate(args):
+    import importlib
+
+    module = importlib.import_module(f'.{DELEGATED[args.command][0]}', __package__)
+    sys.argv[0] = f'barca {args.command}'  # the program name in the module's usage lines
+    return module.main(args.args) or 0
+
+
+def _bench(args):
+    import importlib
+
+    module = importlib.import_module(f'.bench.{args.name}', __package__)
+    sys.argv[0] = f'barca bench {args.name}'
+    return module.main(args.args) or 0
+
+
+def build_parser():
+    # Defaults that live in other modules are spelled out here, so that `--help` imports nothing.
+    warehouse_path = os.path.join(ABOUT_DATA, 'barca_warehouse.db')
+    parser = argparse.ArgumentParser(prog='barca', description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    scrape = commands.add_parser('scrape', help="crawl seasons into a decade database")
+    scrape.add_argument('decade', nargs='?', choices=sorted(DECADES), help="preset years and files")
+    scrape.add_argument('--years', type=int, nargs=2, metavar=('FROM', 'TO'), help="starting years, TO excluded")
+    scrape.add_argument('--db', help="database to load (default: the decade's)")
+    scrape.add_argument('--excel', help="Excel export (default: the decade's)")
+    scrape.add_argument('--no-excel', action='store_true')
+    scrape.add_argument('--no-cache', action='store_true', help="bypass the on-disk page cache")
+    scrape.add_argument('--offline', action='store_true', help="serve every page from the cache")
+    scrape.add_argument('--no-dataset', action='store_true', help="do not write the Parquet partitions")
+    scrape.add_argument('--full', action='store_true', help="refetch seasons already loaded")
+    scrape.add_argument('--workers', type=int, default=8, help="fetch threads")
+    scrape.add_argument('--parsers', type=int, help="parser processes (0 parses inline)")
+    scrape.add_argument('--report', help="JSON run report to write")
+    scrape.add_argument('--profile', choices=('cprofile', 'tracemalloc'), help="profile the parse stage")
+    scrape.set_defaults(run=_scrape)
+
+    load = commands.add_parser('load', help="rebuild the warehouse from the decade databases")
+    load.add_argument('databases', nargs='*',
+                      default=[os.path.join(ABOUT_DATA, folder, f'{stem}.db') for _, _, folder, stem in DECADES.values()])
+    load.add_argument('--path', default=warehouse_path)
+    load.add_argument('--dataset', nargs='?', const=os.path.join(ABOUT_DATA, 'dataset'),
+                      help="also export the Parquet dataset (default directory: dataset/)")
+    load.set_defaults(run=_load)
+
+    aggregate = commands.add_parser('aggregate', help="refresh the aggregate tables or print one")
+    aggregate.add_argument('view', nargs='?', choices=AGGREGATE_VIEWS, default='refresh')
+    aggregate.add_argument('--path', default=warehouse_path)
+    aggregate.add_argument('--by', help="ranking column of players or managers")
+    aggregate.add_argument('--limit', type=int, default=10)
+    aggregate.add_argument('--full', action='store_true', help="recompute every aggregate")
+    aggregate.set_defaults(run=_aggregate)
+
+    for name, (_module, help_) in DELEGATED.items():
+        # Without options of their own, every argument is left over for the module's parser.
+        commands.add_parser(name, help=help_, add_help=False).set_defaults(run=_delegate)
+
+    bench = commands.add_parser('bench', help="run a benchmark")
+    bench.add_argument('name', choices=bench_names())
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    bench.set_defaults(run=_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.run is _delegate:
+        args.args = rest
+    elif rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
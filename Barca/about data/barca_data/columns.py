@@ -0,0 +1,185 @@
+"""Columnar decoding of a season's squad table.
+
+`extract_columns` turns the raw cells of a season page straight into one
+buffer per `players_stats` column: NumPy int32 arrays for the stats and
+for `age`, which the page does not have and is looked up in `ages` (with a
+validity mask, NULL for the players not listed there), and lists for the
+text columns. Fees are looked up once per row in the
+transfer-fee registry and kept both as the display string and as the
+numeric `Fee`. The season and manager are the same for
+every row of a page and are kept as scalars. Each row's content hash
+(`fingerprint.row_hash`) is computed once, here, so writers can skip rows
+that did not change. No per-row record is built:
+the SQLite writer binds rows lazily from the buffers and the Arrow/Parquet
+writer takes the arrays as they are.
+"""
+import copy
+import hashlib
+
+import numpy as np
+
+from .db import HISTORY_COLUMNS, PLAYERS_STATS_COLUMNS
+from .ages import as_ages
+from .categories import CATEGORICAL_COLUMNS, decode_nationality, decode_position, dictionary_array
+from .extract import parse_page
+from .fees import UNKNOWN, as_registry, format_fee
+from .fingerprint import row_hashes
+
+INT_DTYPE = np.int32
+
+# Stat columns decoded from the squad table, by td index.
+STAT_CELLS = {
+    'matches_played': 5,
+    'matches_started': 6,
+    'matches_completed': 7,
+    'matches_as_substitute': 8,
+    'minutes_played': 11,
+    'yellow_cards': 12,
+    'red_cards': 13,
+    'goals': 14,
+}
+
+
+def decode_ints(texts):
+    """Decodes cell texts to int32, 0 where the text is not all digits; returns `(values, valid)`."""
+    if not texts:
+        return np.zeros(0, dtype=INT_DTYPE), np.zeros(0, dtype=bool)
+    raw = np.array(texts, dtype=str)
+    valid = np.char.isdigit(raw)
+    values = np.zeros(len(raw), dtype=INT_DTYPE)
+    values[valid] = raw[valid].astype(INT_DTYPE)
+    return values, valid
+
+
+class SeasonColumns:
+    """Typed column buffers for one season's `players_stats` rows."""
+
+    def __init__(self, season_label, manager_name, names, nationalities, positions,
+                 stats, ages, age_valid, transfer_values, transfer_fees=None):
+        self.season_label = season_label
+        self.manager_name = manager_name
+        self.names = names
+        self.nationalities = nationalities
+        self.positions = positions
+        self.stats = stats
+        self.ages = ages
+        self.age_valid = age_valid
+        self.transfer_values = transfer_values
+        self.transfer_fees = transfer_fees
+        self.row_hashes = row_hashes(self.iter_rows())
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, name):
+        """Returns a column as a list or array; unknown ages read as 0 (see `age_valid`)."""
+        if name == 'player_name':
+            return self.names
+        if name == 'season':
+            return [self.season_label] * len(self)
+        if name == 'nationality':
+            return self.nationalities
+        if name == 'position':
+            return self.positions
+        if name == 'age':
+            return self.ages
+        if name == 'total_cards':
+            return self.stats['yellow_cards'] + self.stats['red_cards']
+        if name == 'goal_contributions':
+            return self.stats['goals']
+        if name == 'manager_name':
+            return [self.manager_name] * len(self)
+        if name == 'transfer_value':
+            return self.transfer_values
+        if name == 'transfer_value_numeric':
+            return [fee.eur for fee in self.transfer_fees] if self.transfer_fees else [None] * len(self)
+        if name == 'transfer_status':
+            return [fee.status for fee in self.transfer_fees] if self.transfer_fees else [UNKNOWN] * len(self)
+        return self.stats[name]
+
+    def iter_rows(self):
+        """Lazily yields rows in `players_stats` column order, for SQLite's executemany."""
+        columns = []
+        for name in PLAYERS_STATS_COLUMNS:
+            values = self.column(name)
+            values = values.tolist() if isinstance(values, np.ndarray) else values
+            if name == 'age':
+                values = [v if ok else None for v, ok in zip(values, self.age_valid.tolist())]
+            columns.append(values)
+        return zip(*columns)
+
+    def relabel(self, season_label):
+        """A copy filed under another season label, with its row hashes recomputed."""
+        columns = copy.copy(self)
+        columns.season_label = season_label
+        columns.row_hashes = row_hashes(columns.iter_rows())
+        return columns
+
+    def keys(self):
+        """Yields the (player_name, position) key of every row."""
+        return zip(self.names, self.positions)
+
+    def digest(self):
+        """Digest of the buffers, used to spot seasons whose rows did not change."""
+        h = hashlib.sha256()
+        h.update(f'{self.season_label}\0{self.manager_name}\0'.encode('utf-8'))
+        for values in (self.names, self.nationalities, self.positions, map(str, self.transfer_values),
+                       self.column('transfer_status')):
+            h.update('\0'.join(values).encode('utf-8'))
+            h.update(b'\1')
+        for name in STAT_CELLS:
+            h.update(self.stats[name].tobytes())
+        h.update(self.ages.tobytes())
+        h.update(self.age_valid.tobytes())
+        return h.hexdigest()
+
+    def to_arrow(self):
+        """Returns a `pyarrow.Table` of `HISTORY_COLUMNS`, with `age` null where it is unknown
+        and the categorical columns dictionary-encoded."""
+        import pyarrow as pa
+
+        arrays = []
+        for name in HISTORY_COLUMNS:
+            values = self.column(name)
+            if name in CATEGORICAL_COLUMNS:
+                arrays.append(dictionary_array(values, CATEGORICAL_COLUMNS[name]))
+            elif name == 'age':
+                arrays.append(pa.array(values, mask=~self.age_valid))
+            elif name == 'transfer_value_numeric':
+                arrays.append(pa.array(values, type=pa.int64()))
+            elif name == 'transfer_value':
+                arrays.append(pa.array([str(v) for v in values], type=pa.string()))
+            elif isinstance(values, np.ndarray):
+                arrays.append(pa.array(values))
+            else:
+                arrays.append(pa.array(values, type=pa.string()))
+        return pa.Table.from_arrays(arrays, names=list(HISTORY_COLUMNS))
+
+    def write_parquet(self, path):
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path)
+
+
+def extract_columns(html_content, season_label, fees=None, backend=None, ages=None):
+    """Parses a season page once; returns `(manager, SeasonColumns)`."""
+    manager, raw_rows = parse_page(html_content, backend)
+    names, nationalities, positions = [], [], []
+    cells = {name: [] for name in STAT_CELLS}
+    for texts, nat_classes, pos_classes in raw_rows:
+        names.append(texts[3].strip())
+        nationalities.append(decode_nationality(nat_classes))
+        positions.append(decode_position(pos_classes))
+        for name, index in STAT_CELLS.items():
+            cells[name].append(texts[index])
+
+    stats = {name: decode_ints(texts)[0] for name, texts in cells.items()}
+    ages = as_ages(ages)
+    known = [ages.lookup(name, season_label, position) for name, position in zip(names, positions)]
+    age_valid = np.array([age is not None for age in known], dtype=bool)
+    age_values = np.array([age or 0 for age in known], dtype=INT_DTYPE)
+    fees = as_registry(fees)
+    transfer_fees = [fees.lookup(name, season_label) for name in names]
+    transfer_values = ["0" if fee.status == UNKNOWN else format_fee(fee.eur) for fee in transfer_fees]
+    return manager, SeasonColumns(season_label, manager, names, nationalities, positions,
+                                  stats, age_values, age_valid, transfer_values, transfer_fees)
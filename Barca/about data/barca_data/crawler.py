@@ -0,0 +1,277 @@
+"""Concurrent crawler for the bdfutbol season squad-list pages.
+
+Pages are fetched by a bounded thread pool over one pooled (keep-alive)
+`requests` session. A per-host semaphore caps how many requests hit the
+same server at once, whatever the pool size, and a shared `RateLimiter`
+paces them: its per-host token buckets slow down on 429/503 and
+`Retry-After` and speed back up while the server keeps answering.
+Connection errors, timeouts, 429 and 5xx are retried with jittered
+exponential backoff; a page that still fails is returned with its status
+or error, never dropped. With a `ResponseCache` attached, pages are
+served from disk and only stale entries are revalidated.
+"""
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import CacheMiss, ResponseCache
+from .db import export_to_excel, init_database, loaded_seasons, migrate, upsert_columns
+from .fees import as_registry
+from .metrics import Metrics
+from .ratelimit import DEFAULT_RATE, RETRY_STATUSES, THROTTLE_STATUSES, Backoff, RateLimiter, \
+    retry_after_seconds
+from .columns import extract_columns
+from .seasons import BARCELONA, BASE_URL, current_season_year, season_label, season_url
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 30
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+SeasonPage = namedtuple('SeasonPage', 'year season_label url status content error')
+SeasonResult = namedtuple('SeasonResult', 'page manager columns')
+
+
+def make_session(pool_size=DEFAULT_WORKERS):
+    """Returns a `requests.Session` whose connection pool fits `pool_size` workers."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class SeasonCrawler:
+    """Fetches and scrapes a range of seasons with a bounded worker pool."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, per_host_limit=DEFAULT_PER_HOST,
+                 base_url=BASE_URL, session=None, timeout=DEFAULT_TIMEOUT, cache=None,
+                 rate=DEFAULT_RATE, limiter=None, backoff=None, metrics=None):
+        """`rate` is the starting requests/s per host (None for no pacing); `limiter`
+        and `backoff` replace the default `RateLimiter(rate)` and `Backoff()`.
+        Fetch timings and counters go to `metrics`."""
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = session or make_session(max_workers)
+        self.cache = cache
+        self.limiter = limiter or (RateLimiter(rate) if rate else None)
+        self.backoff = backoff or Backoff()
+        self.retries = 0
+        self.metrics = metrics or Metrics()
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _send(self, url, headers, bucket):
+        if bucket is not None:
+            self.metrics.observe('fetch.paced', bucket.acquire())
+        with self._slot(url), self.metrics.timer('fetch.request'):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.metrics.count(f'http.{response.status_code}')
+        self.metrics.count('bytes.fetched', len(response.content))
+        return response.status_code, response.headers, response.content
+
+    def _request(self, url, headers):
+        """GETs `url`, retrying transient failures; the last status or error stands."""
+        bucket = self.limiter.bucket(urlsplit(url).netloc) if self.limiter else None
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                status, response_headers, content = self._send(url, headers, bucket)
+            except TRANSIENT_ERRORS:
+                if attempt >= self.backoff.retries:
+                    raise
+            else:
+                if status not in RETRY_STATUSES:
+                    if bucket is not None:
+                        bucket.success()
+                    return status, response_headers, content
+                retry_after = retry_after_seconds(response_headers.get('Retry-After'))
+                if bucket is not None and status in THROTTLE_STATUSES:
+                    bucket.throttle(retry_after, status)
+                if attempt >= self.backoff.retries:
+                    return status, response_headers, content
+            with self._lock:
+                self.retries += 1
+            self.metrics.count('fetch.retries')
+            time.sleep(self.backoff.delay(attempt, retry_after))
+            attempt += 1
+
+    def _get(self, url, year):
+        if self.cache is None:
+            status, _headers, content = self._request(url, {})
+            return status, content
+        return self.cache.get(url, self.cache.ttl_for_season(year), self._request)
+
+    def fetch(self, year, club=BARCELONA):
+        """Fetches one season page of `club`; network errors are returned, not raised."""
+        url = season_url(year, self.base_url, club)
+        try:
+            with self.metrics.timer('fetch'):
+                status, content = self._get(url, year)
+        except (requests.RequestException, CacheMiss) as e:
+            self.metrics.count('fetch.errors')
+            return SeasonPage(year, season_label(year), url, None, None, e)
+        return SeasonPage(year, season_label(year), url, status, content, None)
+
+    def fetch_pages(self, years, ahead=None):
+        """Yields a `SeasonPage` per year, in the order the years were given.
+
+        At most `ahead` pages (default: twice the pool size) are fetched
+        before the caller takes them, so a slow consumer holds fetching back.
+        """
+        ahead = ahead or 2 * self.max_workers
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for year in years:
+                pending.append(pool.submit(self.fetch, year))
+                if len(pending) >= ahead:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def crawl(self, years, fees=None, backend=None):
+        """Yields a `SeasonResult` per year; `columns` is None for failed pages."""
+        fees = as_registry(fees)
+        for page in self.fetch_pages(years):
+            if page.status != 200:
+                yield SeasonResult(page, None, None)
+                continue
+            manager, columns = extract_columns(page.content, page.season_label, fees, backend)
+            yield SeasonResult(page, manager, columns)
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def run_seasons(years, db_path, excel_path=None, fees=None, cache_dir=None, offline=False,
+                incremental=True, dataset_dir=None, parsers=None, report_path=None, profile=None,
+                **crawler_options):
+    """Crawls `years` into `db_path` and optionally exports the table to Excel.
+
+    Pages stream through a `Pipeline`: fetched on the crawler's threads,
+    parsed in `parsers` processes and written in batches, one transaction
+    per batch, by this thread.
+    With `cache_dir`, pages go through a `ResponseCache` there; `offline`
+    serves every page from that cache without touching the network.
+    In `incremental` mode closed seasons that are already loaded are not
+    fetched again, and fetched seasons whose rows did not change are not
+    rewritten.
+    With `dataset_dir`, every season written also replaces its Parquet
+    partition there.
+    Stage timings and counters are summarized at the end and, with
+    `report_path`, written there as JSON. `profile` ('cprofile' or
+    'tracemalloc') profiles the parse stage; cProfile stats are printed
+    and saved next to the report as `.prof`.
+    Returns the labels of seasons that still failed after retries; they
+    are reported, not loaded, so the next run fetches them again.
+    """
+    from .pipeline import Pipeline
+
+    years = list(years)
+    conn = init_database(db_path)
+    migrate(conn)  # the rows written come from the registries: bring the stored ones in line first
+    loaded = loaded_seasons(conn) if incremental else {}
+    current = current_season_year()
+    todo = [year for year in years if year >= current or season_label(year) not in loaded]
+    skipped = len(years) - len(todo)
+    if skipped:
+        print(f"Skipping {skipped} seasons already loaded.")
+
+    if cache_dir:
+        crawler_options['cache'] = ResponseCache(cache_dir, offline=offline)
+    metrics = crawler_options.setdefault('metrics', Metrics())
+    metrics.info['seasons'] = {'requested': len(years), 'skipped': skipped}
+    crawler = SeasonCrawler(**crawler_options)
+    written = 0
+    failed = []
+
+    def write(batch):
+        nonlocal written
+        saved = []
+        with conn:
+            for result in batch:
+                page = result.page
+                if page.error is not None:
+                    failed.append(page.season_label)
+                    print(f"Error in {page.season_label}: {page.error}")
+                elif page.status != 200:
+                    failed.append(page.season_label)
+                    print(f"Error in {page.season_label}: HTTP {page.status}")
+                elif len(result.columns):
+                    digest = result.columns.digest()
+                    if loaded.get(page.season_label) == digest:
+                        metrics.count('seasons.unchanged')
+                        print(f"{page.season_label}: unchanged.")
+                        continue
+                    with metrics.timer('insert'):
+                        diff = upsert_columns(conn, page.season_label, result.columns, digest)
+                    metrics.count('rows.inserted', len(diff.changed))
+                    metrics.count('rows.unchanged', diff.unchanged)
+                    metrics.count('rows.deleted', len(diff.stale))
+                    saved.append(result.columns)
+                    print(f"{page.season_label}: saved {len(result.columns)} players "
+                          f"({len(diff.changed)} changed). Manager: {result.manager}")
+        if dataset_dir:
+            from .storage import write_season
+
+            with metrics.timer('dataset'):
+                for columns in saved:
+                    write_season(dataset_dir, columns)
+        written += len(saved)
+
+    pipeline = Pipeline(crawler, fees, parsers=parsers, profile=profile)
+    try:
+        pipeline.run(todo, write)
+    finally:
+        crawler.close()
+        conn.close()
+    if crawler.cache is not None:
+        metrics.info['cache'] = crawler.cache.stats.as_dict()
+        print(f"Cache: {crawler.cache.stats}")
+    if crawler.retries:
+        print(f"Retried {crawler.retries} requests.")
+    metrics.info['seasons'].update(written=written, failed=failed)
+    if failed:
+        print(f"{len(failed)} seasons failed after retries and were not loaded: {', '.join(failed)}")
+
+    if dataset_dir and written:
+        from .storage import write_snapshot
+
+        with metrics.timer('dataset'):
+            write_snapshot(dataset_dir)
+
+    if excel_path:
+        with metrics.timer('export'):
+            export_to_excel(db_path, excel_path)
+        print(f"\nSuccess! Data exported to: {excel_path}")
+
+    print("Timings:")
+    metrics.print_summary()
+    if report_path:
+        metrics.write_json(report_path)
+        print(f"Run report: {report_path}")
+    if profile == 'cprofile' and pipeline.profile_result is not None:
+        pipeline.profile_result.sort_stats('cumulative').print_stats(15)
+        if report_path:
+            pipeline.profile_result.dump_stats(os.path.splitext(report_path)[0] + '.prof')
+    return failed
@@ -0,0 +1,196 @@
+"""Builds the dashboard page, `Barca/index.html`, from the warehouse.
+
+The page is a light shell; the content of its modals is fetched, as one
+small JSON chunk per modal, only when the modal opens:
+
+    site/shell.html          the page, without any modal content
+    site/modals/ID.html      hand-written `.modal-content` of modal ID
+                             (`season1979`, ..., `modalLaliga`, ...)
+    chunks/ID.HASH.json      the chunks the build writes
+
+A season chunk holds the season's hand-written content, when there is
+any, and its squad from the warehouse; every warehouse season gets a
+card, so a newly loaded season appears on the next build without any
+HTML being written by hand. Chunk names carry a hash of their content,
+so they can be cached for good; the manifest of chunks is inlined in the
+page, chunks already on disk are left alone and the ones no longer
+listed are removed. Once `assets` has been built, every image found in
+its manifest is served from its resized variants (`srcset`, lazily
+loaded inside modals), and `_headers` marks chunks and assets immutable
+for hosts that read it (Netlify, Cloudflare Pages).
+
+    python -m barca_data.dashboard [--warehouse PATH] [--site DIR] [--out DIR] [--assets DIR]
+"""
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import re
+from collections import namedtuple
+
+from .assets import ASSETS_DIR, load_manifest, responsive_images
+from .warehouse import WAREHOUSE_PATH, Warehouse
+
+BARCA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SITE_DIR = os.path.join(BARCA_DIR, 'site')
+CHUNK_DIR = 'chunks'
+MANIFEST_MARKER = '<!-- dashboard-manifest -->'
+# Squad table of a season chunk: header -> players_stats column.
+SQUAD_COLUMNS = {
+    'Player': 'player_name', 'Pos': 'position', 'Nat': 'nationality', 'Age': 'age',
+    'MP': 'matches_played', 'Min': 'minutes_played', 'Goals': 'goals', 'G+A': 'goal_contributions',
+}
+
+# Cache-Control of the build's outputs: hashed files forever, the page revalidated.
+HEADERS = f'''/{CHUNK_DIR}/*
+  Cache-Control: public, max-age=31536000, immutable
+/assets/*
+  Cache-Control: public, max-age=31536000, immutable
+/index.html
+  Cache-Control: no-cache
+'''
+
+Chunk = namedtuple('Chunk', 'id name body')
+Build = namedtuple('Build', 'seasons chunks written removed page_bytes')
+
+
+def season_id(start_year):
+    return f'season{start_year}'
+
+
+def card_label(start_year):
+    """The season's name on its card, '1979-1980' (not `seasons.season_label`'s '1979-80')."""
+    return f'{start_year}-{start_year + 1}'
+
+
+def read_fragments(site_dir=SITE_DIR):
+    """`{modal id: html}` of the hand-written modal contents."""
+    fragments = {}
+    for path in sorted(glob.glob(os.path.join(site_dir, 'modals', '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            fragments[os.path.basename(path)[:-5]] = f.read()
+    return fragments
+
+
+def season_data(warehouse):
+    """`{start year: (season, managers, squad rows)}` of every warehouse season, squads by minutes played.
+
+    Ages are those of `ages`, null where unknown, which the page shows as a blank cell.
+    """
+    columns = ', '.join(SQUAD_COLUMNS.values())
+    squads = warehouse.query(f'''
+        SELECT s.start_year, {columns}
+        FROM players_stats JOIN seasons s USING (season)
+        ORDER BY s.start_year, minutes_played DESC, player_name
+    ''')
+    managers = warehouse.query('''
+        SELECT s.start_year, m.manager_name
+        FROM player_season f JOIN seasons s USING (season_id) JOIN managers m USING (manager_id)
+        GROUP BY s.season_id, m.manager_id
+        ORDER BY s.start_year, MIN(f.rowid)
+    ''')
+    by_year = {year: [name for _, name in group] for year, group in itertools.groupby(managers, lambda r: r[0])}
+    seasons = dict(warehouse.query('SELECT start_year, season FROM seasons'))
+    return {year: (seasons[year], by_year.get(year, []), [list(row[1:]) for row in group])
+            for year, group in itertools.groupby(squads, lambda r: r[0])}
+
+
+def _chunk(chunk_id, payload):
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.blake2b(body, digest_size=5).hexdigest()
+    return Chunk(chunk_id, f'{chunk_id}.{digest}.json', body)
+
+
+def make_chunks(fragments, seasons):
+    """The season chunks, in season order, and the chunks of the other modals.
+
+    `seasons` is `season_data`'s; a season with a fragment but no
+    warehouse rows gets a chunk of its fragment alone.
+    """
+    years = set(seasons)
+    years.update(int(m.group(1)) for m in map(re.compile(r'season(\d{4})$').match, fragments) if m)
+    season_chunks = []
+    for year in sorted(years):
+        chunk_id = season_id(year)
+        payload = {'id': chunk_id, 'label': card_label(year), 'html': fragments.get(chunk_id)}
+        if year in seasons:
+            season, managers, squad = seasons[year]
+            payload.update(season=season, managers=managers, headers=list(SQUAD_COLUMNS), squad=squad)
+        season_chunks.append(_chunk(chunk_id, payload))
+    others = [_chunk(chunk_id, {'id': chunk_id, 'html': html})
+              for chunk_id, html in fragments.items() if not re.match(r'season\d{4}$', chunk_id)]
+    return season_chunks, others
+
+
+def render_page(shell, season_chunks, chunks):
+    """The shell with the manifest of `chunks` inlined in place of `MANIFEST_MARKER`."""
+    if MANIFEST_MARKER not in shell:
+        raise ValueError(f"the shell has no {MANIFEST_MARKER} marker")
+    labels = {chunk.id: json.loads(chunk.body)['label'] for chunk in season_chunks}
+    manifest = {
+        'seasons': [[chunk.id, labels[chunk.id]] for chunk in season_chunks],
+        'chunks': {chunk.id: f'{CHUNK_DIR}/{chunk.name}' for chunk in chunks},
+    }
+    data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    return shell.replace(MANIFEST_MARKER,
+                         f'<script id="dashboard-manifest" type="application/json">{data}</script>')
+
+
+def _write(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build(warehouse_path=WAREHOUSE_PATH, site_dir=SITE_DIR, out_dir=BARCA_DIR, assets_dir=ASSETS_DIR):
+    """Writes `index.html`, its chunks and `_headers` to `out_dir`; returns a `Build`."""
+    warehouse = Warehouse(warehouse_path)
+    try:
+        seasons = season_data(warehouse)
+    finally:
+        warehouse.close()
+    images = load_manifest(assets_dir)['images']
+    fragments = {modal_id: responsive_images(html, images) for modal_id, html in read_fragments(site_dir).items()}
+    season_chunks, others = make_chunks(fragments, seasons)
+    chunks = season_chunks + others
+
+    chunk_dir = os.path.join(out_dir, CHUNK_DIR)
+    os.makedirs(chunk_dir, exist_ok=True)
+    written = 0
+    for chunk in chunks:
+        path = os.path.join(chunk_dir, chunk.name)
+        if not os.path.exists(path):
+            _write(path, chunk.body)
+            written += 1
+    current = {chunk.name for chunk in chunks}
+    stale = [name for name in os.listdir(chunk_dir) if name.endswith('.json') and name not in current]
+    for name in stale:
+        os.remove(os.path.join(chunk_dir, name))
+
+    with open(os.path.join(site_dir, 'shell.html'), encoding='utf-8') as f:
+        shell = responsive_images(f.read(), images, lazy=False)
+    page = render_page(shell, season_chunks, chunks).encode('utf-8')
+    _write(os.path.join(out_dir, 'index.html'), page)
+    _write(os.path.join(out_dir, '_headers'), HEADERS.encode('utf-8'))
+    return Build(len(season_chunks), len(chunks), written, len(stale), len(page))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the dashboard page and its lazily loaded chunks.")
+    parser.add_argument('--warehouse', default=WAREHOUSE_PATH)
+    parser.add_argument('--site', default=SITE_DIR, help="directory of shell.html and modals/")
+    parser.add_argument('--out', default=BARCA_DIR, help="directory index.html and chunks/ are written to")
+    parser.add_argument('--assets', default=ASSETS_DIR, help="built image variants (`barca_data.assets`)")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.warehouse):
+        raise SystemExit(f"no warehouse at {args.warehouse}; build it with `python -m barca_data load`")
+    result = build(args.warehouse, args.site, args.out, args.assets)
+    print(f"index.html: {result.page_bytes / 1024:.1f} KB, {result.seasons} seasons; "
+          f"{result.chunks} chunks ({result.written} written, {result.removed} removed)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""SQLite storage for `players_stats` and the Excel export.
+
+Rows are keyed on (player_name, season, position): bdfutbol lists
+homonyms such as the two 'Manolo's of 1980-81 or Frenkie and Luuk de
+Jong in 2021-22 under the same short name, always in different
+positions. `season_loads` records a digest of each season's rows so
+incremental runs can tell unchanged seasons apart; within a season that
+did change, only rows whose content hash changed are written (see
+`fingerprint`).
+
+`migrate` brings the rows of a Barcelona decade database in line with
+the fee and age registries, counting the migrations applied in `PRAGMA
+user_version`. It is an explicit step, run by the writers of those files
+(`crawler`, `watch`) before they add registry-derived rows; readers, the
+warehouse load among them, leave the files as they are.
+
+    python -m barca_data.db [DB ...]
+
+migrates the given databases, the four decade databases by default.
+"""
+import argparse
+import hashlib
+import sqlite3
+import time
+
+PLAYERS_STATS_COLUMNS = (
+    'player_name', 'season', 'nationality', 'position', 'age',
+    'matches_played', 'matches_started', 'matches_completed', 'matches_as_substitute',
+    'total_cards', 'minutes_played', 'yellow_cards', 'red_cards', 'goals',
+    'goal_contributions', 'manager_name', 'transfer_value',
+)
+KEY_COLUMNS = ('player_name', 'season', 'position')
+# `players_stats` plus the fee in euros (NULL when unknown) and its status, see `fees`.
+HISTORY_COLUMNS = PLAYERS_STATS_COLUMNS + ('transfer_value_numeric', 'transfer_status')
+
+_UPSERT = '''
+    INSERT INTO players_stats VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT (player_name, season, position) DO UPDATE SET
+''' + ', '.join(f'{c} = excluded.{c}' for c in PLAYERS_STATS_COLUMNS if c not in KEY_COLUMNS)
+
+
+def init_database(db_path):
+    """Initializes the SQLite database with the required schema."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS players_stats (
+            player_name TEXT, season TEXT, nationality TEXT, position TEXT,
+            age INTEGER, matches_played INTEGER, matches_started INTEGER,
+            matches_completed INTEGER, matches_as_substitute INTEGER,
+            total_cards INTEGER, minutes_played INTEGER, yellow_cards INTEGER,
+            red_cards INTEGER, goals INTEGER, goal_contributions INTEGER,
+            manager_name TEXT, transfer_value TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS season_loads (
+            season TEXT PRIMARY KEY, digest TEXT, row_count INTEGER, loaded_at REAL
+        )
+    ''')
+    # Databases written by the append-only scripts may hold re-run duplicates: keep the latest copy.
+    cursor.execute('''
+        DELETE FROM players_stats WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM players_stats GROUP BY player_name, season, position
+        )
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS players_stats_key
+        ON players_stats (player_name, season, position)
+    ''')
+    conn.commit()
+    return conn
+
+
+def migrate(conn):
+    """Applies the migrations the database has not had yet, in one transaction; returns how many."""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    steps = _MIGRATIONS[version:]
+    with conn:
+        for number, step in enumerate(steps, version + 1):
+            step(conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+    return len(steps)
+
+
+def _format_fees(conn):
+    """Rewrites every `transfer_value` in the registry's display format.
+
+    The 1979-1999 scripts stored '420k'/'1.10M' and the 1999-2025 ones bare
+    millions ('14.0'); re-scraped seasons get `fees.format_fee`'s '14.00M'.
+    The amounts are unchanged.
+    """
+    from .fees import format_fee, parse_fee
+
+    conn.create_function('format_fee', 1, lambda raw: format_fee(parse_fee(raw)), deterministic=True)
+    conn.execute('UPDATE players_stats SET transfer_value = format_fee(transfer_value) '
+                 'WHERE transfer_value IS NOT format_fee(transfer_value)')
+
+
+def _fill_ages(conn):
+    """Replaces the stored ages, copies of `matches_played`, with those of `ages` (NULL when unknown)."""
+    from .ages import load_ages
+
+    ages = load_ages()
+    conn.create_function('player_age', 3, ages.lookup, deterministic=True)
+    conn.execute('UPDATE players_stats SET age = player_age(player_name, season, position)')
+
+
+# Applied in order to databases whose `user_version` is below their position + 1.
+_MIGRATIONS = (_format_fees, _fill_ages)
+
+
+def rows_digest(rows):
+    """Returns a digest of a season's rows, independent of row order."""
+    h = hashlib.sha256()
+    for row in sorted(repr(tuple(row)) for row in rows):
+        h.update(row.encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def loaded_seasons(connection):
+    """Returns {season: digest} for every season in the table (digest None if unrecorded)."""
+    return dict(connection.execute('''
+        SELECT p.season, l.digest FROM (SELECT DISTINCT season FROM players_stats) p
+        LEFT JOIN season_loads l ON l.season = p.season
+    ''').fetchall())
+
+
+def upsert_season(connection, season, rows, digest=None):
+    """Replaces one season's rows in place, writing only rows that changed; returns a `RowDiff`.
+
+    The caller owns the transaction.
+    """
+    rows = list(rows)
+    return _replace_season(connection, season, rows, None, len(rows), digest or rows_digest(rows))
+
+
+def upsert_columns(connection, season, columns, digest=None):
+    """Like `upsert_season`, from a `SeasonColumns` and the row hashes computed at extraction."""
+    return _replace_season(connection, season, columns.iter_rows(), columns.row_hashes,
+                           len(columns), digest or columns.digest())
+
+
+def _replace_season(connection, season, rows, hashes, row_count, digest):
+    from .fingerprint import diff_rows, row_hash
+
+    cursor = connection.cursor()
+    # Hashing the stored rows of one season is cheaper than rewriting them.
+    stored = {(row[0], row[3]): row_hash(row) for row in cursor.execute(
+        f"SELECT {', '.join(PLAYERS_STATS_COLUMNS)} FROM players_stats WHERE season = ?", (season,))}
+    if hashes is None:
+        incoming = (((row[0], row[3]), row_hash(row), row) for row in rows)
+    else:
+        incoming = (((row[0], row[3]), h, row) for row, h in zip(rows, hashes))
+    diff = diff_rows(stored, incoming)
+    cursor.executemany(_UPSERT, diff.changed)
+    cursor.executemany('DELETE FROM players_stats WHERE player_name = ? AND season = ? AND position = ?',
+                       [(name, season, position) for name, position in diff.stale])
+    cursor.execute('INSERT OR REPLACE INTO season_loads VALUES (?, ?, ?, ?)',
+                   (season, digest, row_count, time.time()))
+    return diff
+
+
+def save_to_db(connection, data):
+    """Upserts rows of any seasons and commits."""
+    cursor = connection.cursor()
+    cursor.executemany(_UPSERT, data)
+    connection.commit()
+
+
+def export_to_excel(db_path, excel_path):
+    """Exports the whole `players_stats` table to an Excel file, streamed in chunks (see `export`)."""
+    from .export import export_table
+
+    return export_table(db_path, [excel_path])
+
+
+def main(argv=None):
+    from .warehouse import DECADE_DATABASES
+
+    parser = argparse.ArgumentParser(description="Bring decade databases in line with the fee and age registries.")
+    parser.add_argument('databases', nargs='*', default=DECADE_DATABASES)
+    args = parser.parse_args(argv)
+    for path in args.databases:
+        conn = init_database(path)
+        try:
+            applied = migrate(conn)
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+        finally:
+            conn.close()
+        print(f"{path}: {applied} migrations applied, at version {version}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""Streaming export of SQLite query results to Excel, CSV and Parquet.
+
+Rows are read from the cursor `chunk_size` at a time and handed to every
+sink in turn, so one pass over a table can feed several files and memory
+stays bounded by a chunk whatever the table size:
+
+    ExcelSink     openpyxl write-only workbook (rows are streamed to disk)
+    CsvSink       `csv.writer`
+    ParquetSink   one row group per chunk, through `pyarrow.parquet.ParquetWriter`
+
+Each sink writes to a temporary file that replaces the target only once
+the export succeeded; when a sink fails, the temporary files of the
+sinks not yet in place are removed.
+
+    python -m barca_data.export DB OUT [OUT ...] [--table players_stats | --query SQL] [--chunk N]
+
+picks the sink of each OUT from its extension (.xlsx, .csv, .parquet).
+"""
+import abc
+import argparse
+import csv
+import os
+import sqlite3
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class _Sink(abc.ABC):
+    """Writes to `path + '.tmp'`; `close()` moves it into place, `abort()` removes it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+
+    @abc.abstractmethod
+    def open(self, columns):
+        """Starts the file with the header `columns`."""
+
+    @abc.abstractmethod
+    def write(self, rows):
+        """Appends a chunk of rows."""
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        self._finish()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        try:
+            self._finish()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+class ExcelSink(_Sink):
+    def __init__(self, path, sheet_name='Sheet1'):
+        super().__init__(path)
+        self.sheet_name = sheet_name
+        self._workbook = None
+
+    def open(self, columns):
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(self.sheet_name)
+        self._sheet.append(list(columns))
+
+    def write(self, rows):
+        for row in rows:
+            self._sheet.append(row)
+
+    def _finish(self):
+        if self._workbook is not None:
+            self._workbook.save(self.tmp_path)
+            self._workbook = None
+
+
+class CsvSink(_Sink):
+    def __init__(self, path, encoding='utf-8'):
+        super().__init__(path)
+        self.encoding = encoding
+        self._file = None
+
+    def open(self, columns):
+        self._file = open(self.tmp_path, 'w', newline='', encoding=self.encoding)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def _finish(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink(_Sink):
+    """One row group per chunk. Columns of the history schema keep its types; others are inferred
+    from the first chunk (all-NULL columns become strings)."""
+
+    def __init__(self, path, schema=None, compression='zstd'):
+        super().__init__(path)
+        self.schema = schema
+        self.compression = compression
+        self._writer = None
+
+    def open(self, columns):
+        self.columns = list(columns)
+
+    def _schema(self, rows):
+        import pyarrow as pa
+
+        from .storage import SCHEMA
+
+        fields = []
+        for i, name in enumerate(self.columns):
+            if name in SCHEMA.names:
+                fields.append(SCHEMA.field(name))
+                continue
+            inferred = pa.array([row[i] for row in rows]).type
+            fields.append(pa.field(name, pa.string() if inferred == pa.null() else inferred))
+        return pa.schema(fields)
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.schema is None:
+            self.schema = self._schema(rows)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression=self.compression)
+        arrays = [pa.array(values, type=field.type) for field, values in zip(self.schema, zip(*rows))]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def _finish(self):
+        if self._writer is None and self.schema is None and hasattr(self, 'columns'):
+            # An empty result still gets a file with the columns, as strings.
+            import pyarrow as pa
+
+            self.schema = pa.schema([(name, pa.string()) for name in self.columns])
+        if self._writer is None and self.schema is not None:
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression=self.compression)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+SINKS = {'.xlsx': ExcelSink, '.csv': CsvSink, '.parquet': ParquetSink}
+
+
+def sink_for(path):
+    """The sink class for `path`'s extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"no export sink for {extension!r} files, expected one of {sorted(SINKS)}")
+    return SINKS[extension](path)
+
+
+def _abort(sinks):
+    """Aborts every sink in `sinks`, the next ones still when one fails to."""
+    for sink in sinks:
+        try:
+            sink.abort()
+        except Exception:
+            pass
+
+
+def stream(rows, columns, sinks, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Feeds `rows` (any iterable, or a cursor) to every sink, a chunk at a time; returns the row count."""
+    sinks = list(sinks)
+    fetch = rows.fetchmany if hasattr(rows, 'fetchmany') else None
+    iterator = None if fetch else iter(rows)
+    count = 0
+    try:
+        for sink in sinks:
+            sink.open(columns)
+        while True:
+            if fetch:
+                chunk = fetch(chunk_size)
+            else:
+                chunk = [row for _, row in zip(range(chunk_size), iterator)]
+            if not chunk:
+                break
+            for sink in sinks:
+                sink.write(chunk)
+            count += len(chunk)
+    except BaseException:
+        _abort(sinks)
+        raise
+    for i, sink in enumerate(sinks):
+        try:
+            sink.close()
+        except BaseException:
+            # The sinks already closed keep their file; this one and the rest leave no .tmp behind.
+            _abort(sinks[i:])
+            raise
+    return count
+
+
+def export_query(db_path, sql, sinks, params=(), chunk_size=DEFAULT_CHUNK_SIZE):
+    """Streams the result of `sql` on the database at `db_path` to `sinks`; returns the row count.
+
+    `sinks` are sink objects or output paths.
+    """
+    sinks = [sink_for(sink) if isinstance(sink, str) else sink for sink in sinks]
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(sql, params)
+        cursor.arraysize = chunk_size
+        return stream(cursor, [d[0] for d in cursor.description], sinks, chunk_size)
+    finally:
+        conn.close()
+
+
+def export_table(db_path, sinks, table='players_stats', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Streams a whole table, in rowid order, to `sinks`."""
+    return export_query(db_path, f'SELECT * FROM "{table}"', sinks, chunk_size=chunk_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a SQLite table or query to Excel, CSV and Parquet files.")
+    parser.add_argument('database')
+    parser.add_argument('outputs', nargs='+', help="files to write; the extension picks the format")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--table', default='players_stats')
+    source.add_argument('--query', help="SQL whose result is exported instead of a table")
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_SIZE, help="rows read per fetch")
+    args = parser.parse_args(argv)
+
+    if args.query:
+        rows = export_query(args.database, args.query, args.outputs, chunk_size=args.chunk)
+    else:
+        rows = export_table(args.database, args.outputs, args.table, args.chunk)
+    print(f"Exported {rows} rows to {', '.join(args.outputs)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Single-pass extraction of the manager and squad tables of a season page.
+
+`extract_page` parses a page once and pulls both the `taulaentrenadors`
+manager table and the `c3p0` squad table out of it. Backends:
+
+    lxml    libxml2 tree with XPath lookups (used when lxml is installed)
+    stream  stdlib tokenizer that builds no tree and stops after both tables
+    bs4     the reference BeautifulSoup code in `scrape`
+
+All three return exactly the rows `scrape.scrape_season_data` returns.
+"""
+import codecs
+import re
+from html.parser import HTMLParser
+
+from .ages import as_ages
+from .categories import decode_nationality, decode_position
+from .fees import as_registry
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - optional dependency
+    lxml_html = None
+
+SQUAD_TABLE = 'c3p0'
+MANAGER_TABLE = 'taulaentrenadors'
+MIN_COLUMNS = 15
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+
+def decode_page(html_content):
+    """Decodes page bytes the way the reference parser sees them (BOM, meta charset, UTF-8, cp1252)."""
+    if isinstance(html_content, str):
+        return html_content
+    for bom, encoding in ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'),
+                          (codecs.BOM_UTF16_BE, 'utf-16-be')):
+        if html_content.startswith(bom):
+            return html_content[len(bom):].decode(encoding)
+    match = _META_CHARSET.search(html_content, 0, 4096)
+    candidates = ([match.group(1).decode('ascii')] if match else []) + ['utf-8', 'windows-1252']
+    for encoding in candidates:
+        try:
+            return html_content.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return html_content.decode('utf-8', errors='replace')
+
+
+def _int(text, default=0):
+    return int(text) if text.isdigit() else default
+
+
+def build_row(texts, nat_classes, pos_classes, season_label, manager_name, fees=None, ages=None):
+    """Builds a `players_stats` tuple from the raw cell texts of one squad row; the age comes from `ages`."""
+    p_name = texts[3].strip()
+    position = decode_position(pos_classes)
+    yellow = _int(texts[12])
+    red = _int(texts[13])
+    goals_val = _int(texts[14])
+    return (
+        p_name,
+        season_label,
+        decode_nationality(nat_classes),
+        position,
+        as_ages(ages).lookup(p_name, season_label, position),
+        _int(texts[5]),
+        _int(texts[6]),
+        _int(texts[7]),
+        _int(texts[8]),
+        yellow + red,
+        _int(texts[11]),
+        yellow,
+        red,
+        goals_val,
+        goals_val,  # goal_contributions
+        manager_name,
+        as_registry(fees).get((p_name, season_label), "0"),
+    )
+
+
+# --- lxml backend ---
+
+def _lxml_squad(table):
+    for tr in list(table.iter('tr'))[1:]:  # Skip the header row
+        cols = tr.xpath('.//td')
+        if len(cols) < MIN_COLUMNS:
+            continue
+        nat_div = cols[2].xpath('.//div[contains(concat(" ", normalize-space(@class), " "), " pais ")]')
+        pos_div = next(cols[4].iter('div'), None)
+        yield ([td.text_content() for td in cols],
+               nat_div[0].get('class', '').split() if nat_div else None,
+               pos_div.get('class', '').split() if pos_div is not None else None)
+
+
+def _parse_lxml(html_content):
+    doc = lxml_html.document_fromstring(decode_page(html_content))
+
+    manager = "Unknown"
+    m_tables = doc.xpath(f'//table[@id="{MANAGER_TABLE}"]')
+    if m_tables:
+        manager = list(m_tables[0].iter('tr'))[-1].xpath('.//td')[2].text_content().strip()
+
+    tables = doc.xpath(f'//table[@id="{SQUAD_TABLE}"]')
+    return manager, _lxml_squad(tables[0]) if tables else iter(())
+
+
+# --- streaming backend ---
+
+class _TablesDone(Exception):
+    pass
+
+
+class _Cell:
+    __slots__ = ('parts', 'first_div', 'pais_div')
+
+    def __init__(self):
+        self.parts = []
+        self.first_div = None
+        self.pais_div = None
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+
+class _TableTokenizer(HTMLParser):
+    """Collects the rows of the first manager and squad tables, then stops."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = {MANAGER_TABLE: None, SQUAD_TABLE: None}
+        self._current = None  # id of the table being read
+        self._depth = 0
+        self._rows = None
+        self._open_cells = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._current is None:
+            if tag == 'table':
+                table_id = dict(attrs).get('id')
+                if table_id in self.tables and self.tables[table_id] is None:
+                    self._current, self._depth, self._rows = table_id, 1, []
+            return
+        if tag == 'table':
+            self._depth += 1
+        elif tag == 'tr':
+            self._open_cells = []
+            self._rows.append([])
+        elif tag == 'td' and self._rows:
+            cell = _Cell()
+            self._rows[-1].append(cell)
+            self._open_cells.append(cell)
+        elif tag == 'div' and self._open_cells:
+            classes = (dict(attrs).get('class') or '').split()
+            for cell in self._open_cells:
+                if cell.first_div is None:
+                    cell.first_div = classes
+                if cell.pais_div is None and 'pais' in classes:
+                    cell.pais_div = classes
+
+    def handle_endtag(self, tag):
+        if self._current is None:
+            return
+        if tag == 'td':
+            if self._open_cells:
+                self._open_cells.pop()
+        elif tag == 'tr':
+            self._open_cells = []
+        elif tag == 'table':
+            self._depth -= 1
+            if self._depth == 0:
+                self.tables[self._current] = self._rows
+                self._current, self._rows, self._open_cells = None, None, []
+                if all(rows is not None for rows in self.tables.values()):
+                    raise _TablesDone
+
+    def handle_data(self, data):
+        for cell in self._open_cells:
+            cell.parts.append(data)
+
+
+def _parse_stream(html_content):
+    tokenizer = _TableTokenizer()
+    try:
+        tokenizer.feed(decode_page(html_content))
+        tokenizer.close()
+    except _TablesDone:
+        pass
+    # A table left open at end of document still counts, as it does for the tree parsers.
+    if tokenizer._current is not None:
+        tokenizer.tables[tokenizer._current] = tokenizer._rows
+
+    manager = "Unknown"
+    m_rows = tokenizer.tables[MANAGER_TABLE]
+    if m_rows is not None:
+        manager = m_rows[-1][2].text.strip()
+
+    s_rows = tokenizer.tables[SQUAD_TABLE] or [[]]
+    return manager, (
+        ([cell.text for cell in cells], cells[2].pais_div, cells[4].first_div)
+        for cells in s_rows[1:]  # Skip the header row
+        if len(cells) >= MIN_COLUMNS
+    )
+
+
+def _extract_bs4(html_content, season_label, fees, ages):
+    from .scrape import scrape_page
+
+    return scrape_page(html_content, season_label, fees, ages)
+
+
+PARSERS = {
+    'lxml': _parse_lxml,
+    'stream': _parse_stream,
+}
+BACKENDS = tuple(PARSERS) + ('bs4',)
+
+
+def default_backend():
+    """Returns the fastest backend available here."""
+    return 'lxml' if lxml_html is not None else 'stream'
+
+
+def parse_page(html_content, backend=None):
+    """Parses a season page once; returns `(manager, raw_rows)`.
+
+    `raw_rows` lazily yields `(cell_texts, pais_classes, position_classes)`
+    for every squad row with enough columns.
+    """
+    backend = backend or default_backend()
+    if backend == 'lxml' and lxml_html is None:
+        raise ImportError("the lxml backend needs the 'lxml' package")
+    return PARSERS[backend](html_content)
+
+
+def extract_page(html_content, season_label, fees=None, backend=None, ages=None):
+    """Parses a season page once; returns `(manager, rows)`."""
+    if backend == 'bs4':
+        return _extract_bs4(html_content, season_label, fees, ages)
+    fees = as_registry(fees)
+    ages = as_ages(ages)
+    manager, raw_rows = parse_page(html_content, backend)
+    return manager, [build_row(texts, nat, pos, season_label, manager, fees, ages)
+                     for texts, nat, pos in raw_rows]
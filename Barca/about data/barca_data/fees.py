@@ -0,0 +1,216 @@
+"""Transfer-fee registry: one CSV file compiled into a cached lookup index.
+
+`transfer_fees.csv` (next to the decade folders) lists one fee per
+(season, player_name) in whole euros, with a status:
+
+    paid     a fee was paid; `fee_eur` is the amount
+    free     the player joined on a free transfer; `fee_eur` is 0
+
+Players that are not listed are `unknown`. Names are resolved against
+the entries of the same season with `identity.NameIndex`, so 'Ćirić',
+'Dragan Ciric' and an alias from `player_aliases.csv` find one entry.
+
+The compiled index is pickled under `.cache/` together with the digest
+of the CSV it came from, and is rebuilt only when the CSV changes.
+`TransferFees.get((player, season), default)` keeps the dict interface
+the scrapers always used, returning the display string ('660k',
+'7.30M', '0'); `lookup` returns the numeric `Fee`.
+
+    python -m barca_data.fees [--registry PATH]
+
+recompiles the index and prints a summary.
+"""
+import argparse
+import csv
+import hashlib
+import os
+import pickle
+import re
+from collections import namedtuple
+
+from .identity import NameIndex, load_aliases, name_key
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGISTRY_PATH = os.path.join(ABOUT_DATA, 'transfer_fees.csv')
+INDEX_DIR = os.path.join(ABOUT_DATA, '.cache', 'fees')
+# Bumped whenever the layout of the compiled index or `name_key` changes.
+INDEX_FORMAT = 2
+
+PAID = 'paid'
+FREE = 'free'
+UNKNOWN = 'unknown'
+STATUSES = (PAID, FREE, UNKNOWN)
+
+Fee = namedtuple('Fee', 'eur status')
+UNKNOWN_FEE = Fee(None, UNKNOWN)
+
+_FEE_TEXT = re.compile(r'^\s*€?\s*([0-9]+(?:[.,][0-9]+)?)\s*([kKmM]?)\s*$')
+
+
+def parse_fee(raw):
+    """Converts a fee in any of the historical formats to whole euros.
+
+    '660k' and '7.30M' carry their unit; bare numbers ('5.00', 15.0) are
+    millions, as in the 1999-2025 tables. Returns None for blanks.
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, (int, float)):
+        return int(round(raw * 1_000_000))
+    match = _FEE_TEXT.match(str(raw))
+    if not match:
+        if not str(raw).strip():
+            return None
+        raise ValueError(f"unrecognised transfer fee {raw!r}")
+    amount, unit = float(match.group(1).replace(',', '.')), match.group(2).lower()
+    return int(round(amount * (1_000 if unit == 'k' else 1_000_000)))
+
+
+def format_fee(eur):
+    """Display string of a fee in euros: '660k', '7.30M', or '0' for free/unknown."""
+    if not eur:
+        return "0"
+    if eur >= 1_000_000:
+        return f"{eur / 1_000_000:.2f}M"
+    return f"{eur / 1_000:g}k"
+
+
+def compile_registry(path=REGISTRY_PATH):
+    """Reads the registry CSV into `{(season, name key): Fee}`."""
+    index = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for line, record in enumerate(csv.DictReader(f), start=2):
+            status = record['status'].strip() or PAID
+            if status not in (PAID, FREE):
+                raise ValueError(f"{path}:{line}: unknown status {status!r}")
+            eur = 0 if status == FREE else int(record['fee_eur'])
+            key = (record['season'].strip(), name_key(record['player_name']))
+            if key in index:
+                raise ValueError(f"{path}:{line}: duplicate entry for {record['player_name']} "
+                                 f"in {record['season']}")
+            index[key] = Fee(eur, status)
+    return index
+
+
+class TransferFees:
+    """Fee lookups by (player, season) over a compiled index."""
+
+    def __init__(self, index, digest=None, aliases=None):
+        self.index = index
+        self.digest = digest
+        self.aliases = aliases
+        self._seasons = None
+        self._resolved = {}
+
+    @classmethod
+    def from_mapping(cls, fees):
+        """Builds a registry from a legacy `{(player, season): raw fee}` dict."""
+        index = {}
+        for (player, season), raw in fees.items():
+            eur = parse_fee(raw)
+            index[(season, name_key(player))] = Fee(eur or 0, PAID if eur else FREE)
+        return cls(index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return self.lookup(*key).status != UNKNOWN
+
+    def _season_index(self, season):
+        if self._seasons is None:
+            if self.aliases is None:
+                self.aliases = load_aliases()
+            self._seasons = {}
+            for entry_season, key in self.index:
+                if entry_season not in self._seasons:
+                    self._seasons[entry_season] = NameIndex(self.aliases)
+                self._seasons[entry_season].add(key, key)
+        return self._seasons.get(season)
+
+    def lookup(self, player, season):
+        """Returns the `Fee` of `player` in `season`; `UNKNOWN_FEE` when not listed."""
+        fee = self.index.get((season, name_key(player)))
+        if fee is not None:
+            return fee
+        if (player, season) not in self._resolved:
+            names = self._season_index(season)
+            key = names.best_key(player) if names is not None else None
+            self._resolved[player, season] = self.index[season, key] if key is not None else UNKNOWN_FEE
+        return self._resolved[player, season]
+
+    def get(self, key, default="0"):
+        """Dict-style access returning the display string of the fee."""
+        fee = self.lookup(*key)
+        return default if fee.status == UNKNOWN else format_fee(fee.eur)
+
+    def items(self):
+        return self.index.items()
+
+
+def _file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+_loaded = {}
+
+
+def load_registry(path=REGISTRY_PATH, index_dir=INDEX_DIR):
+    """Returns the registry at `path`, from the compiled index when the CSV has not changed."""
+    digest = _file_digest(path)
+    key = os.path.abspath(path)
+    cached = _loaded.get(key)
+    if cached is not None and cached.digest == digest:
+        return cached
+
+    index_path = os.path.join(index_dir, 'transfer_fees.pickle') if index_dir else None
+    index = None
+    if index_path and os.path.exists(index_path):
+        try:
+            with open(index_path, 'rb') as f:
+                stored_format, stored_digest, entries = pickle.load(f)
+            if stored_format == INDEX_FORMAT and stored_digest == digest:
+                index = {key: Fee(*fee) for key, fee in entries.items()}
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            index = None
+    if index is None:
+        index = compile_registry(path)
+        if index_path:
+            os.makedirs(index_dir, exist_ok=True)
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                # Plain tuples, so the pickle does not depend on where `Fee` was imported from.
+                entries = {key: tuple(fee) for key, fee in index.items()}
+                pickle.dump((INDEX_FORMAT, digest, entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, index_path)
+
+    registry = _loaded[key] = TransferFees(index, digest)
+    return registry
+
+
+def as_registry(fees=None):
+    """Accepts None (the default registry), a `TransferFees`, or a legacy fee dict."""
+    if fees is None:
+        return load_registry()
+    if isinstance(fees, TransferFees):
+        return fees
+    return TransferFees.from_mapping(fees)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the transfer-fee registry.")
+    parser.add_argument('--registry', default=REGISTRY_PATH)
+    args = parser.parse_args(argv)
+    registry = load_registry(args.registry)
+    counts = {status: 0 for status in (PAID, FREE)}
+    total = 0
+    for _key, fee in registry.items():
+        counts[fee.status] += 1
+        total += fee.eur
+    print(f"{len(registry)} fees ({counts[PAID]} paid, {counts[FREE]} free), "
+          f"{total / 1_000_000:.1f}M EUR in total")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Content hashes of `players_stats` rows, for change detection and deduplication.
+
+`row_hash` is a 64-bit BLAKE2b digest of a row's 17 values, returned as a
+signed integer so SQLite keeps it in an INTEGER column. `extract_columns`
+computes it for every row it decodes (`SeasonColumns.row_hashes`), the
+warehouse stores it in the indexed `player_season.row_hash` column, and
+both writers compare the hashes of a season's incoming rows with those
+already stored under the same key:
+
+    same key, same hash     unchanged re-scrape, not written
+    same key, other hash    changed row, updated
+    new key                 inserted
+    key no longer listed    deleted
+
+so reloading a season that did not change writes nothing.
+
+`dedupe_frame` replaces the positional cleanup of the notebooks
+(`df.drop([20, 29])` in `fix.ipynb`, Excel rows 603-628 in
+`Barca_Data_Legacy.ipynb`), which broke whenever the input shifted.
+"""
+import hashlib
+from collections import namedtuple
+
+from .db import KEY_COLUMNS, PLAYERS_STATS_COLUMNS
+
+# `changed` rows to write, the count of `unchanged` ones, and the `stale` keys to delete.
+RowDiff = namedtuple('RowDiff', 'changed unchanged stale')
+
+
+def row_hash(row):
+    """64-bit content hash of a row of plain Python values (ints, strings, None)."""
+    digest = hashlib.blake2b(repr(tuple(row)).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def row_hashes(rows):
+    return [row_hash(row) for row in rows]
+
+
+def diff_rows(stored, incoming):
+    """Compares `incoming` `(key, fingerprint, item)` triples with `stored` `{key: fingerprint}`.
+
+    Returns a `RowDiff` whose `changed` holds the items to write; when a
+    key repeats in `incoming` the last item wins, as with an upsert.
+    """
+    latest = {}
+    for key, fingerprint, item in incoming:
+        latest[key] = (fingerprint, item)
+    changed = [item for key, (fingerprint, item) in latest.items() if stored.get(key) != fingerprint]
+    stale = [key for key in stored if key not in latest]
+    return RowDiff(changed, len(latest) - len(changed), stale)
+
+
+def frame_hashes(frame, columns=PLAYERS_STATS_COLUMNS):
+    """Content hash of every DataFrame row over `columns` (those present), as a uint64 Series."""
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(frame[[c for c in columns if c in frame]], index=False)
+
+
+def placeholder_rows(frame):
+    """Mask of squad listings that carry no data: no age and no match played.
+
+    These are the rows `fix.ipynb` dropped by position (Tarrés and Mir in 1979-80).
+    """
+    age = frame['age']
+    return (age.isna() | (age == 0)) & (frame['matches_played'] == 0)
+
+
+def dedupe_frame(frame, drop_placeholders=False):
+    """Drops repeated rows of a history DataFrame by key, not by position.
+
+    Of rows sharing a (player_name, season, position) key, exact copies or
+    not (a season exported twice, from two decade databases), the last is
+    kept, as `db.init_database` does. With `drop_placeholders` the rows of
+    `placeholder_rows` go as well.
+    """
+    keep = ~frame.duplicated(subset=list(KEY_COLUMNS), keep='last').to_numpy()
+    if drop_placeholders:
+        keep &= ~placeholder_rows(frame).to_numpy()
+    return frame[keep].reset_index(drop=True)
+
+
+def changed_rows(old, new):
+    """Mask of the rows of `new` with no identical row in `old`, by content hash."""
+    return ~frame_hashes(new).isin(set(frame_hashes(old))).to_numpy()
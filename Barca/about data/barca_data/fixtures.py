@@ -0,0 +1,79 @@
+"""Offline stand-ins for bdfutbol season pages.
+
+Season pages saved from bdfutbol (`t1982-831.html`, ...) can be loaded
+from a directory. When none are at hand, pages are rendered from rows
+already stored in a decade database, in the same markup that
+`scrape_season_data` reads, so that scraping a rendered page gives the
+stored rows back.
+"""
+import html
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+
+from .categories import COUNTRY_CLASSES, POSITION_CLASSES
+from .seasons import BARCELONA
+
+# Season label, then the bdfutbol team number (1 for Barcelona).
+PAGE_NAME = re.compile(r't(\d{4}-\d{2})(\d+)\.html$')
+
+def _nationality_cell(nationality):
+    if nationality in (None, 'Unknown'):
+        return '<td></td>'
+    cls = COUNTRY_CLASSES.get(nationality, nationality.lower())
+    return f'<td><div class="pais {html.escape(cls)}"></div></td>'
+
+
+def _player_row(row):
+    (name, _season, nationality, position, _age, played, started, completed, subs,
+     _cards, minutes, yellow, red, goals) = row[:14]
+    pos_cls = POSITION_CLASSES.get(position, 'xxx')
+    stats = [played, started, completed, subs, '', '', minutes, yellow, red, goals]
+    cells = ''.join(f'<td>{"" if v is None else v}</td>' for v in stats)
+    return (f'<tr><td></td><td></td>{_nationality_cell(nationality)}'
+            f'<td>{html.escape(name)}</td><td><div class="{pos_cls}"></div></td>{cells}</tr>')
+
+
+def render_season_page(rows, manager_name):
+    """Renders a season page holding a manager table and a `c3p0` squad table.
+
+    Ages and fees are not rendered: parsers take them from `ages` and `fees`.
+    """
+    body = '\n'.join(_player_row(row) for row in rows)
+    return (
+        '<html><head><meta charset="utf-8"></head><body>'
+        '<table id="taulaentrenadors"><tr><th></th><th></th><th>Coach</th></tr>'
+        f'<tr><td></td><td></td><td>{html.escape(manager_name)}</td></tr></table>'
+        '<table id="c3p0"><tr><th>#</th><th></th><th></th><th>Player</th><th></th>'
+        '<th>PJ</th><th>PT</th><th>PC</th><th>PS</th><th></th><th></th>'
+        '<th>Min</th><th>TA</th><th>TR</th><th>G</th></tr>\n'
+        f'{body}\n</table></body></html>'
+    ).encode('utf-8')
+
+
+def pages_from_db(db_path):
+    """Renders one page per season stored in a `players_stats` database."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT * FROM players_stats ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+    seasons = OrderedDict()
+    for row in rows:
+        seasons.setdefault(row[1], []).append(row)
+    return OrderedDict(
+        (label, render_season_page(season_rows, season_rows[-1][15] or 'Unknown'))
+        for label, season_rows in seasons.items()
+    )
+
+
+def load_pages(directory, club=BARCELONA):
+    """Loads saved `t{season}{club}.html` pages of one club from a directory, keyed by season label."""
+    pages = OrderedDict()
+    for name in sorted(os.listdir(directory)):
+        match = PAGE_NAME.match(name)
+        if match and int(match.group(2)) == club:
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages[match.group(1)] = f.read()
+    return pages
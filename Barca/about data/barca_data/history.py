@@ -0,0 +1,251 @@
+"""Versioned history of the warehouse's `players_stats`, for "as of" queries.
+
+Every write transaction of the warehouse (`Warehouse.write()`, which
+`bulk_load()` uses) makes one version, numbered in `snapshots` with its
+time and a note. The fact table stays the latest version, each row
+carrying the `version` that last wrote it; when a row is changed or
+deleted, triggers keep the content it replaces as a delta:
+
+    snapshots              version, taken_at, note
+    player_season_history  a fact row as it was from version `valid_from`
+                           up to, not including, `valid_to`, and the rowid
+                           it had (`row_id`), so that an old version reads
+                           back in its original row order
+
+A version therefore costs the rows it changed and no copy of the rest,
+and reading the latest version is reading `players_stats`, as before.
+`as_of_query` gives the SQL of `players_stats` as of a version (the view's
+columns, in row order), `version_at` the version current at a given time
+and `player_history` every version of one player's rows, e.g. how their
+minutes grew over a live season. Writes made outside `Warehouse.write()`
+amend the latest version; rows loaded before the history existed are
+version 0. A write that changed no row leaves no version behind.
+
+    python -m barca_data.history [--path PATH] list
+    python -m barca_data.history [--path PATH] show --as-of VERSION|DATE [--season SEASON]
+    python -m barca_data.history [--path PATH] player NAME [--season SEASON]
+    python -m barca_data.history [--path PATH] export --as-of VERSION|DATE OUT [OUT ...]
+"""
+import argparse
+import datetime
+import os
+import time
+
+from .db import PLAYERS_STATS_COLUMNS
+
+# The fact columns kept for a past version, `player_season`'s less `version`.
+FACT_COLUMNS = (
+    'season_id', 'player_id', 'position_id', 'manager_id', 'age', 'matches_played', 'matches_started',
+    'matches_completed', 'matches_as_substitute', 'total_cards', 'minutes_played', 'yellow_cards',
+    'red_cards', 'goals', 'goal_contributions', 'transfer_value', 'transfer_value_numeric',
+    'transfer_status', 'row_hash',
+)
+STAT_COLUMNS = PLAYERS_STATS_COLUMNS[4:15]
+
+_OLD = ', '.join(f'old.{c}' for c in FACT_COLUMNS)
+
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS snapshots (
+    version INTEGER PRIMARY KEY,
+    taken_at REAL NOT NULL,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS player_season_history (
+    row_id INTEGER NOT NULL,
+    season_id INTEGER NOT NULL, player_id INTEGER NOT NULL, position_id INTEGER NOT NULL,
+    manager_id INTEGER,
+    age INTEGER, matches_played INTEGER, matches_started INTEGER,
+    matches_completed INTEGER, matches_as_substitute INTEGER,
+    total_cards INTEGER, minutes_played INTEGER, yellow_cards INTEGER,
+    red_cards INTEGER, goals INTEGER, goal_contributions INTEGER,
+    transfer_value TEXT, transfer_value_numeric INTEGER, transfer_status TEXT,
+    row_hash INTEGER,
+    valid_from INTEGER NOT NULL,
+    valid_to INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS player_season_history_to ON player_season_history (valid_to);
+CREATE INDEX IF NOT EXISTS player_season_history_from ON player_season_history (valid_from);
+CREATE INDEX IF NOT EXISTS player_season_history_player ON player_season_history (player_id);
+CREATE INDEX IF NOT EXISTS player_season_version ON player_season (version);
+
+-- A row rewritten within the version that wrote it was never part of a finished version: not kept.
+CREATE TRIGGER IF NOT EXISTS player_season_history_update AFTER UPDATE ON player_season
+WHEN old.version IS NOT new.version BEGIN
+    INSERT INTO player_season_history
+    VALUES (old.rowid, {_OLD}, COALESCE(old.version, 0), new.version);
+END;
+CREATE TRIGGER IF NOT EXISTS player_season_history_delete AFTER DELETE ON player_season BEGIN
+    INSERT INTO player_season_history
+    SELECT old.rowid, {_OLD}, COALESCE(old.version, 0), v.version
+    FROM (SELECT COALESCE(MAX(version), 0) AS version FROM snapshots) v
+    WHERE v.version IS NOT COALESCE(old.version, 0);
+END;
+'''
+
+_VIEW_COLUMNS = '''p.player_name, s.season, p.nationality, pos.position, f.age,
+       f.matches_played, f.matches_started, f.matches_completed, f.matches_as_substitute,
+       f.total_cards, f.minutes_played, f.yellow_cards, f.red_cards, f.goals,
+       f.goal_contributions, m.raw_name AS manager_name, f.transfer_value,
+       f.transfer_value_numeric, f.transfer_status, f.player_id'''
+_LOOKUPS = '''JOIN seasons s USING (season_id)
+JOIN players p USING (player_id)
+JOIN positions pos USING (position_id)
+LEFT JOIN managers m USING (manager_id)'''
+_FACTS = ', '.join(FACT_COLUMNS)
+
+
+def install(conn):
+    """Creates the history tables and triggers; `player_season.version` must exist."""
+    conn.executescript(SCHEMA)
+
+
+def open_version(conn, note=None):
+    """Starts a version for the writes of the caller's transaction; returns its number."""
+    return conn.execute('INSERT INTO snapshots (taken_at, note) VALUES (?, ?)', (time.time(), note)).lastrowid
+
+
+def close_version(conn, version):
+    """Drops `version` again if it changed no row; returns whether it was kept."""
+    return conn.execute('''
+        DELETE FROM snapshots WHERE version = ?
+            AND NOT EXISTS (SELECT 1 FROM player_season WHERE version = ?)
+            AND NOT EXISTS (SELECT 1 FROM player_season_history WHERE valid_to = ?)
+    ''', (version, version, version)).rowcount == 0
+
+
+def current_version(warehouse):
+    """The latest version (0 before the first)."""
+    return warehouse.query('SELECT COALESCE(MAX(version), 0) FROM snapshots')[0][0]
+
+
+def version_at(warehouse, when):
+    """The version that was current at `when` (a Unix time), 0 when that is before the first."""
+    return warehouse.query('SELECT COALESCE(MAX(version), 0) FROM snapshots WHERE taken_at <= ?', (when,))[0][0]
+
+
+def versions(warehouse):
+    """(version, taken at, note, rows written, rows replaced or deleted) of every version."""
+    return warehouse.query('''
+        SELECT v.version, v.taken_at, v.note,
+               (SELECT COUNT(*) FROM player_season WHERE version = v.version)
+                 + (SELECT COUNT(*) FROM player_season_history WHERE valid_from = v.version),
+               (SELECT COUNT(*) FROM player_season_history WHERE valid_to = v.version)
+        FROM snapshots v
+        ORDER BY v.version
+    ''')
+
+
+def as_of_query(version, season=None):
+    """(sql, params) of `players_stats` as it was at `version`, in row order, optionally one season."""
+    sql = f'''
+        SELECT {_VIEW_COLUMNS}
+        FROM (
+            SELECT rowid AS row_id, {_FACTS} FROM player_season WHERE COALESCE(version, 0) <= ?
+            UNION ALL
+            SELECT row_id, {_FACTS} FROM player_season_history WHERE valid_to > ? AND valid_from <= ?
+        ) f
+        {_LOOKUPS}
+    '''
+    params = [version, version, version]
+    if season is not None:
+        sql += 'WHERE s.season = ?\n'
+        params.append(season)
+    return sql + 'ORDER BY f.row_id', params
+
+
+def players_stats_as_of(warehouse, version, season=None):
+    """The rows of `players_stats` at `version`, with the view's columns."""
+    return warehouse.query(*as_of_query(version, season))
+
+
+def player_history(warehouse, player_id, season=None):
+    """(version, taken at, season, position, *stat columns) of every version of a player's rows.
+
+    Oldest first within each season and position; `taken at` is None for version 0.
+    """
+    stats = ', '.join(f'f.{c}' for c in STAT_COLUMNS)
+    sql = f'''
+        SELECT f.valid_from, v.taken_at, s.season, pos.position, {stats}
+        FROM (
+            SELECT COALESCE(version, 0) AS valid_from, {_FACTS} FROM player_season WHERE player_id = ?
+            UNION ALL
+            SELECT valid_from, {_FACTS} FROM player_season_history WHERE player_id = ?
+        ) f
+        JOIN seasons s USING (season_id)
+        JOIN positions pos USING (position_id)
+        LEFT JOIN snapshots v ON v.version = f.valid_from
+    '''
+    params = [player_id, player_id]
+    if season is not None:
+        sql += 'WHERE s.season = ?\n'
+        params.append(season)
+    return warehouse.query(sql + 'ORDER BY s.season, pos.position, f.valid_from', params)
+
+
+def _timestamp(taken_at):
+    return '-' if taken_at is None else datetime.datetime.fromtimestamp(taken_at).isoformat(' ', 'seconds')
+
+
+def resolve_version(warehouse, as_of):
+    """A version number from `--as-of`: a version, or an ISO date or time to take the version current then."""
+    if as_of.isdigit():
+        return int(as_of)
+    try:
+        when = datetime.datetime.fromisoformat(as_of)
+    except ValueError:
+        raise SystemExit(f"--as-of: {as_of!r} is neither a version nor an ISO date")
+    if len(as_of) == 10:  # a date alone: as of the end of that day
+        when += datetime.timedelta(days=1, microseconds=-1)
+    return version_at(warehouse, when.timestamp())
+
+
+def main(argv=None):
+    from .warehouse import WAREHOUSE_PATH, Warehouse
+
+    parser = argparse.ArgumentParser(description="Versions of the warehouse and its data as of one of them.")
+    parser.add_argument('--path', default=WAREHOUSE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="every version with its time, note and row counts")
+    show = commands.add_parser('show', help="print players_stats as of a version")
+    player = commands.add_parser('player', help="every version of one player's rows")
+    player.add_argument('name')
+    export = commands.add_parser('export', help="export players_stats as of a version (.xlsx/.csv/.parquet)")
+    export.add_argument('outputs', nargs='+')
+    for command in (show, export):
+        command.add_argument('--as-of', required=True, help="version number, or ISO date or time")
+    for command in (show, player, export):
+        command.add_argument('--season')
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        raise SystemExit(f"no warehouse at {args.path}; build it with `python -m barca_data load`")
+
+    warehouse = Warehouse(args.path)
+    try:
+        if args.command == 'list':
+            for version, taken_at, note, written, replaced in versions(warehouse):
+                print(f"{version:6}  {_timestamp(taken_at)}  {written:6} written {replaced:6} replaced  {note or ''}")
+        elif args.command == 'player':
+            player_id = warehouse.resolve_player(args.name, args.season)
+            if player_id is None:
+                raise SystemExit(f"no player matches {args.name!r}")
+            print('\t'.join(('version', 'taken_at', 'season', 'position') + STAT_COLUMNS))
+            for version, taken_at, *row in player_history(warehouse, player_id, args.season):
+                print('\t'.join([str(version), _timestamp(taken_at)] + ['' if v is None else str(v) for v in row]))
+        else:
+            version = resolve_version(warehouse, args.as_of)
+            sql, params = as_of_query(version, args.season)
+            if args.command == 'show':
+                print(f"# as of version {version}")
+                for row in warehouse.query(sql, params):
+                    print('\t'.join('' if v is None else str(v) for v in row))
+            else:
+                from .export import export_query
+
+                rows = export_query(args.path, sql, args.outputs, params)
+                print(f"Exported {rows} rows as of version {version} to {', '.join(args.outputs)}")
+    finally:
+        warehouse.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Player identity resolution: folded name keys, aliases and a trigram index.
+
+bdfutbol, the fee lists and the `fix/` season maps spell players
+differently: accents ('Ćirić' / 'Ciric'), short and full forms ('Arthur'
+/ 'Arthur Melo', 'Ter Stegen' / 'Marc-André ter Stegen') and plain typos.
+Names are compared on `name_key`, which folds case, accents and
+punctuation. A name resolves, in order, by:
+
+    exact     same key
+    alias     listed in `player_aliases.csv` (alias -> scraped name)
+    fuzzy     the single best candidate whose tokens contain the other's,
+              or whose trigram similarity reaches `MATCH_THRESHOLD`
+
+Fuzzy candidates come from inverted token and trigram lists, so a lookup
+touches only names sharing a trigram with the query instead of the whole
+roster. Callers block by season (one index per season roster) where they
+can, which keeps both the candidate lists and the false positives small.
+
+The warehouse gives every (scraped name, nationality) a stable
+`player_id` and resolves external names onto it with `PlayerResolver`.
+"""
+import csv
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALIASES_PATH = os.path.join(ABOUT_DATA, 'player_aliases.csv')
+
+MATCH_THRESHOLD = 0.75
+CONTAINED_SCORE = 0.9
+
+_FOLD = str.maketrans({'ð': 'd', 'Ð': 'D', 'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L', 'ß': 'ss',
+                       'æ': 'ae', 'Æ': 'AE', 'đ': 'd', 'Đ': 'D', 'ı': 'i'})
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def name_key(name):
+    """Folds case, accents and punctuation: 'Marc-André  ter Stegen' -> 'marc andre ter stegen'."""
+    decomposed = unicodedata.normalize('NFKD', name.translate(_FOLD))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(' ', stripped.casefold()).strip()
+
+
+def trigrams(key):
+    """Character trigrams of a key, padded so short names still have a few."""
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Scores two name keys in [0, 1]; a short form contained in a full name scores `CONTAINED_SCORE`."""
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if tokens_a and tokens_b and (tokens_a <= tokens_b or tokens_b <= tokens_a):
+        return CONTAINED_SCORE
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def load_aliases(path=ALIASES_PATH):
+    """Reads the alias table into `{alias key: name key}`; an absent file means no aliases."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {name_key(record['alias']): name_key(record['player_name']) for record in csv.DictReader(f)}
+
+
+class NameIndex:
+    """Names mapped to values (ids, fees, row numbers), with alias and fuzzy lookups."""
+
+    def __init__(self, aliases=None):
+        self.aliases = {} if aliases is None else aliases
+        self._values = defaultdict(list)   # name key -> values
+        self._grams = defaultdict(set)     # trigram -> name keys
+        self._tokens = defaultdict(set)    # token -> name keys
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, name, value):
+        key = name_key(name)
+        if key not in self._values:
+            for gram in trigrams(key):
+                self._grams[gram].add(key)
+            for token in key.split():
+                self._tokens[token].add(key)
+        self._values[key].append(value)
+
+    def candidates(self, key):
+        """Keys sharing a token or a third of their trigrams with `key`."""
+        grams = trigrams(key)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        shared = {k for k, n in counts.items() if 3 * n >= len(grams)}
+        for token in key.split():
+            shared.update(self._tokens.get(token, ()))
+        return shared
+
+    def best_key(self, name, threshold=MATCH_THRESHOLD):
+        """The indexed key `name` resolves to, or None when nothing or several keys tie."""
+        key = name_key(name)
+        if key in self._values:
+            return key
+        alias = self.aliases.get(key)
+        if alias in self._values:
+            return alias
+        best, best_score, tied = None, 0.0, False
+        for candidate in self.candidates(key):
+            score = similarity(key, candidate)
+            if score > best_score:
+                best, best_score, tied = candidate, score, False
+            elif score == best_score:
+                tied = True
+        return best if best_score >= threshold and not tied else None
+
+    def resolve(self, name, threshold=MATCH_THRESHOLD):
+        """Values recorded under the key `name` resolves to; empty when unresolved."""
+        key = self.best_key(name, threshold)
+        return list(self._values[key]) if key is not None else []
+
+
+class PlayerResolver:
+    """Resolves names to stable player ids, blocked by season when one is given."""
+
+    def __init__(self, players, appearances=(), aliases=None):
+        """`players` yields `(player_id, player_name)`, `appearances` `(season, player_id)`."""
+        self.aliases = load_aliases() if aliases is None else aliases
+        self.names = {}
+        self.everyone = NameIndex(self.aliases)
+        for player_id, player_name in players:
+            self.names[player_id] = player_name
+            self.everyone.add(player_name, player_id)
+        self.by_season = defaultdict(lambda: NameIndex(self.aliases))
+        for season, player_id in appearances:
+            self.by_season[season].add(self.names[player_id], player_id)
+
+    def resolve_all(self, name, season=None):
+        """Every player id `name` may refer to (homonyms share a name)."""
+        index = self.by_season[season] if season in self.by_season else self.everyone
+        return sorted(set(index.resolve(name)))
+
+    def resolve(self, name, season=None):
+        """The player id of `name`, or None when it is unknown or ambiguous."""
+        ids = self.resolve_all(name, season)
+        return ids[0] if len(ids) == 1 else None
@@ -0,0 +1,167 @@
+"""Timers, counters and the JSON run report of a scrape.
+
+One `Metrics` is shared by the crawler, the pipeline and `run_seasons`
+(all thread-safe) and collects:
+
+    fetch           per page, cache included   fetch.request  per HTTP request
+    fetch.paced     rate limiter waits         parse          per page, in the parser
+    write           per batch                  insert         per season upsert
+    blocked.*       stage waits on a full queue (backpressure)
+    export          the Excel export
+    counters        bytes fetched, HTTP statuses, retries, rows inserted, ...
+
+`report()` turns them into a JSON-ready dict: count, total, mean, p50,
+p95 and max per timer, the counters, and rates such as rows inserted per
+second of insert time.
+
+The parse stage can be profiled (`ParseProfile`): 'cprofile' merges the
+parser processes' cProfile stats into one `pstats.Stats`, 'tracemalloc'
+records each page's peak allocation.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILERS = ('cprofile', 'tracemalloc')
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Metrics:
+    """Named timers (lists of seconds) and counters."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.timers = {}
+        self.counters = {}
+        self.info = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self.timers.setdefault(name, []).append(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def total(self, name):
+        with self._lock:
+            return sum(self.timers.get(name, ()))
+
+    def summary(self, name):
+        with self._lock:
+            ordered = sorted(self.timers.get(name, ()))
+        total = sum(ordered)
+        return {
+            'count': len(ordered),
+            'total_s': round(total, 6),
+            'mean_ms': round(1000 * total / len(ordered), 3) if ordered else 0.0,
+            'p50_ms': round(1000 * _percentile(ordered, 0.5), 3),
+            'p95_ms': round(1000 * _percentile(ordered, 0.95), 3),
+            'max_ms': round(1000 * ordered[-1], 3) if ordered else 0.0,
+        }
+
+    def report(self):
+        """The run as a JSON-ready dict."""
+        with self._lock:
+            names = sorted(self.timers)
+            counters = dict(sorted(self.counters.items()))
+        report = {
+            'started_at': self.started,
+            'wall_s': round(time.time() - self.started, 6),
+            'timers': {name: self.summary(name) for name in names},
+            'counters': counters,
+            **self.info,
+        }
+        rates = {}
+        if counters.get('rows.inserted') and self.total('insert'):
+            rates['rows_inserted_per_s'] = round(counters['rows.inserted'] / self.total('insert'), 1)
+        if counters.get('pages.parsed') and self.total('parse'):
+            rates['pages_parsed_per_s'] = round(counters['pages.parsed'] / self.total('parse'), 1)
+        if counters.get('bytes.fetched') and self.total('fetch.request'):
+            rates['bytes_fetched_per_s'] = round(counters['bytes.fetched'] / self.total('fetch.request'))
+        report['rates'] = rates
+        return report
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+            f.write('\n')
+
+    def print_summary(self):
+        for name in sorted(self.timers):
+            s = self.summary(name)
+            print(f"  {name:14} n={s['count']:<5} total {s['total_s']:8.3f}s  "
+                  f"p50 {s['p50_ms']:8.2f} ms  p95 {s['p95_ms']:8.2f} ms")
+
+
+class _LoadedStats:
+    # What `pstats.Stats` accepts in place of a profiler: raw stats that need no collecting.
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class ParseProfile:
+    """Profiles `function(*args)` with `kind` in a parser process; the result travels back pickled."""
+
+    def __init__(self, kind):
+        if kind not in PROFILERS:
+            raise ValueError(f"unknown profiler {kind!r}, expected one of {PROFILERS}")
+        self.kind = kind
+
+    def call(self, function, *args):
+        """Returns `(result, sample)`; merge samples with `merge`."""
+        if self.kind == 'cprofile':
+            import cProfile
+
+            profile = cProfile.Profile()
+            result = profile.runcall(function, *args)
+            profile.create_stats()
+            return result, profile.stats
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = function(*args)
+        return result, tracemalloc.get_traced_memory()[1] - base
+
+    def merge(self, samples, metrics=None):
+        """cProfile: one `pstats.Stats` of all pages. tracemalloc: peak bytes, also put in `metrics.info`."""
+        if self.kind == 'cprofile':
+            import pstats
+
+            stats = None
+            for sample in samples:
+                if stats is None:
+                    stats = pstats.Stats(_LoadedStats(sample))
+                else:
+                    stats.add(_LoadedStats(sample))
+            return stats
+        import tracemalloc
+
+        tracemalloc.stop()  # parsing in a thread traced this process
+        peaks = sorted(samples)
+        summary = {'pages': len(peaks), 'max_peak_bytes': peaks[-1] if peaks else 0,
+                   'p50_peak_bytes': _percentile(peaks, 0.5)}
+        if metrics is not None:
+            metrics.info['parse_memory'] = summary
+        return summary
@@ -0,0 +1,217 @@
+"""Streaming fetch -> parse -> write pipeline over bounded queues.
+
+    fetchers  `SeasonCrawler.fetch` on the crawler's thread pool
+    parsers   `extract_columns` in a process pool (HTML parsing is CPU-bound)
+    writer    one thread that hands batches of parsed seasons to `write`
+
+Stages are joined by queues of at most `queue_size` items and the
+parsers by at most `2 * parsers` pages in flight, so a stage that falls
+behind blocks the ones before it: memory stays flat however many seasons
+are queued, and stages overlap, so a run takes about as long as its
+slowest stage rather than the sum of all of them. Results reach the
+writer in the order the years were given. A page that fails to fetch or
+parse is passed on with its error, never dropped.
+
+Stage timings go to the crawler's `Metrics`: 'parse' per page (timed in
+the parser), 'write' per batch, and 'blocked.fetch' / 'blocked.parse'
+whenever a stage waited on a full queue. With `profile` ('cprofile' or
+'tracemalloc') every parse is profiled and `profile_result` holds the
+merged outcome after `run`.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .columns import extract_columns
+from .crawler import SeasonResult
+from .fees import as_registry
+from .metrics import ParseProfile
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_BATCH_SIZE = 8
+
+_DONE = object()
+
+# Per parser process, set by `_init_parser`.
+_fees = None
+_backend = None
+_profile = None
+
+
+def _init_parser(fees, backend, profile):
+    global _fees, _backend, _profile
+    _fees, _backend, _profile = as_registry(fees), backend, profile
+
+
+def _timed_parse(content, season_label, fees, backend, profile):
+    """Returns `((manager, columns), seconds, profile sample or None)`."""
+    start = time.perf_counter()
+    if profile is None:
+        result, sample = extract_columns(content, season_label, fees, backend), None
+    else:
+        result, sample = profile.call(extract_columns, content, season_label, fees, backend)
+    return result, time.perf_counter() - start, sample
+
+
+def _parse(content, season_label):
+    return _timed_parse(content, season_label, _fees, _backend, _profile)
+
+
+class _Stopped(Exception):
+    pass
+
+
+class Pipeline:
+    """Runs seasons through bounded fetch, parse and write stages."""
+
+    def __init__(self, crawler, fees=None, backend=None, parsers=None,
+                 queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE, profile=None):
+        """`parsers` is the parser process count (default: CPU count); 0 parses in a thread."""
+        self.crawler = crawler
+        self.metrics = crawler.metrics
+        self.fees = as_registry(fees)
+        self.backend = backend
+        self.parsers = (os.cpu_count() or 1) if parsers is None else parsers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.profile = ParseProfile(profile) if profile else None
+        self.profile_result = None
+        self._samples = []
+        self._stop = threading.Event()
+
+    def _put(self, q, item, stage):
+        # A blocking put that gives up when another stage failed.
+        try:
+            return q.put_nowait(item)
+        except queue.Full:
+            pass
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return self.metrics.observe(f'blocked.{stage}', time.perf_counter() - start)
+            except queue.Full:
+                pass
+        raise _Stopped
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        raise _Stopped
+
+    def _stage(self, target, errors, *args):
+        try:
+            target(*args)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            self._stop.set()
+
+    def _fetch(self, years, pages):
+        for page in self.crawler.fetch_pages(years):
+            self._put(pages, page, 'fetch')
+        self._put(pages, _DONE, 'fetch')
+
+    def _parsed(self, page, parsed, results):
+        (manager, columns), seconds, sample = parsed
+        self.metrics.observe('parse', seconds)
+        self.metrics.count('pages.parsed')
+        if sample is not None:
+            self._samples.append(sample)
+        self._put(results, SeasonResult(page, manager, columns), 'parse')
+
+    def _failed(self, page, error, results):
+        # One broken page must not stop the run.
+        self.metrics.count('parse.errors')
+        self._put(results, SeasonResult(page._replace(error=error), None, None), 'parse')
+
+    def _finish(self, page, future, results):
+        if future is None:
+            return self._put(results, SeasonResult(page, None, None), 'parse')
+        try:
+            parsed = future.result()
+        except Exception as e:
+            return self._failed(page, e, results)
+        self._parsed(page, parsed, results)
+
+    def _parse_stage(self, pages, results):
+        if not self.parsers:
+            while (page := self._get(pages)) is not _DONE:
+                if page.status != 200:
+                    self._put(results, SeasonResult(page, None, None), 'parse')
+                    continue
+                try:
+                    parsed = _timed_parse(page.content, page.season_label, self.fees, self.backend, self.profile)
+                except Exception as e:
+                    self._failed(page, e, results)
+                    continue
+                self._parsed(page, parsed, results)
+            return self._put(results, _DONE, 'parse')
+
+        in_flight = deque()
+        with ProcessPoolExecutor(self.parsers, initializer=_init_parser,
+                                 initargs=(self.fees, self.backend, self.profile)) as pool:
+            while (page := self._get(pages)) is not _DONE:
+                future = None
+                if page.status == 200:
+                    future = pool.submit(_parse, page.content, page.season_label)
+                    page = page._replace(content=None)  # the parser has its own copy
+                in_flight.append((page, future))
+                while len(in_flight) >= 2 * self.parsers:
+                    self._finish(*in_flight.popleft(), results)
+            while in_flight:
+                self._finish(*in_flight.popleft(), results)
+        self._put(results, _DONE, 'parse')
+
+    def run(self, years, write):
+        """Feeds `years` through the stages; `write(results)` gets batches of `SeasonResult`.
+
+        `write` runs on the calling thread, one batch at a time: it is the
+        single writer. A batch is whatever is ready, up to `batch_size`.
+        """
+        self._stop.clear()
+        self._samples = []
+        pages = queue.Queue(self.queue_size)
+        results = queue.Queue(self.queue_size)
+        errors = []
+        threads = [threading.Thread(target=self._stage, args=(self._fetch, errors, list(years), pages),
+                                    name='pipeline-fetch', daemon=True),
+                   threading.Thread(target=self._stage, args=(self._parse_stage, errors, pages, results),
+                                    name='pipeline-parse', daemon=True)]
+        for thread in threads:
+            thread.start()
+        try:
+            done = False
+            while not done:
+                try:
+                    batch = [self._get(results)]
+                except _Stopped:
+                    break
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(results.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is _DONE:
+                    batch.pop()
+                    done = True
+                if batch:
+                    with self.metrics.timer('write'):
+                        write(batch)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        if self.profile is not None:
+            self.profile_result = self.profile.merge(self._samples, self.metrics)
@@ -0,0 +1,161 @@
+"""Politeness for the fetch path: adaptive per-host token buckets and retry backoff.
+
+Every host gets a `TokenBucket`. A request takes one token, and tokens
+refill at `rate` per second up to `burst`. The rate adapts to the server
+(additive increase, multiplicative decrease):
+
+    429           rate *= `decrease` (not below `min_rate`), at most once
+                  per `1 / rate` seconds so that the answers to requests
+                  already in flight count as one signal; a `Retry-After`
+                  pauses the bucket for that long
+    503           the same, with a `Retry-After`; without one it is as
+                  likely a flaky backend as an overloaded one, and the
+                  rate only drops by `soft_decrease`
+    success       the rate grows by `increase / rate`, about `increase`
+                  per second of clean answers (not above `max_rate`)
+
+Throughput so settles just under what the server tolerates, instead of
+a fixed sleep sized for the worst case.
+
+Transient failures (connection errors, timeouts, 429 and 5xx) are
+retried by the caller after `Backoff.delay`: exponential backoff with
+full jitter, or the server's `Retry-After` when that is longer.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RATE = 2.0          # requests per second per host, to start with
+DEFAULT_BURST = 4
+DEFAULT_MIN_RATE = 0.5      # the old fixed two-second sleep
+DEFAULT_MAX_RATE = 16.0
+DEFAULT_RETRIES = 5
+DEFAULT_DECREASE = 0.5
+DEFAULT_SOFT_DECREASE = 0.9
+DEFAULT_INCREASE = 2.0      # requests per second gained per second of clean answers
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds to wait from a `Retry-After` header (delta seconds or HTTP date); None if absent or bad."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """A thread-safe token bucket whose rate follows the server's throttling signals."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=DEFAULT_MIN_RATE,
+                 max_rate=DEFAULT_MAX_RATE, decrease=DEFAULT_DECREASE,
+                 soft_decrease=DEFAULT_SOFT_DECREASE, increase=DEFAULT_INCREASE, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.decrease = decrease
+        self.soft_decrease = soft_decrease
+        self.increase = increase
+        self.throttled = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._calm_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait(self):
+        """Takes a token and returns 0, or returns how long to wait for one."""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def try_acquire(self):
+        """Takes a token if one is available right now."""
+        with self._lock:
+            return self._wait() == 0.0
+
+    def acquire(self):
+        """Blocks until a token is available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._wait()
+            if not wait:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def throttle(self, retry_after=None, status=429):
+        """The server pushed back with `status`: slow down, and pause for `retry_after` seconds if given."""
+        with self._lock:
+            now = self._clock()
+            self.throttled += 1
+            if now >= self._calm_until:
+                self._refill(now)
+                decrease = self.decrease if status == 429 or retry_after else self.soft_decrease
+                self.rate = max(self.min_rate, self.rate * decrease)
+                self._tokens = min(self._tokens, 0.0)
+                self._calm_until = now + 1 / self.rate
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+
+class RateLimiter:
+    """One `TokenBucket` per host, created on first use with the same options."""
+
+    def __init__(self, rate=DEFAULT_RATE, **bucket_options):
+        self.rate = rate
+        self.bucket_options = bucket_options
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, **self.bucket_options)
+            return self._buckets[host]
+
+    def rates(self):
+        """{host: current rate}."""
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+
+class Backoff:
+    """Exponential backoff with full jitter, capped, honouring `Retry-After`."""
+
+    def __init__(self, retries=DEFAULT_RETRIES, base=0.5, cap=30.0, rng=random.random):
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to sleep before retry number `attempt` (0-based)."""
+        jittered = self.rng() * min(self.cap, self.base * 2 ** attempt)
+        return max(jittered, retry_after or 0.0)
@@ -0,0 +1,291 @@
+"""Resumable crawl scheduler for (club, season) pages across many clubs.
+
+Jobs are kept in a SQLite queue, one row per (club, season start year):
+
+    pending  waiting for a worker
+    running  claimed by a worker process
+    done     extracted and written to the club's database
+    missing  no such page (404) or no squad table: the club was not in
+             the league that season
+    failed   network, HTTP or parse error, kept with its error message
+
+Clubs are bdfutbol team numbers, the digits after the season in page
+names (1 is Barcelona). Worker processes each own a shard of the clubs
+(`club % workers`), so every club database has a single writer, and
+fetch their pages with a `SeasonCrawler` thread pool; the per-host
+request rate is split evenly between the workers. A season is
+written to its club database before its job is marked done, and the
+writes are upserts, so a crash at worst repeats a season. On start,
+`run` puts jobs left `running` by a crashed run back to `pending`.
+`retry` queues failed jobs again.
+
+    python -m barca_data.scheduler add --clubs 1 2 3 --from 1979 --to 2025
+    python -m barca_data.scheduler run [--workers 4] [--rate 2] [--output DIR] [--base-url URL]
+    python -m barca_data.scheduler status
+    python -m barca_data.scheduler retry [--max-attempts 3]
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .ratelimit import DEFAULT_RATE, DEFAULT_RETRIES, Backoff
+from .seasons import BARCELONA, BASE_URL, season_label
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUEUE_PATH = os.path.join(ABOUT_DATA, 'crawl_jobs.db')
+OUTPUT_DIR = os.path.join(ABOUT_DATA, 'clubs')
+DEFAULT_WORKERS = 4
+DEFAULT_THREADS = 4
+DEFAULT_BATCH = 8
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+MISSING = 'missing'
+FAILED = 'failed'
+STATES = (PENDING, RUNNING, DONE, MISSING, FAILED)
+
+Job = namedtuple('Job', 'club year')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    club INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    rows INTEGER,
+    error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (club, year)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, club);
+'''
+
+
+def club_database(output_dir, club):
+    return os.path.join(output_dir, f'club_{club}.db')
+
+
+class JobQueue:
+    """The persistent job table; every method is its own transaction."""
+
+    def __init__(self, path=QUEUE_PATH, timeout=60):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+
+    def add(self, jobs):
+        """Queues jobs that are not in the queue yet; returns how many were new."""
+        before = self.conn.total_changes
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany('INSERT OR IGNORE INTO jobs (club, year, updated_at) VALUES (?, ?, ?)',
+                              [(club, year, time.time()) for club, year in jobs])
+        self.conn.execute('COMMIT')
+        return self.conn.total_changes - before
+
+    def claim(self, worker, shard=0, shards=1, limit=DEFAULT_BATCH):
+        """Marks up to `limit` pending jobs of this shard as running and returns them."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            jobs = [Job(*row) for row in self.conn.execute(
+                'SELECT club, year FROM jobs WHERE state = ? AND club % ? = ? ORDER BY club, year LIMIT ?',
+                (PENDING, shards, shard, limit))]
+            self.conn.executemany(
+                'UPDATE jobs SET state = ?, worker = ?, attempts = attempts + 1, updated_at = ? '
+                'WHERE club = ? AND year = ?',
+                [(RUNNING, worker, time.time(), job.club, job.year) for job in jobs])
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return jobs
+
+    def _set(self, job, state, rows=None, error=None):
+        self.conn.execute('UPDATE jobs SET state = ?, rows = ?, error = ?, updated_at = ? '
+                          'WHERE club = ? AND year = ?',
+                          (state, rows, error, time.time(), job.club, job.year))
+
+    def finish(self, job, rows):
+        self._set(job, DONE, rows=rows)
+
+    def fail(self, job, error, state=FAILED):
+        self._set(job, state, error=str(error))
+
+    def recover(self):
+        """Puts jobs left running by a crashed run back in the queue; returns how many."""
+        return self.conn.execute('UPDATE jobs SET state = ?, worker = NULL WHERE state = ?',
+                                 (PENDING, RUNNING)).rowcount
+
+    def retry(self, max_attempts=None, include_missing=False):
+        """Queues failed jobs again (those under `max_attempts` tries); returns how many."""
+        states = (FAILED, MISSING) if include_missing else (FAILED,)
+        sql = f"UPDATE jobs SET state = ? WHERE state IN ({', '.join('?' * len(states))})"
+        params = [PENDING, *states]
+        if max_attempts is not None:
+            sql += ' AND attempts < ?'
+            params.append(max_attempts)
+        return self.conn.execute(sql, params).rowcount
+
+    def counts(self):
+        """{state: job count}, with every state present."""
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self.conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'))
+        return counts
+
+    def failures(self):
+        """(club, year, attempts, error) of every failed job."""
+        return self.conn.execute('SELECT club, year, attempts, error FROM jobs WHERE state = ? '
+                                 'ORDER BY club, year', (FAILED,)).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def _store(queue, job, page, output_dir, connections, fees, backend):
+    from .columns import extract_columns
+    from .db import init_database, upsert_columns
+
+    if page.error is not None:
+        return queue.fail(job, f'{type(page.error).__name__}: {page.error}')
+    if page.status == 404:
+        return queue.fail(job, 'HTTP 404', MISSING)
+    if page.status != 200:
+        return queue.fail(job, f'HTTP {page.status}')
+    try:
+        # The fee and age registries list Barcelona's players only.
+        barcelona = job.club == BARCELONA
+        _manager, columns = extract_columns(page.content, page.season_label, fees if barcelona else {},
+                                            backend, None if barcelona else {})
+    except Exception as e:  # a malformed page must not stop the worker
+        return queue.fail(job, f'parse error: {e!r}')
+    if not len(columns):
+        return queue.fail(job, 'no squad table', MISSING)
+    if job.club not in connections:
+        connections[job.club] = init_database(club_database(output_dir, job.club))
+    conn = connections[job.club]
+    with conn:
+        upsert_columns(conn, page.season_label, columns)
+    queue.finish(job, len(columns))
+
+
+def work(queue_path, output_dir, shard, shards, base_url=BASE_URL, threads=DEFAULT_THREADS,
+         batch=DEFAULT_BATCH, backend=None, rate=DEFAULT_RATE, retries=DEFAULT_RETRIES):
+    """Runs one worker: claims batches of its shard until none are left; returns the jobs handled.
+
+    `rate` is this worker's starting requests/s per host (None for no
+    pacing); `retries` is how often a transient failure is retried before
+    the job is marked failed.
+    """
+    from .crawler import SeasonCrawler
+    from .fees import as_registry
+
+    queue = JobQueue(queue_path)
+    crawler = SeasonCrawler(max_workers=threads, base_url=base_url, rate=rate, backoff=Backoff(retries))
+    fees = as_registry(None)
+    connections = {}
+    worker = f'{os.getpid()}:{shard}'
+    handled = 0
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                jobs = queue.claim(worker, shard, shards, batch)
+                if not jobs:
+                    return handled
+                pages = pool.map(lambda job: crawler.fetch(job.year, job.club), jobs)
+                for job, page in zip(jobs, pages):
+                    _store(queue, job, page, output_dir, connections, fees, backend)
+                    handled += 1
+    finally:
+        for conn in connections.values():
+            conn.close()
+        crawler.close()
+        queue.close()
+
+
+def run(queue_path=QUEUE_PATH, output_dir=OUTPUT_DIR, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, **options):
+    """Recovers interrupted jobs, then drains the queue with `workers` processes; returns the counts.
+
+    `rate` is the starting requests/s per host for the whole run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    options['rate'] = rate / workers if rate else None
+    queue = JobQueue(queue_path)
+    try:
+        recovered = queue.recover()
+        if recovered:
+            print(f"Recovered {recovered} jobs from an interrupted run.")
+    finally:
+        queue.close()
+
+    if workers == 1:
+        work(queue_path, output_dir, 0, 1, **options)
+    else:
+        processes = [multiprocessing.Process(target=work, args=(queue_path, output_dir, shard, workers),
+                                             kwargs=options, daemon=True)
+                     for shard in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    queue = JobQueue(queue_path)
+    try:
+        return queue.counts()
+    finally:
+        queue.close()
+
+
+def _print_counts(counts):
+    print(', '.join(f"{state}: {n}" for state, n in counts.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl scheduler for (club, season) pages.")
+    parser.add_argument('--queue', default=QUEUE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="queue (club, season) jobs")
+    add.add_argument('--clubs', type=int, nargs='+', default=[BARCELONA])
+    add.add_argument('--from', dest='first', type=int, required=True, help="first season start year")
+    add.add_argument('--to', dest='last', type=int, required=True, help="last season start year")
+    run_ = commands.add_parser('run', help="drain the queue")
+    run_.add_argument('--output', default=OUTPUT_DIR)
+    run_.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    run_.add_argument('--threads', type=int, default=DEFAULT_THREADS, help="concurrent fetches per worker")
+    run_.add_argument('--batch', type=int, default=DEFAULT_BATCH)
+    run_.add_argument('--base-url', default=BASE_URL)
+    run_.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                      help="starting requests/s per host, shared by the workers (0 for no pacing)")
+    run_.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help="retries of a transient failure")
+    commands.add_parser('status', help="job counts and failures")
+    retry = commands.add_parser('retry', help="queue failed jobs again")
+    retry.add_argument('--max-attempts', type=int)
+    retry.add_argument('--missing', action='store_true', help="also retry pages that were missing")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        _print_counts(run(args.queue, args.output, args.workers, args.rate or None, base_url=args.base_url,
+                          threads=args.threads, batch=args.batch, retries=args.retries))
+        return
+    queue = JobQueue(args.queue)
+    try:
+        if args.command == 'add':
+            jobs = [Job(club, year) for club in args.clubs for year in range(args.first, args.last + 1)]
+            print(f"Queued {queue.add(jobs)} new jobs.")
+        elif args.command == 'retry':
+            print(f"Requeued {queue.retry(args.max_attempts, args.missing)} jobs.")
+        else:
+            _print_counts(queue.counts())
+            for club, year, attempts, error in queue.failures():
+                print(f"  club {club} {season_label(year)}: {error} (attempts: {attempts})")
+    finally:
+        queue.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Extraction of `players_stats` rows from a bdfutbol season page.
+
+This is the reference BeautifulSoup implementation; `extract` has the
+faster single-pass backends that must produce exactly the same rows.
+"""
+from bs4 import BeautifulSoup
+
+from .ages import as_ages
+from .categories import decode_nationality, decode_position
+from .fees import as_registry
+
+
+def scrape_manager(soup):
+    """Returns the manager listed last in the `taulaentrenadors` table."""
+    m_table = soup.find('table', {'id': 'taulaentrenadors'})
+    return m_table.find_all('tr')[-1].find_all('td')[2].text.strip() if m_table else "Unknown"
+
+
+def scrape_season_data(html_content, season_label, manager_name, fees=None, ages=None):
+    """Parses HTML and extracts comprehensive player statistics."""
+    return scrape_squad(BeautifulSoup(html_content, 'html.parser'), season_label, manager_name, fees, ages)
+
+
+def scrape_squad(soup, season_label, manager_name, fees=None, ages=None):
+    """Extracts player statistics from the `c3p0` table of a parsed page.
+
+    The table has no age cell: ages come from `ages` (see `barca_data.ages`).
+    """
+    players_list = []
+    fees = as_registry(fees)
+    ages = as_ages(ages)
+
+    table = soup.find('table', {'id': 'c3p0'})
+    if not table:
+        return []
+
+    rows = table.find_all('tr')[1:]  # Skip the header row
+
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) < 15:
+            continue
+
+        # Player Name
+        p_name = cols[3].text.strip()
+
+        # Nationality and position, from the CSS classes of their cells
+        nat_div = cols[2].find('div', class_='pais')
+        nationality = decode_nationality(nat_div.get('class', []) if nat_div else None)
+        pos_div = cols[4].find('div')
+        pos_text = decode_position(pos_div.get('class') if pos_div else None)
+
+        # Stats & Values
+        goals_val = int(cols[14].text) if cols[14].text.isdigit() else 0
+        t_value = fees.get((p_name, season_label), "0")
+
+        player_data = (
+            p_name,
+            season_label,
+            nationality,
+            pos_text,
+            ages.lookup(p_name, season_label, pos_text),
+            int(cols[5].text) if cols[5].text.isdigit() else 0,
+            int(cols[6].text) if cols[6].text.isdigit() else 0,
+            int(cols[7].text) if cols[7].text.isdigit() else 0,
+            int(cols[8].text) if cols[8].text.isdigit() else 0,
+            (int(cols[12].text) if cols[12].text.isdigit() else 0) + (int(cols[13].text) if cols[13].text.isdigit() else 0),
+            int(cols[11].text) if cols[11].text.isdigit() else 0,
+            int(cols[12].text) if cols[12].text.isdigit() else 0,
+            int(cols[13].text) if cols[13].text.isdigit() else 0,
+            goals_val,
+            goals_val,  # goal_contributions
+            manager_name,
+            t_value
+        )
+        players_list.append(player_data)
+
+    return players_list
+
+
+def scrape_page(html_content, season_label, fees=None, ages=None):
+    """Extracts the manager and the player rows of one season page."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    manager = scrape_manager(soup)
+    return manager, scrape_squad(soup, season_label, manager, fees, ages)
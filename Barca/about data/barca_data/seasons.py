@@ -0,0 +1,22 @@
+"""Season labels and bdfutbol URLs."""
+import datetime
+
+BASE_URL = "https://www.bdfutbol.com/en/t/"
+# bdfutbol team number, appended to the season in page names: t1982-831.html is Barcelona's 1982-83.
+BARCELONA = 1
+
+
+def season_label(year):
+    """Returns the bdfutbol season label for a starting year, e.g. 1999 -> '1999-00'."""
+    return f"{year}-{str(year + 1)[2:]}"
+
+
+def season_url(year, base_url=BASE_URL, club=BARCELONA):
+    """Returns the squad-list page URL of `club` for the season starting in `year`."""
+    return f"{base_url}t{season_label(year)}{club}.html?t=lista"
+
+
+def current_season_year(today=None):
+    """Returns the starting year of the season in progress (seasons turn over in July)."""
+    today = today or datetime.date.today()
+    return today.year if today.month >= 7 else today.year - 1
@@ -0,0 +1,179 @@
+"""Columnar storage of the season data: Parquet partitions plus an Arrow snapshot.
+
+The canonical interchange format between pipeline stages is a Parquet
+dataset with one hive partition per season:
+
+    dataset/season=1982-83/data.parquet
+    dataset/history.arrow          uncompressed Arrow IPC snapshot of all seasons
+
+Writers replace one season at a time. `load_history` memory-maps the
+snapshot when it is newer than every partition, and otherwise scans the
+partitions. Either way it reads only the requested columns. Season,
+nationality, position, manager and fee status are dictionary-encoded
+(see `categories`) in the files and in memory, and load into pandas as
+`category` columns. Excel is only an export sink (`export_excel`).
+
+    python -m barca_data.storage [--dataset DIR] [--warehouse PATH]
+
+exports the warehouse into the dataset.
+"""
+import argparse
+import os
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .categories import CATEGORICAL_COLUMNS, dictionary_array
+from .db import HISTORY_COLUMNS
+from .warehouse import ABOUT_DATA, WAREHOUSE_PATH, Warehouse
+
+DATASET_DIR = os.path.join(ABOUT_DATA, 'dataset')
+SNAPSHOT_NAME = 'history.arrow'
+PARTITION_FILE = 'data.parquet'
+
+_TEXT = ('player_name', 'transfer_value')
+_TYPES = {'transfer_value_numeric': pa.int64()}
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+SCHEMA = pa.schema([(name, CATEGORY if name in CATEGORICAL_COLUMNS else pa.string() if name in _TEXT
+                     else _TYPES.get(name, pa.int32()))
+                    for name in HISTORY_COLUMNS])
+# Partition values are read as plain strings: Arrow cannot sort a dictionary column.
+_PARTITIONING = ds.partitioning(pa.schema([('season', pa.string())]), flavor='hive')
+_FILE_SCHEMA = pa.schema([field if field.name != 'season' else pa.field('season', pa.string())
+                          for field in SCHEMA])
+
+
+def table_from_rows(rows):
+    """Builds an Arrow table in `SCHEMA` from rows in `HISTORY_COLUMNS` order."""
+    columns = list(zip(*rows)) or [()] * len(SCHEMA)
+    arrays = []
+    for field, values in zip(SCHEMA, columns):
+        if field.type == pa.string():
+            values = [None if v is None else str(v) for v in values]
+        if field.type == CATEGORY:
+            arrays.append(dictionary_array(values, CATEGORICAL_COLUMNS[field.name]))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+def _partition_dir(root, season):
+    return os.path.join(root, f'season={season}')
+
+
+def write_season(root, table, season=None):
+    """Replaces one season's partition with `table` (a `SeasonColumns` works too)."""
+    if hasattr(table, 'to_arrow'):
+        season = season or table.season_label
+        table = table.to_arrow()
+    if season is None:
+        season = table.column('season')[0].as_py()
+    table = table.cast(SCHEMA).drop_columns(['season'])
+    directory = _partition_dir(root, season)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, PARTITION_FILE)
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_history(root, table):
+    """Writes every season of `table` to its partition, then refreshes the snapshot."""
+    seasons = table.column('season').unique().to_pylist()
+    for season in seasons:
+        write_season(root, table.filter(ds.field('season') == season), season)
+    write_snapshot(root)
+    return len(seasons)
+
+
+def _partition_mtime(root):
+    newest = 0
+    if not os.path.isdir(root):
+        return newest
+    for entry in os.scandir(root):
+        if entry.is_dir() and entry.name.startswith('season='):
+            path = os.path.join(entry.path, PARTITION_FILE)
+            if os.path.exists(path):
+                newest = max(newest, os.path.getmtime(path))
+    return newest
+
+
+def _scan(root, columns=None, seasons=None):
+    dataset = ds.dataset(root, schema=_FILE_SCHEMA, format='parquet', partitioning=_PARTITIONING,
+                         exclude_invalid_files=True)
+    filter_ = ds.field('season').isin(list(seasons)) if seasons else None
+    table = dataset.to_table(columns=list(columns or HISTORY_COLUMNS), filter=filter_)
+    if 'season' not in table.column_names:
+        return table
+    table = table.sort_by([('season', 'ascending')])
+    return table.set_column(table.column_names.index('season'), SCHEMA.field('season'),
+                            table.column('season').cast(CATEGORY))
+
+
+def write_snapshot(root):
+    """Rewrites `history.arrow` from the partitions."""
+    path = os.path.join(root, SNAPSHOT_NAME)
+    # An IPC file holds one dictionary per column, so the partitions' dictionaries are merged.
+    table = _scan(root).unify_dictionaries()
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_history(root=DATASET_DIR, columns=None, seasons=None):
+    """Loads the full history (or some `seasons`) as an Arrow table of the given `columns`."""
+    path = os.path.join(root, SNAPSHOT_NAME)
+    if os.path.exists(path) and os.path.getmtime(path) >= _partition_mtime(root):
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        if seasons:
+            table = table.filter(ds.field('season').isin(list(seasons)))
+        return table.select(list(columns)) if columns else table
+    return _scan(root, columns, seasons)
+
+
+def load_dataframe(root=DATASET_DIR, columns=None, seasons=None):
+    """`load_history` as a pandas DataFrame, the dictionary columns as `category` dtypes.
+
+    Seasons are an ordered category (labels sort chronologically), so `min` and `max` work on them.
+    """
+    frame = load_history(root, columns, seasons).to_pandas()
+    if 'season' in frame:
+        frame['season'] = frame['season'].cat.set_categories(
+            sorted(frame['season'].cat.categories), ordered=True)
+    return frame
+
+
+def export_excel(table, excel_path, chunk_size=5000):
+    """Writes an Arrow table to Excel, a record batch at a time; an export-only sink for people who
+    want a spreadsheet."""
+    from .export import ExcelSink, stream
+
+    rows = (row for batch in table.to_batches(chunk_size) for row in zip(*batch.to_pydict().values()))
+    return stream(rows, table.column_names, [ExcelSink(excel_path)], chunk_size)
+
+
+def export_warehouse(warehouse_path=WAREHOUSE_PATH, root=DATASET_DIR):
+    """Exports the warehouse `players_stats` view into the dataset; returns the season count."""
+    warehouse = Warehouse(warehouse_path)
+    try:
+        rows = warehouse.query(f"SELECT {', '.join(HISTORY_COLUMNS)} FROM players_stats")
+    finally:
+        warehouse.close()
+    return write_history(root, table_from_rows(rows))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the warehouse into the Parquet dataset.")
+    parser.add_argument('--dataset', default=DATASET_DIR)
+    parser.add_argument('--warehouse', default=WAREHOUSE_PATH)
+    args = parser.parse_args(argv)
+    seasons = export_warehouse(args.warehouse, args.dataset)
+    print(f"Wrote {seasons} season partitions to {args.dataset}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,436 @@
+"""Single SQLite warehouse for every decade, with a normalized schema.
+
+    players       one row per player (scraped short name + nationality), with
+                  its folded `name_key`; `player_id` is the stable identity
+    seasons       one row per season label
+    managers      raw bdfutbol manager cell and cleaned display name
+    positions     position names, `position_id` being the `categories.POSITIONS`
+                  code, with the bdfutbol CSS class they decode from
+    player_season fact table, keyed on (season_id, player_id, position_id)
+
+The `players_stats` view gives back the flat 17-column shape of the
+decade databases, followed by `transfer_value_numeric` (euros, NULL when
+unknown) and `transfer_status`; the fee, display string included, is the
+transfer-fee registry's, whatever the loaded row said. Then comes the
+`player_id` to join other sources on. `Warehouse.resolve_player` maps
+external spellings ('Arthur Melo', 'Dragan Ciric') onto player ids. Every
+fact carries the content hash of its `players_stats` row (`row_hash`,
+indexed), so a season reload writes only the rows that changed. The
+warehouse runs in WAL mode. `write()` runs a block of writes as one
+transaction, which is one version of the `history`; `bulk_load()`
+batches a whole load that way with relaxed syncing. Ages are those of
+`ages`. A warehouse loaded before them (ages copied from
+`matches_played`) or before the fee strings came from the registry is
+brought in line when it is opened, as one version.
+
+    python -m barca_data.warehouse [--path PATH] [DECADE_DB ...]
+
+rebuilds the warehouse from the per-decade databases. The aggregate
+tables of `aggregates` and the versions of `history` live in the same
+file; the aggregates are refreshed at the end of every `write()`.
+"""
+import argparse
+import os
+import pathlib
+import sqlite3
+from contextlib import contextmanager
+
+from . import aggregates, history
+from .ages import as_ages
+from .categories import POSITION_CLASSES, POSITIONS, categorize, clean_manager_name
+from .db import HISTORY_COLUMNS, PLAYERS_STATS_COLUMNS
+from .fees import UNKNOWN, as_registry, format_fee
+from .fingerprint import diff_rows, row_hash
+from .identity import PlayerResolver, name_key
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WAREHOUSE_PATH = os.path.join(ABOUT_DATA, 'barca_warehouse.db')
+# In load order: the 1999-00 season is in both the 90s and the 99-10 database; the later one wins.
+DECADE_DATABASES = [
+    os.path.join(ABOUT_DATA, '1979_1989', 'barca_80s.db'),
+    os.path.join(ABOUT_DATA, '1990-1999', 'barca_90s.db'),
+    os.path.join(ABOUT_DATA, '1999-2010', 'barca_99_10.db'),
+    os.path.join(ABOUT_DATA, '2010-2025', 'barca_2010_2025.db'),
+]
+
+STAT_COLUMNS = PLAYERS_STATS_COLUMNS[4:15]
+
+_POSITIONS_TABLE = '''
+CREATE TABLE IF NOT EXISTS positions (
+    position_id INTEGER PRIMARY KEY,
+    position TEXT NOT NULL UNIQUE,
+    css_class TEXT
+);
+'''
+
+_PLAYER_SEASON_TABLE = '''
+CREATE TABLE IF NOT EXISTS player_season (
+    season_id INTEGER NOT NULL REFERENCES seasons,
+    player_id INTEGER NOT NULL REFERENCES players,
+    position_id INTEGER NOT NULL REFERENCES positions,
+    manager_id INTEGER REFERENCES managers,
+    age INTEGER, matches_played INTEGER, matches_started INTEGER,
+    matches_completed INTEGER, matches_as_substitute INTEGER,
+    total_cards INTEGER, minutes_played INTEGER, yellow_cards INTEGER,
+    red_cards INTEGER, goals INTEGER, goal_contributions INTEGER,
+    transfer_value TEXT, transfer_value_numeric INTEGER, transfer_status TEXT,
+    row_hash INTEGER, version INTEGER,
+    PRIMARY KEY (season_id, player_id, position_id)
+);
+'''
+
+SCHEMA = _POSITIONS_TABLE + _PLAYER_SEASON_TABLE + '''
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    nationality TEXT NOT NULL,
+    name_key TEXT,
+    UNIQUE (player_name, nationality)
+);
+CREATE TABLE IF NOT EXISTS seasons (
+    season_id INTEGER PRIMARY KEY,
+    season TEXT NOT NULL UNIQUE,
+    start_year INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS managers (
+    manager_id INTEGER PRIMARY KEY,
+    raw_name TEXT NOT NULL UNIQUE,
+    manager_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS player_season_player ON player_season (player_id);
+CREATE INDEX IF NOT EXISTS player_season_manager ON player_season (manager_id, season_id);
+CREATE INDEX IF NOT EXISTS player_season_row_hash ON player_season (row_hash);
+CREATE INDEX IF NOT EXISTS players_name ON players (player_name);
+CREATE INDEX IF NOT EXISTS players_name_key ON players (name_key);
+CREATE INDEX IF NOT EXISTS managers_name ON managers (manager_name);
+
+DROP VIEW IF EXISTS players_stats;
+CREATE VIEW players_stats AS
+SELECT p.player_name, s.season, p.nationality, pos.position, f.age,
+       f.matches_played, f.matches_started, f.matches_completed, f.matches_as_substitute,
+       f.total_cards, f.minutes_played, f.yellow_cards, f.red_cards, f.goals,
+       f.goal_contributions, m.raw_name AS manager_name, f.transfer_value,
+       f.transfer_value_numeric, f.transfer_status, f.player_id
+FROM player_season f
+JOIN seasons s USING (season_id)
+JOIN players p USING (player_id)
+JOIN positions pos USING (position_id)
+LEFT JOIN managers m USING (manager_id);
+'''
+
+# Rows are stamped with the latest `history` version; an identical row is left alone, not rewritten.
+_UPSERT_FACT = '''
+    INSERT INTO player_season VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,
+                                      (SELECT MAX(version) FROM snapshots))
+    ON CONFLICT (season_id, player_id, position_id) DO UPDATE SET
+''' + ', '.join(f'{c} = excluded.{c}'
+            for c in ('manager_id',) + STAT_COLUMNS + HISTORY_COLUMNS[16:] + ('row_hash', 'version')) + '''
+    WHERE player_season.row_hash IS NOT excluded.row_hash
+       OR player_season.transfer_value_numeric IS NOT excluded.transfer_value_numeric
+       OR player_season.transfer_status IS NOT excluded.transfer_status
+'''
+
+# `PRAGMA user_version` of a warehouse whose rows agree with the registries: 1 once the ages came
+# from `ages`, 2 once the `transfer_value` strings came from the fee registry as well.
+REGISTRIES_VERSION = 2
+
+# Columns added to the tables after their first release.
+_ADDED_COLUMNS = {
+    'player_season': {'transfer_value_numeric': 'INTEGER', 'transfer_status': 'TEXT', 'row_hash': 'INTEGER',
+                      'version': 'INTEGER'},
+    'players': {'name_key': 'TEXT'},
+}
+
+
+class Warehouse:
+    """Connection to the warehouse database, with id lookups cached per instance.
+
+    Fees come from `fees` (the default transfer-fee registry when None) and
+    ages from `ages` (the default `player_ages.csv` when None).
+    """
+
+    def __init__(self, path=WAREHOUSE_PATH, fees=None, ages=None):
+        self.path = path
+        self.fees = as_registry(fees)
+        self.ages = as_ages(ages)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.create_function('name_key', 1, name_key, deterministic=True)
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+        self._seed_positions()
+        with self.conn:
+            self.conn.execute('UPDATE players SET name_key = name_key(player_name) WHERE name_key IS NULL')
+        history.install(self.conn)
+        aggregates.install(self.conn)
+        self._ids = {'players': {}, 'seasons': {}, 'managers': {}, 'positions': {}}
+        self._resolver = None
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] < REGISTRIES_VERSION:
+            self._apply_registries()
+
+    def _migrate(self):
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+            if existing:
+                for column, sql_type in columns.items():
+                    if column not in existing:
+                        self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {sql_type}')
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(player_season)')}
+        if 'position' in existing:
+            self._migrate_positions()
+
+    def _seed_positions(self):
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO positions VALUES (?, ?, ?)',
+                                  [(code, name, POSITION_CLASSES.get(name)) for code, name in enumerate(POSITIONS)])
+
+    def _migrate_positions(self):
+        # Position names moved to a lookup table: rebuild the fact table around `position_id`,
+        # keeping the rowid order that ties in the aggregates depend on.
+        self.conn.executescript(_POSITIONS_TABLE)
+        self._seed_positions()
+        rest = ', '.join(('manager_id',) + STAT_COLUMNS + HISTORY_COLUMNS[16:] + ('row_hash', 'version'))
+        self.conn.executescript('''
+            BEGIN;
+            DROP VIEW IF EXISTS players_stats;
+            INSERT OR IGNORE INTO positions (position) SELECT DISTINCT position FROM player_season;
+            ALTER TABLE player_season RENAME TO player_season_old;
+        ''' + _PLAYER_SEASON_TABLE + f'''
+            INSERT INTO player_season (season_id, player_id, position_id, {rest})
+            SELECT f.season_id, f.player_id, pos.position_id, {rest}
+            FROM player_season_old f JOIN positions pos USING (position)
+            ORDER BY f.rowid;
+            DROP TABLE player_season_old;
+            COMMIT;
+        ''')
+
+    def _apply_registries(self):
+        # Warehouses loaded earlier hold `matches_played` as the age and the decade scripts' fee strings:
+        # reloading every row through `_facts` replaces them, in one version of the history.
+        seasons = {}
+        for row in self.conn.execute(f"SELECT {', '.join(PLAYERS_STATS_COLUMNS)} FROM players_stats"):
+            seasons.setdefault(row[1], []).append(row)
+        with self.write('registries'):
+            for season, rows in seasons.items():
+                self.replace_season(season, rows)
+            self.conn.execute(f'PRAGMA user_version = {REGISTRIES_VERSION}')
+
+    @contextmanager
+    def write(self, note=None):
+        """Runs the block as one transaction, and one `history` version noted `note`; rolls back on error.
+
+        The aggregates touched by the block are refreshed in the same transaction.
+        """
+        try:
+            with self.conn:
+                version = history.open_version(self.conn, note)
+                yield self
+                aggregates.refresh_aggregates(self)
+                history.close_version(self.conn, version)
+        except BaseException:
+            self._ids = {table: {} for table in self._ids}  # ids handed out in the rolled-back block
+            self._resolver = None
+            raise
+
+    @contextmanager
+    def bulk_load(self, note=None):
+        """Like `write()`, with syncing off for the length of the load."""
+        self.conn.execute('PRAGMA synchronous = OFF')
+        self.conn.execute('PRAGMA temp_store = MEMORY')
+        try:
+            with self.write(note):
+                yield self
+        finally:
+            self.conn.execute('PRAGMA synchronous = NORMAL')
+
+    def _id(self, table, key, insert_sql, select_sql, params):
+        cache = self._ids[table]
+        if key not in cache:
+            cursor = self.conn.execute(select_sql, key)
+            row = cursor.fetchone()
+            if row is None:
+                row = (self.conn.execute(insert_sql, params).lastrowid,)
+                self._resolver = None
+            cache[key] = row[0]
+        return cache[key]
+
+    def player_id(self, player_name, nationality):
+        return self._id('players', (player_name, nationality),
+                        'INSERT INTO players (player_name, nationality, name_key) VALUES (?, ?, ?)',
+                        'SELECT player_id FROM players WHERE player_name = ? AND nationality = ?',
+                        (player_name, nationality, name_key(player_name)))
+
+    def season_id(self, season):
+        return self._id('seasons', (season,),
+                        'INSERT INTO seasons (season, start_year) VALUES (?, ?)',
+                        'SELECT season_id FROM seasons WHERE season = ?',
+                        (season, int(season[:4])))
+
+    def position_id(self, position):
+        return self._id('positions', (position,),
+                        'INSERT INTO positions (position, css_class) VALUES (?, ?)',
+                        'SELECT position_id FROM positions WHERE position = ?',
+                        (position, POSITION_CLASSES.get(position)))
+
+    def manager_id(self, raw_name):
+        if raw_name is None:
+            return None
+        return self._id('managers', (raw_name,),
+                        'INSERT INTO managers (raw_name, manager_name) VALUES (?, ?)',
+                        'SELECT manager_id FROM managers WHERE raw_name = ?',
+                        (raw_name, clean_manager_name(raw_name)))
+
+    def _facts(self, rows, hashes=None):
+        # The registries are the one source of the fee and the age: the row's are replaced by theirs,
+        # so that the display string agrees with `transfer_value_numeric` and `transfer_status`.
+        for i, row in enumerate(rows):
+            fee = self.fees.lookup(row[0], row[1])
+            value = "0" if fee.status == UNKNOWN else format_fee(fee.eur)
+            age = self.ages.lookup(row[0], row[1], row[3])
+            if value != row[16] or age != row[4]:
+                row = (*row[:4], age, *row[5:16], value)
+                content_hash = row_hash(row)
+            else:
+                content_hash = hashes[i] if hashes is not None else row_hash(row)
+            yield (self.season_id(row[1]), self.player_id(row[0], row[2] or 'Unknown'), self.position_id(row[3]),
+                   self.manager_id(row[15]), age, *row[5:15], value, fee.eur, fee.status, content_hash)
+
+    def resolver(self):
+        """`PlayerResolver` over the players in the warehouse, rebuilt after new players are added."""
+        if self._resolver is None:
+            self._resolver = PlayerResolver(
+                self.conn.execute('SELECT player_id, player_name FROM players'),
+                self.conn.execute('SELECT DISTINCT s.season, f.player_id FROM player_season f '
+                                  'JOIN seasons s USING (season_id)'))
+        return self._resolver
+
+    def resolve_player(self, player_name, season=None):
+        """The player id an external spelling refers to (searching `season`'s squad when given), or None."""
+        return self.resolver().resolve(player_name, season)
+
+    def attach_player_ids(self, frame, name_column='player_name', season_column='season'):
+        """Returns a copy of a DataFrame with a `player_id` column resolved from its names."""
+        import pandas as pd
+
+        resolver = self.resolver()
+        seasons = frame[season_column] if season_column in frame else [None] * len(frame)
+        frame = frame.copy()
+        frame['player_id'] = pd.array([resolver.resolve(name, season)
+                                       for name, season in zip(frame[name_column], seasons)], dtype='Int64')
+        return frame
+
+    def load_rows(self, rows):
+        """Upserts `players_stats`-shaped rows; the caller owns the transaction."""
+        self.conn.executemany(_UPSERT_FACT, self._facts(rows))
+
+    def replace_season(self, season, rows, hashes=None):
+        """Makes `rows` the full content of `season`, dropping players no longer listed.
+
+        Only rows whose content hash or fee differs from the stored one are
+        written; returns the `RowDiff`.
+        """
+        season_id = self.season_id(season)
+        rows = list(rows)
+        stored = {(player_id, position_id): fingerprint
+                  for player_id, position_id, *fingerprint in self.conn.execute(
+                      'SELECT player_id, position_id, row_hash, transfer_value_numeric, transfer_status '
+                      'FROM player_season WHERE season_id = ?', (season_id,))}
+        # The fee comes from the registry, not the row, so it is compared as well.
+        diff = diff_rows(stored, (((fact[1], fact[2]), [fact[-1], fact[-3], fact[-2]], fact)
+                                  for fact in self._facts(rows, hashes)))
+        self.conn.executemany(_UPSERT_FACT, diff.changed)
+        self.conn.executemany(
+            'DELETE FROM player_season WHERE season_id = ? AND player_id = ? AND position_id = ?',
+            [(season_id, player_id, position_id) for player_id, position_id in diff.stale])
+        return diff
+
+    def load_columns(self, columns):
+        """Replaces one season from a `SeasonColumns`, reusing its extraction-time row hashes."""
+        return self.replace_season(columns.season_label, columns.iter_rows(), columns.row_hashes)
+
+    def rows_with_hash(self, content_hash):
+        """(player_name, season, position) of the stored rows with this content hash, through its index."""
+        return self.query('''
+            SELECT p.player_name, s.season, pos.position FROM player_season f
+            JOIN players p USING (player_id) JOIN seasons s USING (season_id)
+            JOIN positions pos USING (position_id)
+            WHERE f.row_hash = ?
+        ''', (content_hash,))
+
+    def import_players_stats(self, db_path):
+        """Loads a decade database, season by season; returns the row count.
+
+        The file is opened read-only and need not be migrated (`db.migrate`): ages and fees are
+        taken from the registries whatever it stores.
+        """
+        source = sqlite3.connect(pathlib.Path(db_path).absolute().as_uri() + '?mode=ro', uri=True)
+        try:
+            rows = source.execute(f"SELECT {', '.join(PLAYERS_STATS_COLUMNS)} FROM players_stats "
+                                  "ORDER BY rowid").fetchall()
+        finally:
+            source.close()
+        seasons = {}
+        for row in rows:
+            seasons.setdefault(row[1], []).append(row)
+        for season, season_rows in seasons.items():
+            self.replace_season(season, season_rows)
+        return len(rows)
+
+    def query(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def read_sql(self, sql, params=()):
+        """Runs a query into a pandas DataFrame, its season, nationality, position, manager and fee
+        status columns as `category` dtypes."""
+        import pandas as pd
+
+        return categorize(pd.read_sql_query(sql, self.conn, params=params))
+
+    def close(self):
+        self.conn.close()
+
+
+def manager_tenure(warehouse):
+    """(manager, seasons, first season, last season), longest tenure first."""
+    return [row[:4] for row in aggregates.manager_summary(warehouse, order_by='seasons', limit=-1)]
+
+
+def player_totals(warehouse, order_by='goal_contributions', limit=10):
+    """Career totals per player, ordered by one of the stat columns."""
+    if order_by == 'age' or order_by not in STAT_COLUMNS + ('seasons',):
+        raise ValueError(f"cannot order player totals by {order_by!r}")
+    sums = ', '.join(f'a.{c}' for c in STAT_COLUMNS if c != 'age')
+    aggregates.refresh_aggregates(warehouse)
+    return warehouse.query(f'''
+        SELECT p.player_name, p.nationality, a.seasons, {sums}
+        FROM agg_players a
+        JOIN players p USING (player_id)
+        ORDER BY a.{order_by} DESC
+        LIMIT ?
+    ''', (limit,))
+
+
+def build_warehouse(db_paths=DECADE_DATABASES, path=WAREHOUSE_PATH):
+    """Loads the decade databases into the warehouse in one bulk transaction."""
+    warehouse = Warehouse(path)
+    try:
+        with warehouse.bulk_load('load ' + ', '.join(map(os.path.basename, db_paths))):
+            total = sum(warehouse.import_players_stats(db_path) for db_path in db_paths)
+        return total
+    finally:
+        warehouse.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the warehouse from the decade databases.")
+    parser.add_argument('--path', default=WAREHOUSE_PATH)
+    parser.add_argument('databases', nargs='*', default=DECADE_DATABASES)
+    args = parser.parse_args(argv)
+    total = build_warehouse(args.databases, args.path)
+    print(f"Loaded {total} rows into {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Live mode for the season in progress: poll its page, apply only what changed.
+
+    python -m barca_data.watch [--interval 900] [--once] [--year YEAR] [--db PATH] [--warehouse PATH]
+                               [--dataset DIR] [--base-url URL]
+
+Only the current season's page is fetched, once every `--interval`
+seconds, through the page cache with its TTL at zero: every poll is a
+conditional GET (`If-None-Match`/`If-Modified-Since`), answered with an
+empty 304 while the page has not changed. A page whose body hash is the
+one last applied is not parsed either, for servers that ignore the
+validators. A changed page is parsed and diffed row by row against the
+stored season (`fingerprint`), and only the changed, new and dropped
+players are written: to the decade database (`--db`, 2010-2025's by
+default) and, when it exists, to the warehouse. There the `aggregates`
+triggers limit the refresh to those players, the season and its
+managers, and bump `data_version`, so `api` clients see the change on
+their next request; each change applied is one version of the warehouse
+`history`. With `--dataset` the season's Parquet partition and the
+snapshot are rewritten as well.
+
+Without `--year` the season followed is the one in progress, so a
+running watch moves on to the new season in July. The Excel files are
+not rewritten; `barca export` produces them on demand.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+from .cache import CACHE_DIR
+from .seasons import BASE_URL, current_season_year, season_label
+
+ABOUT_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(ABOUT_DATA, '2010-2025', 'barca_2010_2025.db')
+WAREHOUSE_PATH = os.path.join(ABOUT_DATA, 'barca_warehouse.db')
+DEFAULT_INTERVAL = 15 * 60
+
+# One poll: HTTP `status` (None on a network error), whether the page body `changed` since the last
+# applied one, the rows written and deleted, the aggregate keys refreshed as (players, seasons,
+# managers), the bytes downloaded, the poll's duration and the error, if any.
+Poll = namedtuple('Poll', 'season status changed written deleted refreshed bytes_fetched elapsed error')
+
+
+class SeasonWatcher:
+    """Polls one season page and applies its row changes to a decade database and the warehouse."""
+
+    def __init__(self, year=None, db_path=DB_PATH, warehouse_path=WAREHOUSE_PATH, cache_dir=CACHE_DIR,
+                 dataset_dir=None, base_url=BASE_URL, fees=None):
+        from .cache import ResponseCache
+        from .crawler import SeasonCrawler
+        from .db import init_database, migrate
+        from .fees import as_registry
+
+        self.year = year
+        self.db_path = db_path
+        self.warehouse_path = warehouse_path
+        self.dataset_dir = dataset_dir
+        self.fees = as_registry(fees)
+        # No TTL: the page is revalidated on every poll.
+        self.cache = ResponseCache(cache_dir, closed_ttl=0, current_ttl=0)
+        self.crawler = SeasonCrawler(max_workers=1, base_url=base_url, cache=self.cache, rate=None)
+        self.conn = init_database(db_path)
+        migrate(self.conn)
+        self._applied = {}  # season label -> digest of the last page body applied
+
+    def season_year(self):
+        return current_season_year() if self.year is None else self.year
+
+    def poll(self):
+        """Fetches the season page once and applies it if it changed; returns a `Poll`."""
+        start = time.perf_counter()
+        year = self.season_year()
+        label = season_label(year)
+        fetched = self.cache.stats.bytes_fetched
+        page = self.crawler.fetch(year)
+
+        def result(changed=False, written=0, deleted=0, refreshed=(0, 0, 0), error=None):
+            return Poll(label, page.status, changed, written, deleted, refreshed,
+                        self.cache.stats.bytes_fetched - fetched, time.perf_counter() - start, error)
+
+        if page.error is not None:
+            return result(error=f'{type(page.error).__name__}: {page.error}')
+        if page.status != 200:
+            return result(error=f'HTTP {page.status}')
+        digest = self.cache.lookup(page.url).digest
+        if self._applied.get(label) == digest:
+            return result()
+        try:
+            written, deleted, refreshed = self.apply(label, page.content)
+        except Exception as e:  # a malformed page must not stop the watch
+            return result(True, error=f'not applied: {e!r}')
+        self._applied[label] = digest
+        return result(True, written, deleted, refreshed)
+
+    def apply(self, label, content):
+        """Writes the rows of a season page that differ from the stored ones.
+
+        Returns (rows written, rows deleted, aggregate keys refreshed); the
+        counts are the warehouse's when there is one, the decade database's
+        otherwise.
+        """
+        from .columns import extract_columns
+        from .db import loaded_seasons, upsert_columns
+
+        _manager, columns = extract_columns(content, label, self.fees)
+        if not len(columns):
+            raise ValueError(f"{label}: the page has no squad table")
+        digest = columns.digest()
+        diff = None
+        if loaded_seasons(self.conn).get(label) != digest:
+            with self.conn:
+                diff = upsert_columns(self.conn, label, columns, digest)
+        written, deleted = (len(diff.changed), len(diff.stale)) if diff else (0, 0)
+        refreshed = (0, 0, 0)
+        if os.path.exists(self.warehouse_path):
+            # Checked even when the decade database was current: a watch stopped between the
+            # two writes leaves the warehouse behind.
+            written, deleted, refreshed = self._apply_warehouse(columns)
+        if diff is not None and self.dataset_dir:
+            from .storage import write_season, write_snapshot
+
+            write_season(self.dataset_dir, columns)
+            write_snapshot(self.dataset_dir)
+        return written, deleted, refreshed
+
+    def _apply_warehouse(self, columns):
+        from . import aggregates
+        from .warehouse import Warehouse
+
+        warehouse = Warehouse(self.warehouse_path, self.fees)
+        try:
+            with warehouse.write(f'watch {columns.season_label}'):
+                diff = warehouse.load_columns(columns)
+                refreshed = aggregates.dirty_counts(warehouse.conn)
+        finally:
+            warehouse.close()
+        return len(diff.changed), len(diff.stale), refreshed
+
+    def close(self):
+        self.crawler.close()
+        self.conn.close()
+
+
+def describe(poll):
+    """One log line for a `Poll`."""
+    line = f"{time.strftime('%H:%M:%S')} {poll.season}: "
+    if poll.error:
+        line += poll.error
+    elif not poll.changed:
+        line += 'not modified' if poll.bytes_fetched == 0 else 'unchanged'
+    elif not poll.written and not poll.deleted:
+        line += 'no row changed'
+    else:
+        players, seasons, managers = poll.refreshed
+        line += (f"{poll.written} rows written, {poll.deleted} deleted; refreshed {players} players, "
+                 f"{seasons} seasons, {managers} managers")
+    return line + f" ({poll.bytes_fetched / 1024:.1f} KB, {poll.elapsed * 1000:.0f} ms)"
+
+
+def watch(watcher, interval=DEFAULT_INTERVAL, polls=None, log=print):
+    """Polls every `interval` seconds, `polls` times (forever when None); returns the last `Poll`."""
+    done = 0
+    last = None
+    while polls is None or done < polls:
+        started = time.monotonic()
+        last = watcher.poll()
+        log(describe(last))
+        done += 1
+        if polls is None or done < polls:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    return last
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poll the season in progress and apply its changes.")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument('--once', action='store_true', help="poll once and exit")
+    parser.add_argument('--year', type=int, help="season start year (default: the season in progress)")
+    parser.add_argument('--db', default=DB_PATH, help="decade database the season belongs to")
+    parser.add_argument('--warehouse', default=WAREHOUSE_PATH, help="updated as well when it exists")
+    parser.add_argument('--dataset', help="Parquet dataset directory to update as well")
+    parser.add_argument('--cache', default=CACHE_DIR, help="page cache holding the validators")
+    parser.add_argument('--base-url', default=BASE_URL)
+    args = parser.parse_args(argv)
+
+    watcher = SeasonWatcher(args.year, args.db, args.warehouse, args.cache, args.dataset, args.base_url)
+    try:
+        poll = watch(watcher, args.interval, 1 if args.once else None)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+    return 1 if poll.error else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())